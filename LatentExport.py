@@ -0,0 +1,16 @@
+# LatentExport
+# Export the metadata of every image in one or more directory trees to
+# JSONL or CSV. No GUI, the same metadata parsing as LatentEye.
+#
+#   python LatentExport.py metadata.jsonl ~/ComfyUI/output
+#   python LatentExport.py metadata.csv ~/outputs ~/more_outputs --jobs 8
+#   python LatentExport.py metadata.jsonl ~/ComfyUI/output --resume
+#
+# Date: Oct 2026
+
+import sys
+
+from src.bulk_export import main
+
+if __name__ == "__main__":
+    sys.exit(main())
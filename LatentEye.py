@@ -2,22 +2,43 @@
 # Author: Greg Moore - https://github.com/AnotherWorkingNerd
 # I spy with my LatentEye, metadata!
 
+# first, so the imports below are timed. see src/startup.py
+from src.startup import StartupTimer
+StartupTimer.instance().start()
+
+import argparse
 import logging
 import sys
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QScreen
 from src.main_window import MainWindow
 from src.latent_tools import Settings
+from src.watchdog import StallWatchdog, STALL_THRESHOLD_MS
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(module)s:%(lineno)s | %(message)s' )
     logger = logging.getLogger(__name__)
     logger.info(f'Starting {Settings.APPNAME} v{Settings.VERSION}')
-    app = QApplication(sys.argv)
+    startup = StartupTimer.instance()
+    startup.mark('imports')
+    # ours. the rest (-style etc.) are Qt's.
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--stall-ms', type=int, default=STALL_THRESHOLD_MS,
+                        help='log the GUI thread stack when it is blocked this long. 0 is off')
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
     window = MainWindow()
+    startup.mark('window created')
+    startup.watch_first_paint(window)
     window.show()
-    center = QScreen.availableGeometry(QApplication.primaryScreen()).center()
-    primary_frame = window.frameGeometry()
-    primary_frame.moveCenter(center)
-    window.move(primary_frame.topLeft())
+    # unless it went back where it was last time. see MainWindow.restore_session()
+    if not window.geometry_restored:
+        center = QScreen.availableGeometry(QApplication.primaryScreen()).center()
+        primary_frame = window.frameGeometry()
+        primary_frame.moveCenter(center)
+        window.move(primary_frame.topLeft())
+    watchdog = StallWatchdog.instance()
+    watchdog.threshold_ms = args.stall_ms
+    watchdog.start()
+    app.aboutToQuit.connect(watchdog.stop)
     sys.exit(app.exec())
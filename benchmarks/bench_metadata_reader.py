@@ -0,0 +1,71 @@
+# bench_metadata_reader.py
+# Compare the header-only metadata reader (image_header.py) against
+# going through sd-prompt-reader's ImageDataReader for every file.
+#
+# Usage: python benchmarks/bench_metadata_reader.py [image dir] [-r repeats]
+# defaults to the sample-images directory.
+#
+# Date: Oct 2026
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sd_prompt_reader.image_data_reader import ImageDataReader  # noqa: E402
+from src.image_header import header_data_reader, read_image_header  # noqa: E402
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.webp'}
+
+
+def image_data_reader(image_path):
+    """ the old way. PIL opens every file. """
+    with open(image_path, 'rb') as f:
+        return ImageDataReader(f)
+
+
+def header_reader(image_path):
+    """ the new way. header first, ImageDataReader only if needed. """
+    header = read_image_header(image_path)
+    reader = header_data_reader(header) if header else None
+    return reader or image_data_reader(image_path)
+
+
+def time_reader(reader, files, repeats):
+    """ best of repeats, in seconds for the whole list of files """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for f in files:
+            reader(f)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    default_dir = Path(__file__).resolve().parent.parent / 'sample-images'
+    parser = argparse.ArgumentParser(description="Header reader vs ImageDataReader benchmark")
+    parser.add_argument('directory', nargs='?', default=str(default_dir))
+    parser.add_argument('-r', '--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    # sd-prompt-reader is chatty
+    logging.disable(logging.WARNING)
+    files = sorted(str(f) for f in Path(args.directory).iterdir() if f.suffix.lower() in IMAGE_SUFFIXES)
+    if not files:
+        sys.exit(f'No images in {args.directory}')
+
+    fast = sum(1 for f in files if (h := read_image_header(f)) and header_data_reader(h))
+    old = time_reader(image_data_reader, files, args.repeats)
+    new = time_reader(header_reader, files, args.repeats)
+    print(f'{len(files)} images, {fast} read from the headers, best of {args.repeats}')
+    print(f'ImageDataReader : {old * 1000 / len(files):8.3f} ms/image')
+    print(f'header reader   : {new * 1000 / len(files):8.3f} ms/image')
+    print(f'speedup         : {old / new:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+# bench_suite.py
+# The LatentEye benchmarks. Runs without a display, Qt's offscreen
+# platform is used unless QT_QPA_PLATFORM says otherwise.
+#
+# Makes a synthetic corpus (see corpus.py) and times:
+#   - enumerate: listing the images in the directory. list_image_files()
+#   - thumbnails: ThumbnailWorker, images per second. cold is the first
+#     time a folder is seen (the dHashes are computed and saved), warm is
+#     every time after.
+#   - metadata: MetadataTable.get_image_metadata() per image. cold reads
+#     the files and fills the index, warm comes from the index.
+#   - sort: ThumbnailView.sorted_files() for each sort choice.
+#   - layout: FlowLayout.doLayout() with more and more thumbnails.
+# The MetadataIndex is a new one in a temp directory, the real one isn't
+# touched.
+#
+# The results are saved as JSON. --compare an earlier file to see what
+# got faster or slower.
+#
+# Usage: python benchmarks/bench_suite.py [-n count] [--size 768x512] [--corpus dir]
+#                                         [-r repeats] [-o results.json] [--compare old.json]
+#
+# Date: Oct 2026
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt6.QtCore import QRect, QSize, QT_VERSION_STR, PYQT_VERSION_STR  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QLabel, QWidget  # noqa: E402
+
+from corpus import generate_corpus, parse_size  # noqa: E402
+from src.latent_tools import Settings  # noqa: E402
+from src.metadata_index import MetadataIndex  # noqa: E402
+from src.metadatatable import MetadataTable  # noqa: E402
+from src.scrollflow import FlowLayout  # noqa: E402
+from src.thumbnail_view import ThumbnailView, ThumbnailWorker, list_image_files  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+SORTS = ['Name', 'Last modified date', 'File Size', 'Extension', 'Seed', 'Model']
+LAYOUT_COUNTS = [100, 1000, 5000]
+# thumbnail size, same as ThumbnailView
+THUMB_SIZE = QSize(200, 200)
+# width of the thumbnail grid doLayout() fills.
+LAYOUT_WIDTH = 1200
+# the results --compare shows.
+TIMINGS = ('_ms', '.ms', 'seconds', 'images_per_s', 'us_per_file', 'us_per_item')
+
+
+def best_of(repeats, func):
+    """ best time of repeats calls, in ms """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def latency_stats(times):
+    """ ms per call. times = list of ms """
+    times = sorted(times)
+    return {
+        'count': len(times),
+        'mean_ms': statistics.fmean(times),
+        'median_ms': statistics.median(times),
+        'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))],
+        'max_ms': times[-1],
+    }
+
+
+def bench_enumerate(directory, repeats):
+    count = len(list_image_files(directory))
+    ms = best_of(repeats, lambda: list_image_files(directory))
+    return {'files': count, 'ms': ms, 'us_per_file': ms * 1000 / max(count, 1)}
+
+
+def bench_thumbnails(files):
+    """ cold then warm. The worker runs here, not in the thread pool, so only the work is timed. """
+    results = {}
+    for run in ('cold', 'warm'):
+        worker = ThumbnailWorker(files, THUMB_SIZE, [False])
+        made = []
+        worker.signals.result.connect(lambda _image, path, _i: made.append(path))
+        start = time.perf_counter()
+        worker.run()
+        seconds = time.perf_counter() - start
+        results[run] = {'images': len(made), 'seconds': seconds, 'images_per_s': len(made) / seconds,
+                        'ms_per_image': seconds * 1000 / max(len(made), 1)}
+    return results
+
+
+def bench_metadata(files):
+    """ cold fills the index, warm reads it back. """
+    table = MetadataTable()
+    results = {}
+    for run in ('cold', 'warm'):
+        times = []
+        found = 0
+        for f in files:
+            start = time.perf_counter()
+            metadata = table.get_image_metadata(f)
+            times.append((time.perf_counter() - start) * 1000)
+            found += bool(metadata)
+        results[run] = latency_stats(times) | {'with_metadata': found}
+    table.deleteLater()
+    return results
+
+
+def bench_sort(files, repeats):
+    view = ThumbnailView()
+    view.listed_order = {f: i for i, f in enumerate(files)}
+    results = {}
+    for sort_by in SORTS:
+        ms = best_of(repeats, lambda: view.sorted_files(files, sort_by))
+        results[sort_by] = {'ms': ms, 'us_per_file': ms * 1000 / len(files)}
+    view.deleteLater()
+    return results
+
+
+def bench_layout(counts, repeats):
+    """ doLayout() of count thumbnail sized labels, measuring only and placing them. """
+    results = {}
+    for count in counts:
+        parent = QWidget()
+        layout = FlowLayout(parent)
+        for _ in range(count):
+            label = QLabel(parent)
+            label.setFixedSize(THUMB_SIZE)
+            layout.addWidget(label)
+        rect = QRect(0, 0, LAYOUT_WIDTH, 0)
+        measure = best_of(repeats, lambda: layout.doLayout(rect, True))
+        place = best_of(repeats, lambda: layout.doLayout(rect, False))
+        results[str(count)] = {'measure_ms': measure, 'place_ms': place,
+                               'us_per_item': place * 1000 / count, 'rows': layout.rows}
+        parent.deleteLater()
+    return results
+
+
+def flatten(results, prefix=''):
+    """ {'a': {'b': 1}} -> {'a.b': 1}. only the numbers. """
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(old_path, new):
+    """ print the timings next to the ones in an earlier results file. """
+    old = json.loads(Path(old_path).read_text())
+    old_flat = flatten(old['results'])
+    new_flat = flatten(new['results'])
+    print(f"\nvs {old_path} (LatentEye {old['version']}, {old['created']})")
+    print(f"{'':48}{'old':>12}{'new':>12}{'change':>10}")
+    for name, value in new_flat.items():
+        # timings only, not counts. for images_per_s bigger is better, for the rest smaller.
+        if name not in old_flat or not name.endswith(TIMINGS):
+            continue
+        before = old_flat[name]
+        change = (value - before) / before * 100 if before else 0.0
+        print(f'{name:48}{before:12.3f}{value:12.3f}{change:+9.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LatentEye benchmarks')
+    parser.add_argument('-n', '--count', type=int, default=500, help='images in the corpus')
+    parser.add_argument('--size', type=parse_size, default=(768, 512), help='image size, WIDTHxHEIGHT')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus', help='where to keep the corpus. it is reused if it matches. '
+                                         'default: a temp directory')
+    parser.add_argument('-r', '--repeats', type=int, default=5)
+    parser.add_argument('--layout-counts', default=','.join(str(c) for c in LAYOUT_COUNTS),
+                        help='thumbnail counts for the layout benchmark, e.g. 100,1000,5000')
+    parser.add_argument('-o', '--output', help=f'results file. default: {RESULTS_DIR}/bench-<version>-<time>.json')
+    parser.add_argument('--compare', help='earlier results file to compare with')
+    args = parser.parse_args()
+
+    # nothing logged while timing. the index and readers are chatty.
+    logging.disable(logging.WARNING)
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory(prefix='latenteye-bench-') as tmp:
+        corpus_dir = args.corpus or str(Path(tmp) / 'corpus')
+        print(f'corpus: {args.count} images {args.size[0]}x{args.size[1]} in {corpus_dir}')
+        files = generate_corpus(corpus_dir, args.count, args.size, args.seed)
+        MetadataIndex._instance = MetadataIndex(Path(tmp) / 'index.sqlite')
+
+        results = {}
+        steps = [
+            ('enumerate', lambda: bench_enumerate(corpus_dir, args.repeats)),
+            ('thumbnails', lambda: bench_thumbnails(files)),
+            # after the metadata, the index has what the Seed and Model sorts need.
+            ('metadata', lambda: bench_metadata(files)),
+            ('sort', lambda: bench_sort(files, args.repeats)),
+            ('layout', lambda: bench_layout([int(c) for c in args.layout_counts.split(',')], args.repeats)),
+        ]
+        for name, step in steps:
+            print(f'{name}...', flush=True)
+            results[name] = step()
+            app.processEvents()
+        MetadataIndex._instance = None
+
+    report = {
+        'version': Settings.VERSION.value,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'cpu_count': os.cpu_count(),
+        'qpa_platform': os.environ['QT_QPA_PLATFORM'],
+        'corpus': {'count': args.count, 'size': list(args.size), 'seed': args.seed},
+        'repeats': args.repeats,
+        'results': results,
+    }
+    for name, value in flatten(results).items():
+        print(f'{name:48}{value:12.3f}')
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"bench-{report['version']}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f'\nsaved {output}')
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# corpus.py
+# Make a folder of fake AI images for the benchmarks.
+#
+# The images are small gradients with a little noise, so they compress
+# about like real ones, with the metadata the real tools write:
+#   - A1111 PNG: 'parameters' tEXt chunk.
+#   - ComfyUI PNG: 'prompt' (API graph) and 'workflow' JSON chunks.
+#   - A1111 JPEG: the parameters in the EXIF UserComment.
+# Everything comes from a seeded random.Random so the same arguments give
+# the same corpus, file times included. A corpus.json in the folder
+# records the arguments and the folder is only made again if they change.
+#
+# Usage: python benchmarks/corpus.py directory [-n count] [--size 768x512] [--seed 0]
+#
+# Date: Oct 2026
+
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import piexif
+import piexif.helper
+from PIL import Image, ImageOps
+from PIL.PngImagePlugin import PngInfo
+
+MANIFEST = 'corpus.json'
+# 2026-01-01. the file times go up from here.
+BASE_MTIME = 1767225600
+# share of each kind. the rest are A1111 PNGs.
+COMFY_SHARE = 0.4
+JPEG_SHARE = 0.15
+
+SUBJECTS = ['a lonely robot', 'an old lighthouse', 'a red fox', 'a cyberpunk street', 'a tea house',
+            'a knight in armor', 'a glass bottle with a galaxy inside', 'a mountain village', 'a koi pond',
+            'an astronaut', 'a steam locomotive', 'a girl with a pearl earring', 'a dragon', 'a bonsai tree']
+STYLES = ['oil painting', 'watercolor', 'photograph', '35mm film', 'ukiyo-e', 'concept art', 'isometric',
+          'pencil sketch', 'cinematic lighting', 'studio ghibli style', 'art nouveau', 'low poly']
+DETAILS = ['highly detailed', 'golden hour', 'volumetric fog', 'rain', 'bokeh', 'masterpiece', '8k',
+           'sharp focus', 'dramatic sky', 'soft light', 'intricate', 'vivid colors', 'moody']
+NEGATIVES = ['worst quality', 'low quality', 'blurry', 'watermark', 'text', 'deformed', 'extra fingers',
+             'bad anatomy', 'jpeg artifacts', 'cropped', 'monochrome']
+SAMPLERS = ['euler', 'euler_ancestral', 'dpmpp_2m', 'dpmpp_sde', 'ddim', 'uni_pc']
+A1111_SAMPLERS = ['Euler', 'Euler a', 'DPM++ 2M Karras', 'DPM++ SDE Karras', 'DDIM', 'UniPC']
+MODELS = ['sd_xl_base_1.0', 'dreamshaperXL_v21', 'juggernautXL_v9', 'realisticVision_v51', 'animagineXL_v31']
+LORAS = ['add_detail', 'film_grain', 'pixel_art_xl', 'watercolor_v2']
+
+
+def make_prompt(rng):
+    words = [rng.choice(SUBJECTS), rng.choice(STYLES)] + rng.sample(DETAILS, rng.randint(2, 6))
+    if rng.random() < 0.3:
+        words.append(f'<lora:{rng.choice(LORAS)}:{rng.choice((0.5, 0.7, 0.8, 1.0))}>')
+    return ', '.join(words)
+
+
+def make_settings(rng, size):
+    return {
+        'prompt': make_prompt(rng),
+        'negative': ', '.join(rng.sample(NEGATIVES, rng.randint(2, 6))),
+        'seed': rng.randrange(2 ** 32),
+        'steps': rng.choice((20, 25, 28, 30, 40)),
+        'cfg': rng.choice((4.5, 5.0, 6.0, 7.0, 7.5)),
+        'sampler': rng.randrange(len(SAMPLERS)),
+        'model': rng.choice(MODELS),
+        'width': size[0],
+        'height': size[1],
+    }
+
+
+def a1111_parameters(s):
+    """ the 'parameters' text A1111 writes. """
+    return (f"{s['prompt']}\nNegative prompt: {s['negative']}\n"
+            f"Steps: {s['steps']}, Sampler: {A1111_SAMPLERS[s['sampler']]}, CFG scale: {s['cfg']}, "
+            f"Seed: {s['seed']}, Size: {s['width']}x{s['height']}, Model hash: 31e35c80fc, "
+            f"Model: {s['model']}, Version: v1.10.1")
+
+
+def comfy_prompt(s):
+    """ the API graph ComfyUI saves in the 'prompt' chunk. The default text to image workflow. """
+    return {
+        '3': {'inputs': {'seed': s['seed'], 'steps': s['steps'], 'cfg': s['cfg'],
+                         'sampler_name': SAMPLERS[s['sampler']], 'scheduler': 'karras', 'denoise': 1.0,
+                         'model': ['4', 0], 'positive': ['6', 0], 'negative': ['7', 0],
+                         'latent_image': ['5', 0]}, 'class_type': 'KSampler'},
+        '4': {'inputs': {'ckpt_name': f"{s['model']}.safetensors"}, 'class_type': 'CheckpointLoaderSimple'},
+        '5': {'inputs': {'width': s['width'], 'height': s['height'], 'batch_size': 1},
+              'class_type': 'EmptyLatentImage'},
+        '6': {'inputs': {'text': s['prompt'], 'clip': ['4', 1]}, 'class_type': 'CLIPTextEncode'},
+        '7': {'inputs': {'text': s['negative'], 'clip': ['4', 1]}, 'class_type': 'CLIPTextEncode'},
+        '8': {'inputs': {'samples': ['3', 0], 'vae': ['4', 2]}, 'class_type': 'VAEDecode'},
+        '9': {'inputs': {'filename_prefix': 'ComfyUI', 'images': ['8', 0]}, 'class_type': 'SaveImage'},
+    }
+
+
+def comfy_workflow(prompt):
+    """ a 'workflow' chunk. The UI graph, with the node positions that make it big. """
+    nodes = []
+    for i, (node_id, node) in enumerate(prompt.items()):
+        nodes.append({'id': int(node_id), 'type': node['class_type'], 'pos': [100 + 320 * (i % 4), 100 + 260 * (i // 4)],
+                      'size': {'0': 315, '1': 262}, 'flags': {}, 'order': i, 'mode': 0,
+                      'inputs': [{'name': k, 'type': 'LINK', 'link': i * 10 + j}
+                                 for j, (k, v) in enumerate(node['inputs'].items()) if isinstance(v, list)],
+                      'outputs': [{'name': 'OUT', 'type': 'ANY', 'links': [], 'slot_index': 0}],
+                      'properties': {'Node name for S&R': node['class_type']},
+                      'widgets_values': [v for v in node['inputs'].values() if not isinstance(v, list)]})
+    return {'last_node_id': len(nodes), 'last_link_id': len(nodes) * 10, 'nodes': nodes, 'links': [],
+            'groups': [], 'config': {}, 'extra': {'ds': {'scale': 1.0, 'offset': [0, 0]}}, 'version': 0.4}
+
+
+def make_pixels(rng, size):
+    """ a colored gradient with some noise. """
+    gradient = Image.radial_gradient('L') if rng.random() < 0.5 else Image.linear_gradient('L')
+    gradient = gradient.rotate(rng.randrange(360)).resize(size)
+    colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(2)]
+    image = ImageOps.colorize(gradient, colors[0], colors[1])
+    # noise at a quarter size, scaled up. full size noise doesn't compress
+    # at all and takes ages to write. from rng so it's the same every time.
+    small = (max(size[0] // 4, 1), max(size[1] // 4, 1))
+    noise = Image.frombytes('L', small, rng.randbytes(small[0] * small[1]))
+    noise = noise.resize(size, Image.Resampling.BILINEAR).convert('RGB')
+    return Image.blend(image, noise, 0.1)
+
+
+def write_image(path, kind, rng, size):
+    s = make_settings(rng, size)
+    image = make_pixels(rng, size)
+    if kind == 'jpeg':
+        user_comment = piexif.helper.UserComment.dump(a1111_parameters(s), encoding='unicode')
+        exif = piexif.dump({'0th': {}, 'Exif': {piexif.ExifIFD.UserComment: user_comment}})
+        image.save(path, quality=90, exif=exif)
+        return
+    info = PngInfo()
+    if kind == 'comfy':
+        prompt = comfy_prompt(s)
+        info.add_text('prompt', json.dumps(prompt))
+        info.add_text('workflow', json.dumps(comfy_workflow(prompt)))
+    else:
+        info.add_text('parameters', a1111_parameters(s))
+    # decoding is about as fast at any level, writing at 1 is a lot faster.
+    image.save(path, pnginfo=info, compress_level=1)
+
+
+def generate_corpus(directory, count=500, size=(768, 512), seed=0, log=print):
+    """
+    Make the corpus, unless the directory already has this one.
+    Args:
+        directory = str. where to put it. created if needed.
+        count = int. number of images.
+        size = (int, int). width and height of each image.
+        seed = int. for the random.Random everything comes from.
+        log = print or None. progress.
+    Returns: list of str. FQPN of the images, in the order they were made.
+    """
+    directory = Path(directory)
+    settings = {'count': count, 'size': list(size), 'seed': seed,
+                'comfy_share': COMFY_SHARE, 'jpeg_share': JPEG_SHARE}
+    manifest = directory / MANIFEST
+    if manifest.exists():
+        saved = json.loads(manifest.read_text())
+        if saved.get('settings') == settings and all((directory / f).exists() for f in saved['files']):
+            return [str(directory / f) for f in saved['files']]
+    directory.mkdir(parents=True, exist_ok=True)
+    for old in directory.iterdir():
+        if old.suffix.lower() in ('.png', '.jpg'):
+            old.unlink()
+
+    rng = random.Random(seed)
+    files = []
+    mtime = BASE_MTIME
+    for i in range(count):
+        roll = rng.random()
+        kind = 'jpeg' if roll < JPEG_SHARE else 'comfy' if roll < JPEG_SHARE + COMFY_SHARE else 'a1111'
+        name = f"{'ComfyUI' if kind == 'comfy' else 'img'}_{rng.randrange(10 ** 6):06d}_{i:05d}"
+        name += '.jpg' if kind == 'jpeg' else '.png'
+        write_image(directory / name, kind, rng, size)
+        # a few seconds apart, not in name order, so every sort does some work.
+        mtime += rng.randint(1, 90)
+        os.utime(directory / name, (mtime, mtime))
+        files.append(name)
+        if log and (i + 1) % 100 == 0:
+            log(f'  {i + 1}/{count} images')
+    manifest.write_text(json.dumps({'settings': settings, 'files': files}, indent=1))
+    return [str(directory / f) for f in files]
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Make a folder of fake AI images for the benchmarks')
+    parser.add_argument('directory')
+    parser.add_argument('-n', '--count', type=int, default=500)
+    parser.add_argument('--size', type=parse_size, default=(768, 512), help='WIDTHxHEIGHT')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.count < 1:
+        sys.exit('count has to be at least 1')
+    files = generate_corpus(args.directory, args.count, args.size, args.seed)
+    print(f'{len(files)} images in {args.directory}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+# animation.py
+# Animated WebP and GIF playback for EyeSight.
+#
+# AnimateDiff and the like save animated WebPs, often a hundred frames
+# or more. Decoding every frame up front would take seconds and hold
+# hundreds of MB for a clip that may only be looked at for a moment.
+#
+# AnimationPlayer decodes frames as playback gets to them. A FrameDecoder
+# in the thread pool stays a few frames (READ_AHEAD) ahead of the frame
+# that is showing and the decoded frames go in a FrameCache that is
+# capped in bytes. A short clip ends up all in the cache after the first
+# loop. A long one keeps only the frames played most recently and is
+# decoded again on the next loop.
+#
+# WebP and GIF frames can only be decoded in order, most are drawn over
+# the frame before. The QImageReader is kept between decodes so playing
+# on doesn't start from the first frame each time. see FrameReader
+#
+# Date: Oct 2026
+
+import logging
+from collections import OrderedDict
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImage, QImageReader
+
+logger = logging.getLogger(__name__)
+
+# most memory the decoded frames of one animation can use.
+FRAME_CACHE_BYTES = 256 * 1024 * 1024
+# frames decoded ahead of the one that's showing.
+READ_AHEAD = 8
+# browsers show frames with no delay, or one of 10 ms or less, for 100 ms.
+DEFAULT_DELAY_MS = 100
+MIN_DELAY_MS = 10
+
+
+def is_animated(image_path):
+    """ True if the image has more than one frame. Only reads the header. """
+    reader = QImageReader(image_path)
+    return reader.supportsAnimation() and reader.imageCount() > 1
+
+
+class FrameCache:
+    """
+    LRU cache of decoded frames, index: (QImage, delay in ms). Capped in bytes.
+    Args: max_bytes = int. most memory to use.
+    """
+    def __init__(self, max_bytes=FRAME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._frames = OrderedDict()
+
+    def __contains__(self, index):
+        return index in self._frames
+
+    def get(self, index):
+        frame = self._frames.get(index)
+        if frame is not None:
+            self._frames.move_to_end(index)
+        return frame
+
+    def put(self, index, image, delay):
+        old = self._frames.pop(index, None)
+        if old is not None:
+            self.bytes -= old[0].sizeInBytes()
+        self._frames[index] = (image, delay)
+        self.bytes += image.sizeInBytes()
+        while self.bytes > self.max_bytes and len(self._frames) > 1:
+            _index, (old_image, _delay) = self._frames.popitem(last=False)
+            self.bytes -= old_image.sizeInBytes()
+
+    def byte_count(self):
+        return self.bytes
+
+    def clear(self):
+        self._frames.clear()
+        self.bytes = 0
+
+
+class FrameReader:
+    """
+    Reads the frames of an animation by index. The frames can only be
+    decoded in order so going back means starting over from the first.
+    Not thread safe, only one FrameDecoder uses it at a time.
+    Args: image_path = str. FQPN of the animation.
+    """
+    def __init__(self, image_path):
+        self.image_path = image_path
+        self.reader = None
+        self.next_index = 0
+
+    def read(self, index):
+        """
+        Decode one frame.
+        Returns: (QImage, int delay in ms). The image is null if it can't be read.
+        """
+        if self.reader is None or index < self.next_index:
+            self.reader = QImageReader(self.image_path)
+            self.next_index = 0
+        # frames that were dropped from the cache, or never wanted, still
+        # have to be decoded to get to this one.
+        while self.next_index < index:
+            if self.reader.read().isNull():
+                return QImage(), 0
+            self.next_index += 1
+        image = self.reader.read()
+        self.next_index += 1
+        if image.isNull():
+            logger.warning(f'FrameReader: unable to read frame {index} of {self.image_path}: '
+                           f'{self.reader.errorString()}')
+            return image, 0
+        delay = self.reader.nextImageDelay()
+        if delay <= MIN_DELAY_MS:
+            delay = DEFAULT_DELAY_MS
+        # the format QPainter draws fastest.
+        return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied), delay
+
+
+class FrameDecoderSignals(QObject):
+    """
+    Thread Signals -
+        decoded: (int, QImage, int) frame index, the frame and its delay in ms.
+        failed: (int, str) index of the frame that couldn't be read and the error.
+        finished: no data. emitted canceled or not.
+    """
+    decoded = pyqtSignal(int, QImage, int)
+    failed = pyqtSignal(int, str)
+    finished = pyqtSignal()
+
+
+class FrameDecoder(QRunnable):
+    """
+    Decode a run of frames in the background.
+    Args:
+        frames = FrameReader.
+        first = int. index of the first frame.
+        count = int. number of frames.
+        cancel_flag = (list[bool]) Mutable flag to allow cancellation of the worker from the main thread.
+    """
+    def __init__(self, frames, first, count, cancel_flag):
+        super().__init__()
+        self.frames = frames
+        self.first = first
+        self.count = count
+        self.cancel_flag = cancel_flag
+        self.signals = FrameDecoderSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            for index in range(self.first, self.first + self.count):
+                if self.cancel_flag[0]:
+                    break
+                image, delay = self.frames.read(index)
+                if self.cancel_flag[0]:
+                    break
+                if image.isNull():
+                    self.signals.failed.emit(index, f'Unable to read frame {index + 1}')
+                    break
+                self.signals.decoded.emit(index, image, delay)
+        except Exception as e:
+            logger.error(f'FrameDecoder: error decoding {self.frames.image_path}: {e}')
+            if not self.cancel_flag[0]:
+                self.signals.failed.emit(self.first, str(e))
+        self.signals.finished.emit()
+
+
+class AnimationPlayer(QObject):
+    """
+    Plays an animated image. Frames are decoded as they are needed, see
+    the top of the file. Connect frame_changed to whatever shows the
+    frames then call play().
+    Args:
+        image_path = str. FQPN of the animation.
+        max_bytes = int. most memory the decoded frames can use.
+    Signals:
+        frame_changed: (QImage) the frame to show now.
+        failed: (str, str) image path and error. the first frame couldn't
+                be read. Same as ImageLoaderSignals.failed
+    """
+    frame_changed = pyqtSignal(QImage)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, image_path, max_bytes=FRAME_CACHE_BYTES, parent=None):
+        super().__init__(parent)
+        self.image_path = image_path
+        reader = QImageReader(image_path)
+        self.size = reader.size()
+        self.frame_count = max(reader.imageCount(), 1)
+        # -1 is forever. otherwise the number of times it's played again.
+        self.loop_count = reader.loopCount()
+        self.loops_done = 0
+        self.frames = FrameReader(image_path)
+        self.cache = FrameCache(max_bytes)
+        # don't decode ahead more than half the cache can hold, or the
+        # frames would push each other out before they are shown.
+        frame_bytes = max(self.size.width() * self.size.height() * 4, 1)
+        self.read_ahead = max(1, min(READ_AHEAD, max_bytes // frame_bytes // 2))
+        self.current = -1   # frame showing
+        self.pending = None     # frame to show as soon as it's decoded
+        self.playing = False
+        # cancel flag of the FrameDecoder that is running, if there is one.
+        self.decoding = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.advance)
+
+    def play(self):
+        self.playing = True
+        if self.loop_count >= 0 and self.loops_done > self.loop_count:
+            # it had stopped at the end. start over.
+            self.loops_done = 0
+            self.current = -1
+        self.show_frame(max(self.current, 0))
+
+    def pause(self):
+        self.playing = False
+        self.timer.stop()
+
+    def toggle(self):
+        """ play / pause """
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def release(self):
+        """ pause and give back the decoded frames. play() decodes them again. """
+        self.pause()
+        self.cancel()
+        self.cache.clear()
+
+    def close(self):
+        """ stop for good. """
+        self.release()
+        self.pending = None
+
+    def cancel(self):
+        if self.decoding is not None:
+            self.decoding[0] = True
+
+    def byte_count(self):
+        return self.cache.byte_count()
+
+    def show_frame(self, index):
+        """ show a frame now if it's decoded, otherwise when it is. """
+        frame = self.cache.get(index)
+        if frame is None:
+            self.pending = index
+            self.request_frames(index)
+            return
+        self.pending = None
+        image, delay = frame
+        self.current = index
+        self.frame_changed.emit(image)
+        if self.playing:
+            self.timer.start(delay)
+            self.request_frames((index + 1) % self.frame_count)
+
+    def advance(self):
+        """ the timer ran out. on to the next frame. """
+        index = self.current + 1
+        if index >= self.frame_count:
+            self.loops_done += 1
+            if 0 <= self.loop_count < self.loops_done:
+                self.playing = False
+                return
+            index = 0
+        self.show_frame(index)
+
+    def request_frames(self, start):
+        """ decode the frames from start on, up to read_ahead, that aren't cached. """
+        if self.decoding is not None:
+            # one at a time. they share the FrameReader. frame_decoded()
+            # asks again when it's done.
+            return
+        window = range(start, min(start + self.read_ahead, self.frame_count))
+        missing = [i for i in window if i not in self.cache]
+        if not missing:
+            return
+        first = missing[0]
+        count = 1
+        while first + count in missing:
+            count += 1
+        self.decoding = [False]
+        decoder = FrameDecoder(self.frames, first, count, self.decoding)
+        decoder.signals.decoded.connect(self.frame_decoded)
+        decoder.signals.failed.connect(self.frame_failed)
+        decoder.signals.finished.connect(self.decoder_finished)
+        QThreadPool.globalInstance().start(decoder)
+
+    def frame_decoded(self, index, image, delay):
+        if self.decoding is None or self.decoding[0]:
+            return
+        self.cache.put(index, image, delay)
+        if index == self.pending:
+            self.show_frame(index)
+
+    def frame_failed(self, index, error):
+        if index == 0:
+            self.pause()
+            self.failed.emit(self.image_path, error)
+        else:
+            # a broken frame part way through. play up to it.
+            logger.warning(f'AnimationPlayer: {self.image_path} stops at frame {index}: {error}')
+            self.frame_count = index
+            if self.pending is not None and self.pending >= index:
+                self.show_frame(0)
+
+    def decoder_finished(self):
+        # a canceled decoder still has the FrameReader until now. if it was
+        # played again in the mean time, the frames it wants are asked for here.
+        self.decoding = None
+        if self.pending is not None:
+            self.request_frames(self.pending)
+        elif self.playing:
+            self.request_frames((self.current + 1) % self.frame_count)
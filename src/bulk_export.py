@@ -0,0 +1,301 @@
+# bulk_export.py
+# Dump the generation metadata of whole directory trees to JSONL or CSV.
+# No GUI. See LatentExport.py for the command line.
+#
+# The files are parsed with the same read_image_metadata() the metadata
+# panel uses, fanned out over a process pool. Each record is written as
+# soon as it comes back so memory use doesn't grow with the number of
+# images, and an interrupted export can be resumed: the files already in
+# the output are skipped and the rest appended.
+#
+# Date: Oct 2026
+
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.webp'}
+# the CSV has a fixed set of columns since records are written before all
+# of the keys are known. Everything else goes in 'other' as JSON.
+CSV_COLUMNS = ('path', 'mtime', 'size', 'tool_used', 'model', 'sampler', 'scheduler', 'seed',
+               'steps', 'cfg scale', 'size_px', 'positive', 'negative', 'model_assets', 'other', 'error')
+# files handed to a pool process at a time. Big enough that the
+# inter-process overhead doesn't matter, small enough to keep all the
+# processes busy at the end.
+CHUNK_SIZE = 64
+
+
+def iter_image_files(roots, recursive=True):
+    """
+    Every image file under the roots. Sorted within each directory so
+    the order is the same from run to run.
+    Args:
+        roots = list of str. directories or image files.
+        recursive = bool. go into sub directories.
+    Yields: str. FQPN of each image.
+    """
+    for root in roots:
+        root = os.path.abspath(root)
+        if os.path.isfile(root):
+            yield root
+            continue
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    entries = sorted(entries, key=lambda e: e.name)
+            except OSError as e:
+                logger.warning(f'unable to read directory {directory}: {e}')
+                continue
+            sub_dirs = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_dirs.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in IMAGE_SUFFIXES:
+                    yield entry.path
+            if recursive:
+                stack.extend(reversed(sub_dirs))
+
+
+def export_record(image_path):
+    """
+    The export record of one image. Runs in the pool processes.
+    Returns: dict with path, mtime, size, metadata (dict or None) and
+             error (str or None).
+    """
+    # imported here so the parent process doesn't need sd_prompt_reader
+    # until there is work to do and each pool process imports it once.
+    from .sd_metadata import read_image_metadata
+    record = {'path': image_path, 'mtime': None, 'size': None, 'metadata': None, 'error': None}
+    try:
+        stat = os.stat(image_path)
+        record['mtime'], record['size'] = stat.st_mtime, stat.st_size
+        record['metadata'] = read_image_metadata(image_path) or None
+    except Exception as e:
+        # one bad file shouldn't stop an export of 100k files.
+        record['error'] = f'{type(e).__name__}: {e}'
+    return record
+
+
+def _quiet_parsers():
+    # sd_prompt_reader and read_image_metadata() log every file they don't
+    # like. With thousands of files that's just noise on the console.
+    for name in ('SD_Prompt_Reader', f'{__package__}.sd_metadata', f'{__package__}.image_header'):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+
+def _init_worker():
+    # the Pool initializer. Only the pool processes are silenced this way,
+    # the parent keeps logging as configured.
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+
+class JsonlWriter:
+    """ one JSON object per line. """
+    def __init__(self, path, append):
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        self.file.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def done_paths(path):
+        """
+        The paths already in an export. A partly written last line, from an
+        export that was killed, is cut off so the file can be appended to.
+        """
+        done = set()
+        good_end = 0
+        with open(path, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    done.add(json.loads(line)['path'])
+                except (ValueError, KeyError, TypeError):
+                    break
+                good_end += len(line)
+            f.truncate(good_end)
+        return done
+
+
+class CsvWriter:
+    """ CSV_COLUMNS. Values that aren't simple are written as JSON. """
+    def __init__(self, path, append):
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        if not append or self.file.tell() == 0:
+            self.writer.writerow(CSV_COLUMNS)
+
+    def write(self, record):
+        metadata = dict(record['metadata'] or {})
+        row = {'path': record['path'], 'mtime': record['mtime'], 'size': record['size'],
+               'error': record['error'] or ''}
+        # 'size' is the file size in the CSV. the metadata size (e.g. 1024x1024) is size_px
+        row['size_px'] = metadata.pop('size', '')
+        for column in CSV_COLUMNS:
+            if column not in row:
+                value = metadata.pop(column, '')
+                row[column] = json.dumps(value, default=str) if isinstance(value, (list, dict)) else value
+        row['other'] = json.dumps(metadata, default=str, ensure_ascii=False) if metadata else ''
+        self.writer.writerow([row[c] for c in CSV_COLUMNS])
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def done_paths(path):
+        """
+        The paths already in an export. Prompts can have new lines in them
+        so a partly written last record can't be found by looking for the
+        last new line. The file is read a row at a time, keeping only the
+        path column, and cut off after the last complete row like
+        JsonlWriter.done_paths().
+        """
+        done = set()
+        good_end = 0
+        with open(path, 'rb+') as f:
+            pos = 0
+            last_line = b''
+
+            def lines():
+                # the byte position is needed to truncate. text mode can't
+                # tell() while it's being iterated.
+                nonlocal pos, last_line
+                for line in f:
+                    pos += len(line)
+                    last_line = line
+                    yield line.decode('utf-8')
+
+            try:
+                for row in csv.reader(lines()):
+                    if not last_line.endswith(b'\n') or len(row) != len(CSV_COLUMNS):
+                        break
+                    if good_end or row != list(CSV_COLUMNS):
+                        done.add(row[0])
+                    good_end = pos
+            except (csv.Error, UnicodeDecodeError):
+                # cut off in the middle of a quoted value or a character.
+                pass
+            f.truncate(good_end)
+        return done
+
+
+WRITERS = {'jsonl': JsonlWriter, 'csv': CsvWriter}
+
+
+def export(roots, output, output_format='jsonl', jobs=None, recursive=True, resume=False,
+           progress=None):
+    """
+    Export the metadata of every image under the roots.
+    Args:
+        roots = list of str. directories (or files) to export.
+        output = str. output file.
+        output_format = 'jsonl' or 'csv'
+        jobs = int. number of processes. defaults to the number of CPUs.
+        recursive = bool. include sub directories.
+        resume = bool. skip the images already in the output and append.
+        progress = function(done, skipped, errors, elapsed) called now and then.
+    Returns: (exported, skipped, errors) counts.
+    """
+    writer_class = WRITERS[output_format]
+    done = writer_class.done_paths(output) if resume and os.path.exists(output) else set()
+    if done:
+        logger.info(f'resuming. {len(done)} images already exported to {output}')
+
+    skipped = 0
+
+    def todo():
+        nonlocal skipped
+        for path in iter_image_files(roots, recursive):
+            if path in done:
+                skipped += 1
+            else:
+                yield path
+
+    jobs = jobs or os.cpu_count() or 1
+    writer = writer_class(output, append=bool(done))
+    exported = errors = 0
+    start = last_report = time.perf_counter()
+    pool = None
+    try:
+        if jobs == 1:
+            # parsed right here, so quiet the parsers here.
+            _quiet_parsers()
+            records = map(export_record, todo())
+        else:
+            pool = multiprocessing.Pool(jobs, initializer=_init_worker)
+            records = pool.imap_unordered(export_record, todo(), chunksize=CHUNK_SIZE)
+        for record in records:
+            writer.write(record)
+            exported += 1
+            errors += record['error'] is not None
+            now = time.perf_counter()
+            if now - last_report >= 1.0:
+                # flushed about once a second. a killed export loses at
+                # most that much and resume picks up from there.
+                writer.flush()
+                last_report = now
+                if progress:
+                    progress(exported, skipped, errors, now - start)
+    finally:
+        # every record is back by now, unless it was interrupted.
+        if pool is not None:
+            pool.terminate()
+        writer.close()
+    if progress:
+        progress(exported, skipped, errors, time.perf_counter() - start)
+    return exported, skipped, errors
+
+
+def main(argv=None):
+    """ command line. see LatentExport.py """
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='LatentExport',
+        description='Export the generation metadata of images to JSONL or CSV without starting the GUI.')
+    parser.add_argument('output', help='output file. .jsonl or .csv')
+    parser.add_argument('paths', nargs='+', help='directories (or image files) to export')
+    parser.add_argument('-f', '--format', choices=sorted(WRITERS), default=None,
+                        help='output format. default is from the output file extension, then jsonl')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='number of processes. default: all CPUs')
+    parser.add_argument('--no-recursive', action='store_true', help="don't go into sub directories")
+    parser.add_argument('--resume', action='store_true',
+                        help='skip the images already in the output file and append the rest')
+    parser.add_argument('--overwrite', action='store_true', help='replace the output file if it exists')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(module)s:%(lineno)s | %(message)s')
+    output_format = args.format or ('csv' if Path(args.output).suffix.lower() == '.csv' else 'jsonl')
+    if os.path.exists(args.output) and not (args.resume or args.overwrite):
+        parser.error(f'{args.output} exists. use --resume to add to it or --overwrite to replace it.')
+    def progress(exported, skipped, errors, elapsed):
+        rate = exported / elapsed if elapsed else 0
+        print(f'\r{exported} exported, {skipped} skipped, {errors} errors. {rate:.0f} images/s',
+              end='', file=sys.stderr, flush=True)
+
+    try:
+        exported, skipped, errors = export(args.paths, args.output, output_format, args.jobs,
+                                           not args.no_recursive, args.resume, progress)
+    except KeyboardInterrupt:
+        print('\ninterrupted. run again with --resume to finish.', file=sys.stderr)
+        return 130
+    print(file=sys.stderr)
+    return 1 if errors and not exported else 0
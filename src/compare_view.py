@@ -0,0 +1,197 @@
+# compare_view.py
+# Two to four images side by side with zoom and pan locked together.
+#
+# For picking the best of a batch. Each pane is an ImageView, the same
+# tiled view EyeSight uses, so every pane only draws the tiles it can see
+# and the tiles come from the one shared TileCache. The thumbnails are
+# shown right away and the images are decoded in the thread pool, all at
+# the same time.
+#
+# Zoom is relative to fitting the image in its pane, so images of
+# different sizes line up: 1.0 shows all of each image, 2.0 shows the
+# middle half. Panning one pane moves the others to the same spot, as a
+# fraction of the image.
+#
+# Date: Oct 2026
+
+import logging
+from pathlib import Path
+
+from PyQt6.QtCore import Qt, QDir, QPointF, QThreadPool
+from PyQt6.QtGui import QAction, QIcon, QKeySequence
+from PyQt6.QtWidgets import QGridLayout, QLabel, QMainWindow, QToolBar, QVBoxLayout, QWidget
+
+from .eye_sight import ImageView, MAX_SCALE
+from .image_loader import ImageLoader, image_size
+
+logger = logging.getLogger(__name__)
+
+MAX_IMAGES = 4
+ZOOM_STEP = 1.25
+
+
+class CompareView(QMainWindow):
+    """
+    Non-modal window comparing 2 to 4 images.
+    Args:
+        image_paths = list of str. FQPN of the images. Only the first
+                      MAX_IMAGES are used.
+        previews = dict of FQPN: QPixmap. thumbnails to show while the
+                   images load. optional.
+    """
+    def __init__(self, image_paths, previews=None, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        QDir.addSearchPath('icon', str(Path(__file__).parent / '../assets/icons/darkModeIcons'))
+        self.image_paths = list(image_paths)[:MAX_IMAGES]
+        previews = previews or {}
+        self.setWindowTitle('Compare - ' + ' / '.join(Path(p).name for p in self.image_paths))
+        self.resize(1400, 900)
+
+        # zoom relative to fit. see the top of the file.
+        self.zoom = 1.0
+        # where the panes are looking, as a fraction of the image.
+        self.center = QPointF(0.5, 0.5)
+        # stops a pane that is being moved by sync_from() from syncing back.
+        self.syncing = False
+        self.pyramids = {}
+        self.cancel_flag = [False]
+
+        grid = QGridLayout()
+        grid.setSpacing(4)
+        # 2 side by side, 3 in a row, 4 in a square.
+        columns = 2 if len(self.image_paths) in (2, 4) else len(self.image_paths)
+        self.panes = []
+        for i, image_path in enumerate(self.image_paths):
+            pane = ImageView(self)
+            pane.resized.connect(self.apply_view)
+            pane.horizontalScrollBar().valueChanged.connect(lambda _v, p=pane: self.sync_from(p))
+            pane.verticalScrollBar().valueChanged.connect(lambda _v, p=pane: self.sync_from(p))
+            preview = previews.get(image_path)
+            full_size = image_size(image_path)
+            if preview is not None and not preview.isNull() and full_size.isValid():
+                pane.set_preview(preview, full_size)
+            label = QLabel(Path(image_path).name)
+            label.setToolTip(image_path)
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            box = QWidget(self)
+            box_layout = QVBoxLayout(box)
+            box_layout.setContentsMargins(0, 0, 0, 0)
+            box_layout.addWidget(label)
+            box_layout.addWidget(pane, stretch=1)
+            grid.addWidget(box, i // columns, i % columns)
+            self.panes.append(pane)
+        central = QWidget(self)
+        central.setLayout(grid)
+        self.setCentralWidget(central)
+        self.init_toolbar()
+
+        # all of them at once. the thread pool runs as many as it has threads for.
+        for image_path in self.image_paths:
+            loader = ImageLoader(image_path, self.cancel_flag)
+            loader.signals.loaded.connect(self.image_loaded)
+            loader.signals.failed.connect(self.image_failed)
+            QThreadPool.globalInstance().start(loader)
+
+    def init_toolbar(self):
+        toolbar = QToolBar('Compare Toolbar', self)
+        toolbar.setStyleSheet('QToolBar { background: #37474F; spacing: 2px; border: none}')
+        self.addToolBar(Qt.ToolBarArea.TopToolBarArea, toolbar)
+        zoom_in_action = QAction(QIcon('icon:magnifying-glass-plus.svg'), 'Zoom In', self)
+        zoom_in_action.setShortcut(QKeySequence.StandardKey.ZoomIn)
+        zoom_in_action.triggered.connect(lambda: self.set_zoom(self.zoom * ZOOM_STEP))
+        zoom_out_action = QAction(QIcon('icon:magnifying-glass-minus.svg'), 'Zoom Out', self)
+        zoom_out_action.setShortcut(QKeySequence.StandardKey.ZoomOut)
+        zoom_out_action.triggered.connect(lambda: self.set_zoom(self.zoom / ZOOM_STEP))
+        fit_action = QAction(QIcon('icon:arrows-in.svg'), 'Fit To Window', self)
+        fit_action.setShortcut('Ctrl+R')
+        fit_action.triggered.connect(lambda: self.set_zoom(1.0))
+        actual_action = QAction(QIcon('icon:actual-size.svg'), 'Actual Size', self)
+        actual_action.triggered.connect(self.actual_size)
+        close_action = QAction(QIcon('icon:x-circle.svg'), 'Close', self)
+        close_action.setShortcut(QKeySequence.StandardKey.Close)
+        close_action.triggered.connect(self.close)
+        for action in (zoom_in_action, zoom_out_action, fit_action, actual_action, close_action):
+            toolbar.addAction(action)
+
+    def set_zoom(self, zoom):
+        """ zoom all the panes. 1.0 fits each image in its pane. """
+        # no pane goes past EyeSight's biggest zoom.
+        limit = min((MAX_SCALE / pane.fit_scale() for pane in self.panes if pane.fit_scale() > 0),
+                    default=MAX_SCALE)
+        self.zoom = max(1.0, min(zoom, limit))
+        self.apply_view()
+
+    def actual_size(self):
+        """ the first image at 100%. the others at the same relative zoom. """
+        if self.panes and self.panes[0].fit_scale() > 0:
+            self.set_zoom(1.0 / self.panes[0].fit_scale())
+
+    def apply_view(self):
+        """ put every pane at the shared zoom and center. """
+        self.syncing = True
+        try:
+            for pane in self.panes:
+                pane.set_scale(pane.fit_scale() * self.zoom)
+                rect = pane.sceneRect()
+                pane.centerOn(rect.left() + rect.width() * self.center.x(),
+                              rect.top() + rect.height() * self.center.y())
+        finally:
+            self.syncing = False
+
+    def sync_from(self, pane):
+        """ a pane was scrolled or dragged. move the others to match. """
+        if self.syncing:
+            return
+        rect = pane.sceneRect()
+        if rect.isEmpty():
+            return
+        middle = pane.mapToScene(pane.viewport().rect().center())
+        self.center = QPointF((middle.x() - rect.left()) / rect.width(),
+                              (middle.y() - rect.top()) / rect.height())
+        self.syncing = True
+        try:
+            for other in self.panes:
+                if other is not pane:
+                    other_rect = other.sceneRect()
+                    other.centerOn(other_rect.left() + other_rect.width() * self.center.x(),
+                                   other_rect.top() + other_rect.height() * self.center.y())
+        finally:
+            self.syncing = False
+
+    def image_loaded(self, pyramid, image_path):
+        if image_path not in self.image_paths or self.cancel_flag[0]:
+            pyramid.release()
+            return
+        self.pyramids[image_path] = pyramid
+        self.panes[self.image_paths.index(image_path)].set_pyramid(pyramid)
+        self.apply_view()
+        logger.debug(f'CompareView: loaded {image_path}')
+
+    def image_failed(self, image_path, error):
+        logger.error(f'CompareView: unable to load {image_path}: {error}')
+        if image_path in self.image_paths:
+            pane = self.panes[self.image_paths.index(image_path)]
+            pane.set_pyramid(None)
+            pane.scene().addText(f'Unable to load\n{Path(image_path).name}')
+
+    def wheelEvent(self, event):
+        """ Alt/Opt + Mouse Wheel zooms. same as EyeSight """
+        if event.modifiers() & Qt.KeyboardModifier.AltModifier:
+            delta = event.angleDelta().y() or event.angleDelta().x()
+            if delta > 0:
+                self.set_zoom(self.zoom * ZOOM_STEP)
+            elif delta < 0:
+                self.set_zoom(self.zoom / ZOOM_STEP)
+        else:
+            super().wheelEvent(event)
+
+    def closeEvent(self, event):
+        """ stop the loads and give back the images. """
+        self.cancel_flag[0] = True
+        for pane in self.panes:
+            pane.set_pyramid(None)
+        for pyramid in self.pyramids.values():
+            pyramid.release()
+        self.pyramids.clear()
+        super().closeEvent(event)
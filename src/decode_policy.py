@@ -0,0 +1,311 @@
+# decode_policy.py
+# How big an image LatentEye will decode, and at what size.
+#
+# sort_image_files() used to call QImageReader.setAllocationLimit(0) so
+# that big upscales could be opened. That took the limit off for every
+# decode in the process: one huge, or broken, image could make a
+# thumbnail worker or EyeSight allocate gigabytes.
+#
+# Now the size of every image is read from its header first and:
+#   - the allocation limit stays on, just higher than Qt's default.
+#   - thumbnails are decoded at reduced size where the format allows.
+#     JPEG decodes straight to the smaller size. PNGs at least twice the
+#     thumbnail size are decoded in bands at 1/2, 1/4... size (see
+#     png_bands.py) and then scaled. Everything else, WebP and the PNGs
+#     that can't be banded, is decoded at full size and scaled after, so
+#     those still need the full size image for a moment and fail over
+#     the allocation limit.
+#   - EyeSight decodes the whole image only if it fits view_budget.
+#     Bigger images are decoded at 1/2, 1/4... size, whichever is the
+#     biggest that fits, and if the format can decode part of an image
+#     (JPEG can) the full resolution is decoded tile by tile as it is
+#     zoomed into. see ImagePyramid and RegionLoader in image_pyramid.py
+#   - process_memory() so the app can say how much memory it's using.
+#
+# What a decode for EyeSight really takes at its peak depends on the format:
+#   - JPEG decodes straight to the smaller size. The peak is the decoded
+#     image, never more than view_budget.
+#   - Qt can't decode PNG smaller, it would decode the whole image and
+#     scale it after. 8 bit, not interlaced, PNGs (what the AI tools
+#     write) are decoded in bands instead, see png_bands.py. The peak is
+#     the decoded image plus about 2 x png_bands.BAND_BYTES.
+#   - everything else, WebP and the PNGs that can't be banded, is decoded
+#     at full size and then scaled. The peak is the full size image plus
+#     the scaled one, and it fails if the full size image is over the
+#     allocation limit.
+#
+# Both limits are in the user's settings.ini (see user_settings()) and
+# the view budget can be changed from View > EyeSight Memory Budget.
+#
+# Date: Oct 2026
+
+import logging
+import math
+import sys
+
+from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtGui import QImage, QImageIOHandler, QImageReader
+
+from .latent_tools import Settings, user_settings
+from .perf import span
+from .png_bands import read_png_scaled
+
+logger = logging.getLogger(__name__)
+
+# most memory, in MB, Qt may allocate for one image. Qt's default is
+# 256 MB which is a 8192x8192 image. 1024 MB is 16384x16384.
+ALLOCATION_LIMIT_MB = 1024
+# most memory for the image EyeSight decodes, 4 bytes a pixel.
+# 512 MB is 128 megapixels, about 11500x11500.
+VIEW_BUDGET_BYTES = 512 * 1024 * 1024
+# smallest view budget that can be set, in MB. 64 MB is 4096x4096.
+MIN_VIEW_BUDGET_MB = 64
+# band size for PNG thumbnails. Smaller than for EyeSight, there can be a
+# thumbnail worker on every core.
+THUMBNAIL_BAND_BYTES = 4 * 1024 * 1024
+
+
+class DecodePolicy:
+    """
+    Decides how an image is decoded. One instance for the app, made from
+    the user's settings, see instance(). install() puts the allocation
+    limit in place.
+    Args:
+        allocation_limit_mb = int. Qt allocation limit for one image. Never
+                              less than the view budget, an image that fits
+                              the budget is decoded at full size.
+        view_budget = int. bytes EyeSight may use for one decoded image.
+    """
+    _instance = None
+
+    def __init__(self, allocation_limit_mb=ALLOCATION_LIMIT_MB, view_budget=VIEW_BUDGET_BYTES):
+        self.view_budget = max(view_budget, MIN_VIEW_BUDGET_MB << 20)
+        self.allocation_limit_mb = max(allocation_limit_mb, self.view_budget >> 20)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls.from_settings()
+        return cls._instance
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """
+        A DecodePolicy with the limits in the user's settings. The defaults
+        are written back so they are there to be edited.
+        Args: settings = QSettings. default is user_settings()
+        """
+        settings = settings if settings is not None else user_settings()
+        values = {}
+        for key, default in ((Settings.ALLOCATION_LIMIT_MB, ALLOCATION_LIMIT_MB),
+                             (Settings.VIEW_BUDGET_MB, VIEW_BUDGET_BYTES >> 20)):
+            try:
+                values[key] = int(settings.value(key, default))
+            except (TypeError, ValueError):
+                logger.warning(f'DecodePolicy: {key} in {settings.fileName()} is not a number. using {default}')
+                values[key] = default
+            if not settings.contains(key):
+                settings.setValue(key, default)
+        return cls(values[Settings.ALLOCATION_LIMIT_MB], values[Settings.VIEW_BUDGET_MB] << 20)
+
+    def set_view_budget_mb(self, budget_mb, settings=None):
+        """
+        Change the view budget and save it in the user's settings. The
+        allocation limit goes up with it if needed. Images already decoded
+        keep the size they were decoded at.
+        Args:
+            budget_mb = int. the new budget in MB.
+            settings = QSettings. default is user_settings()
+        """
+        self.view_budget = max(budget_mb, MIN_VIEW_BUDGET_MB) << 20
+        self.allocation_limit_mb = max(self.allocation_limit_mb, self.view_budget >> 20)
+        settings = settings if settings is not None else user_settings()
+        settings.setValue(Settings.VIEW_BUDGET_MB, self.view_budget >> 20)
+        settings.setValue(Settings.ALLOCATION_LIMIT_MB, self.allocation_limit_mb)
+        self.install()
+
+    def install(self):
+        """ set Qt's allocation limit. Call once at start up. """
+        QImageReader.setAllocationLimit(self.allocation_limit_mb)
+        logger.debug(f'DecodePolicy: allocation limit {self.allocation_limit_mb} MB, '
+                     f'view budget {self.view_budget >> 20} MB')
+
+    @staticmethod
+    def reader(image_path):
+        """ QImageReader for an image with EXIF rotation turned on. """
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        return reader
+
+    @staticmethod
+    def header_size(reader):
+        """
+        Size of the image from its header, without decoding it. EXIF
+        rotation is taken into account so it's the size it will be shown at.
+        Returns: QSize. Invalid if the file can't be read.
+        """
+        size = reader.size()
+        if size.isValid() and reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+            size = QSize(size.height(), size.width())
+        return size
+
+    def view_level(self, size):
+        """
+        The pyramid level EyeSight decodes an image of this size at. 0 is
+        full size, 1 is half size and so on. The biggest that fits view_budget.
+        """
+        pixels = size.width() * size.height()
+        if pixels * 4 <= self.view_budget:
+            return 0
+        return math.ceil(math.log2(pixels * 4 / self.view_budget) / 2)
+
+    def view_bytes(self, size):
+        """ memory the decoded image will take in EyeSight. """
+        if not size.isValid():
+            return 0
+        return size.width() * size.height() * 4 // (4 ** self.view_level(size))
+
+    def read_thumbnail(self, image_path, size):
+        """
+        Decode an image at thumbnail size. For an animated WebP or GIF it's
+        the first frame, only that frame is decoded.
+        Args:
+            image_path = str. FQPN of the image.
+            size = QSize. the thumbnail has to fit in this.
+        Returns: QImage. null if it can't be read. reader.errorString() is logged.
+        """
+        with span('thumbnail read', image_path):
+            reader = self.reader(image_path)
+            full = self.header_size(reader)
+        if (full.isValid() and not reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize)
+                and reader.transformation() == QImageIOHandler.Transformation.TransformationNone):
+            # setScaledSize() would decode it at full size then scale it.
+            # the biggest 1/2, 1/4... size that is still no smaller than the thumbnail.
+            ratio = max(full.width() / max(size.width(), 1), full.height() / max(size.height(), 1))
+            level = int(math.log2(ratio)) if ratio >= 2 else 0
+            if level:
+                try:
+                    with span('thumbnail decode', image_path):
+                        image = read_png_scaled(image_path, level, THUMBNAIL_BAND_BYTES)
+                except (OSError, ValueError) as e:
+                    logger.warning(f'read_thumbnail(): unable to read {image_path}: {e}')
+                    return QImage()
+                if image is not None:
+                    # to the size from the header, the banded image lost the odd rows.
+                    return image.scaled(full.scaled(size, Qt.AspectRatioMode.KeepAspectRatio),
+                                        Qt.AspectRatioMode.IgnoreAspectRatio,
+                                        Qt.TransformationMode.SmoothTransformation)
+        if full.isValid():
+            scaled = full.scaled(size, Qt.AspectRatioMode.KeepAspectRatio)
+            if scaled.width() < full.width():
+                # the scaled size is set before the rotation is applied.
+                if full != reader.size():
+                    scaled = scaled.transposed()
+                reader.setScaledSize(scaled.expandedTo(QSize(1, 1)))
+        # one read() is one frame. The first is the only frame of an
+        # animation that is a whole picture on its own, the rest are mostly
+        # drawn over the frame before and would mean decoding those too.
+        # it's scaled while it's decoded. see setScaledSize() above.
+        with span('thumbnail decode', image_path):
+            image = reader.read()
+        if image.isNull():
+            logger.warning(f'read_thumbnail(): unable to read {image_path}: {reader.errorString()}')
+        return image
+
+    def read_for_view(self, image_path):
+        """
+        Decode an image for EyeSight at the biggest size that fits the
+        view budget. How much memory that takes while it's decoding
+        depends on the format, see the top of the file.
+        Returns: (QImage, QSize full size, int level). level is the pyramid
+                 level the image was decoded at. 0 for full size.
+        Raises: ValueError if it can't be read.
+        """
+        reader = self.reader(image_path)
+        full = self.header_size(reader)
+        level = self.view_level(full) if full.isValid() else 0
+        if level:
+            logger.info(f'read_for_view(): {image_path} is {full.width()}x{full.height()}. '
+                        f'Decoding at 1/{1 << level} size to fit {self.view_budget >> 20} MB')
+            if (not reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize)
+                    and reader.transformation() == QImageIOHandler.Transformation.TransformationNone):
+                # Qt would decode it at full size first. see png_bands.py
+                try:
+                    image = read_png_scaled(image_path, level)
+                except OSError as e:
+                    raise ValueError(f'Unable to Load {image_path}. {e}') from e
+                if image is not None:
+                    return image, full, level
+                logger.info(f'read_for_view(): {image_path} is decoded at full size then scaled. '
+                            f'{full.width() * full.height() * 4 >> 20} MB while decoding')
+            scaled = QSize(max(full.width() >> level, 1), max(full.height() >> level, 1))
+            if full != reader.size():
+                scaled = scaled.transposed()
+            reader.setScaledSize(scaled)
+        image = reader.read()
+        if image.isNull():
+            raise ValueError(f'Unable to Load {image_path}. {reader.errorString()}')
+        if not full.isValid():
+            full = image.size()
+        return image, full, level
+
+    def can_read_regions(self, image_path):
+        """
+        True if part of the image can be decoded without decoding the rest.
+        Rotated or flipped images are left out, the clip rect would be in
+        file coordinates.
+        """
+        reader = QImageReader(image_path)
+        return (reader.supportsOption(QImageIOHandler.ImageOption.ClipRect)
+                and reader.transformation() == QImageIOHandler.Transformation.TransformationNone)
+
+    @staticmethod
+    def read_region(image_path, rect, size):
+        """
+        Decode part of an image.
+        Args:
+            rect = QRect. the part to decode, in full size pixels.
+            size = QSize. size to decode it at.
+        Returns: QImage. null if it can't be read.
+        """
+        reader = QImageReader(image_path)
+        reader.setClipRect(rect)
+        if size != rect.size():
+            reader.setScaledSize(size)
+        return reader.read()
+
+
+def process_memory():
+    """
+    Memory the process is using (resident set size) in bytes.
+    On macOS it's the most it has used so far.
+    Returns: int or None if it can't be found out.
+    """
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) * 1024
+        elif sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class Counters(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+            counters = Counters()
+            counters.cb = ctypes.sizeof(Counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        else:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (OSError, ValueError, AttributeError, ImportError) as e:
+        logger.debug(f'process_memory(): {e}')
+    return None
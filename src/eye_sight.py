@@ -12,33 +12,193 @@
 #
 # Usage: pass in tooltip from thumbnail which is the fully qualified filename.
 # so.. something like es = EyeSight(filename)
+#
+# Oct 2026: the image is drawn by a QGraphicsView from a tiled image
+# pyramid (see image_pyramid.py). Zooming changes the view transform
+# instead of rescaling the whole image, and only the tiles on screen are
+# drawn, from the level that matches the zoom.
+# The window opens right away with the thumbnail scaled up while the full
+# image is decoded in the background. see image_loader.py
+# Left and Right step through the images in the order the thumbnail view
+# shows them. The images on either side are decoded ahead of time.
+# Images are opened through EyeSightManager. It reuses one viewer unless
+# multiple windows are turned on, and keeps the decoded images of all
+# the windows under one budget.
+# Animated WebPs and GIFs play. Their frames are decoded as they are
+# needed, see animation.py. Space pauses and plays.
 
 import logging
 # import platform
 import sys
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QDir, QFileInfo, QPoint
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QScrollArea,
-                             QWidget, QMenuBar, QToolBar, QMessageBox, QDialog,
-                             QDialogButtonBox, QPushButton, QLabel)
-
-from PyQt6.QtGui import QPixmap, QPalette, QAction, QIcon, QKeySequence, QWheelEvent
+from PyQt6.QtCore import (Qt, QDir, QEvent, QFileInfo, QPoint, QRectF, QSize, QThreadPool, QTimer,
+                          pyqtSignal)
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QGraphicsPixmapItem,
+                             QGraphicsScene, QGraphicsView, QWidget, QMenuBar, QToolBar, QMessageBox,
+                             QDialog, QDialogButtonBox, QPushButton, QLabel)
+
+from PyQt6.QtGui import (QPalette, QAction, QIcon, QKeySequence, QPixmap,
+                         QTransform, QWheelEvent)
+from .animation import AnimationPlayer, is_animated
+from .image_loader import DecodedImageCache, ImageLoader, estimated_bytes, image_size
+from .image_pyramid import TiledImageItem
 from .metadatatable import MetadataTable
 from .latent_tools import Settings, clipboard_copy
+from .perf import PerfStats, hit, span
 
 logger = logging.getLogger(__name__)
 
+MAX_SCALE = 6.0
+MIN_SCALE = 0.333
+# images decoded ahead of the current one, in the direction of travel,
+# and behind it.
+PREFETCH_AHEAD = 2
+PREFETCH_BEHIND = 1
+# thread pool priority of the image that's showing. prefetches are 0.
+CURRENT_PRIORITY = 1
+# decoded pixels all the EyeSight windows can hold. about 1 GB.
+# see EyeSightManager
+WINDOW_PIXEL_BUDGET = 256 * 1024 * 1024
+# ms without a resize before the image is redrawn smooth. see ImageView.resizeEvent()
+RESIZE_SETTLE_MS = 150
+
+
+class ImageView(QGraphicsView):
+    """
+    The picture part of EyeSight. A QGraphicsView showing one
+    TiledImageItem, or a preview until the image is loaded, or the
+    frames of an AnimationPlayer.
+    Drag to pan. Zoom is the view transform.
+    """
+    # the viewport changed size. The main window's resizeEvent comes
+    # before its layout has resized the view, so fitting is done on this.
+    resized = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.image_item = None
+        self.player = None
+        self.setBackgroundRole(QPalette.ColorRole.Dark)
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        # the tiles are opaque and don't overlap. no need to redraw what's
+        # under them or to leave room for antialiasing.
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
+        # one smooth redraw once the window stops changing size.
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(RESIZE_SETTLE_MS)
+        self.settle_timer.timeout.connect(self.resize_settled)
+
+    def clear_image(self):
+        if isinstance(self.image_item, TiledImageItem):
+            self.image_item.cancel()
+        if self.player is not None:
+            self.player.close()
+            self.player.frame_changed.disconnect(self.show_frame)
+            self.player = None
+        self.scene().clear()
+        self.image_item = None
+
+    def set_pyramid(self, pyramid):
+        """ show an ImagePyramid. None clears the view. """
+        self.clear_image()
+        if pyramid is None:
+            return
+        self.image_item = TiledImageItem(pyramid)
+        self.scene().addItem(self.image_item)
+        self.scene().setSceneRect(self.image_item.boundingRect())
+
+    def set_preview(self, pixmap, full_size):
+        """
+        show a small pixmap stretched to the size of the full image so
+        zoom and scroll are the same when the full image replaces it.
+        """
+        self.clear_image()
+        self.image_item = QGraphicsPixmapItem(pixmap)
+        self.image_item.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
+        self.image_item.setTransform(QTransform.fromScale(full_size.width() / pixmap.width(),
+                                                          full_size.height() / pixmap.height()))
+        self.scene().addItem(self.image_item)
+        self.scene().setSceneRect(QRectF(0, 0, full_size.width(), full_size.height()))
+
+    def set_animation(self, player, preview=None):
+        """
+        show the frames of an AnimationPlayer. The view owns it from here
+        on and closes it when something else is shown. The preview, if
+        there is one, is stretched over it until the first frame is decoded.
+        """
+        if preview is not None and not preview.isNull() and player.size.isValid():
+            self.set_preview(preview, player.size)
+        else:
+            self.clear_image()
+            self.image_item = QGraphicsPixmapItem()
+            self.image_item.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
+            self.scene().addItem(self.image_item)
+            self.scene().setSceneRect(QRectF(0, 0, player.size.width(), player.size.height()))
+        self.player = player
+        player.frame_changed.connect(self.show_frame)
+
+    def show_frame(self, image):
+        self.image_item.setTransform(QTransform())
+        self.image_item.setPixmap(QPixmap.fromImage(image))
+
+    def scale_factor(self):
+        """ current zoom. 1.0 is full size """
+        return self.transform().m11()
+
+    def set_scale(self, scale):
+        self.setTransform(QTransform.fromScale(scale, scale))
+
+    def fit_scale(self):
+        """ the zoom that fits the whole image in the view """
+        if self.image_item is None:
+            return 1.0
+        rect = self.sceneRect()
+        viewport = self.viewport().size()
+        return min(viewport.width() / max(rect.width(), 1), viewport.height() / max(rect.height(), 1))
+
+    def resizeEvent(self, event):
+        # while the window edge is being dragged there can be a resize
+        # every few ms. draw quick and rough until it settles.
+        if isinstance(self.image_item, TiledImageItem):
+            self.image_item.set_fast(True)
+            self.settle_timer.start()
+        super().resizeEvent(event)
+        self.resized.emit()
+
+    def resize_settled(self):
+        if isinstance(self.image_item, TiledImageItem):
+            self.image_item.set_fast(False)
+
+    def wheelEvent(self, event):
+        # let EyeSight have the zoom wheel events. see EyeSight.wheelEvent()
+        if event.modifiers() & Qt.KeyboardModifier.AltModifier:
+            event.ignore()
+            return
+        super().wheelEvent(event)
+
+
 class EyeSight(QMainWindow):
     """
     EyeSight: a vision of the selected thumbnail.
     It will appear as a non-modal window.
     """
     # image path = fqpn of image
-    def __init__(self, image_path):
+    def __init__(self, image_path, preview=None, image_list=None, previews=None):
         """
         Create EyeSight with the given image path.
         Args: (str) - FQPN of the image to see.
+              (QPixmap) - thumbnail shown until the image is loaded. optional.
+              (list[str]) - images to step through with next and previous,
+                            in order. image_path should be one of them. optional.
+              (dict) - FQPN: QPixmap thumbnails of the images in image_list. optional.
         """
 
         super().__init__()
@@ -49,41 +209,44 @@ class EyeSight(QMainWindow):
         QDir.addSearchPath('icon', str(Path(__file__).parent / '../assets/icons/darkModeIcons'))
         self.picture_path = image_path
         logger.debug(f'__init__(): picture_path = {self.picture_path} ')
-        _title = "EyeSight - " + image_path
-        self.setWindowTitle(f'{_title}')
+        # next / previous. see show_image()
+        self.set_image_list(image_path, image_list, previews)
         self.setMinimumSize(1024, 1024)
 
-        logger.debug('__init__(): set scroll area')
-        #Scroll Area Properties
-        self.pic_scroll = QScrollArea(self)
-        self.pic_scroll.setBackgroundRole(QPalette.ColorRole.Dark)
-        self.pic_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.pic_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.pic_scroll.setWidgetResizable(True)
-        self.setCentralWidget(self.pic_scroll)
+        logger.debug('__init__(): set image view')
+        self.pic_view = ImageView(self)
+        self.pic_view.resized.connect(self.view_resized)
         es_layout = QWidget(self)
         layout = QVBoxLayout(es_layout)
         # layout.setContentsMargins(0, 0, 0, 0)
-        layout.addWidget(self.pic_scroll)
+        layout.addWidget(self.pic_view)
         self.setCentralWidget(es_layout)
 
         # default image scale factor.
         self.scale_factor = 1.0
-
-        # Create the Image Label
-        self.pixmap = None
-        # self.scale_factor
-        self.lbl_pict = QLabel(self)
+        # the image is fitted to the window until it's zoomed.
+        self.auto_fit = True
+        # the decoded images were given back. see release_to_preview()
+        self.released = False
+
+        # the image and its smaller levels. see image_pyramid.py
+        self.pyramid = None
+        # path: cancel flag of the ImageLoaders that are running. see request_image()
+        self.loading = {}
+        # decoded images around the current one. see prefetch()
+        self.cache = DecodedImageCache()
+        # shown in place of the image when it can't be loaded.
+        self.lbl_pict = QLabel(self.pic_view)
         self.lbl_pict.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.pic_scroll.setWidget(self.lbl_pict)
-        self.pic_scroll.setWidgetResizable(True)
+        self.lbl_pict.hide()
 
         # setup the menubar and toolbar
         self.init_menubar()
         self.init_toolbar()
 
+        self.update_nav_actions()
         # Load and display the image
-        self.load_image(self.picture_path)
+        self.load_image(self.picture_path, preview)
 
     def init_menubar(self):
         """
@@ -110,6 +273,28 @@ class EyeSight(QMainWindow):
         md_action = QAction("Show image metadata", self)
         md_action.triggered.connect(lambda: self.get_image_data(self.picture_path))
         view_menu.addAction(md_action)
+
+        view_menu.addSeparator()
+        self.prev_action = QAction("Previous Image", self)
+        self.prev_action.setShortcut(QKeySequence(Qt.Key.Key_Left))
+        self.prev_action.triggered.connect(self.previous_image)
+        view_menu.addAction(self.prev_action)
+        self.next_action = QAction("Next Image", self)
+        self.next_action.setShortcut(QKeySequence(Qt.Key.Key_Right))
+        self.next_action.triggered.connect(self.next_image)
+        view_menu.addAction(self.next_action)
+
+        self.play_action = QAction("Play / Pause Animation", self)
+        self.play_action.setShortcut(QKeySequence(Qt.Key.Key_Space))
+        self.play_action.setEnabled(False)
+        self.play_action.triggered.connect(self.toggle_animation)
+        view_menu.addAction(self.play_action)
+
+        view_menu.addSeparator()
+        self.multi_window_action = QAction("Open Images in New Windows", self, checkable=True)
+        self.multi_window_action.setChecked(EyeSightManager.instance().multi_window)
+        self.multi_window_action.triggered.connect(EyeSightManager.instance().set_multi_window)
+        view_menu.addAction(self.multi_window_action)
         pw_menu.show()
 
         logger.debug('leaving init_menubar()')
@@ -207,10 +392,9 @@ class EyeSight(QMainWindow):
         # get the SD data embedded in the image
         # mdt is, of course, Meta. Data. Table.
         mdt = MetadataTable()
-        md_table = mdt.get_metadata_table(file_path)
-        if md_table:
+        if mdt.show_image(file_path):
             logger.debug('get_image_data(): MDT populated')
-            self.show_metadata_dialog(md_table)
+            self.show_metadata_dialog(mdt)
         else:
             logger.debug('get_image_data(): No image metadata')
             self.show_metadata_error()
@@ -223,7 +407,7 @@ class EyeSight(QMainWindow):
         in metadata_view.py
 
         Args: metadata table -
-                a QTableWidget with the image metadata
+                a MetadataTable with the image metadata
         """
 
         logger.debug('entering show_metadata_dialog()')
@@ -237,14 +421,12 @@ class EyeSight(QMainWindow):
         self.bbox = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
         self.bbox.addButton(self.copy_btn, QDialogButtonBox.ButtonRole.ActionRole)
         self.bbox.accepted.connect(dlg.accept)
-        self.copy_btn.clicked.connect(lambda: clipboard_copy(self.populated_table))
+        self.copy_btn.clicked.connect(lambda: clipboard_copy(self.picture_path, self.populated_table.metadata))
 
         col_width = 625
         self.populated_table.setWordWrap(True)
         self.populated_table.horizontalHeader().SizeAdjustPolicy.AdjustToContents
         self.populated_table.setColumnWidth(1, col_width)
-        self.populated_table.resizeRowToContents(0)
-        self.populated_table.resizeRowToContents(1)
 
         dlg_layout = QVBoxLayout()
         logger.debug('show_metadata_dialog(): initialized dlg layout')
@@ -301,19 +483,23 @@ class EyeSight(QMainWindow):
 
     def normal_size(self):
         # Reset image to original size
-        if not self.pixmap:
+        if self.pic_view.image_item is None:
             return
+        self.auto_fit = False
+        self.scale_factor = 1.0
+        self.pic_view.set_scale(self.scale_factor)
+        self.update_zoom_actions()
 
-        self.scale_image(1.25)
-        self.lbl_pict.setPixmap(self.pixmap.scaled(self.pixmap.size(),
-                            Qt.AspectRatioMode.KeepAspectRatio,
-                            Qt.TransformationMode.SmoothTransformation
-                        ))
-        self.lbl_pict.adjustSize()
+    def fit_image(self):
+        """ zoom so the whole image is in the window. """
+        if self.pic_view.image_item is None:
+            return
+        self.scale_factor = self.pic_view.fit_scale()
+        self.pic_view.set_scale(self.scale_factor)
 
     def fit_to_window(self):
         """ Toggle the "Fit to Window" mode, adjusting the image display accordingly. """
-        if not self.pixmap:
+        if self.pic_view.image_item is None:
             return
 
         fit_win_checked = self.fit_win.isChecked()
@@ -321,13 +507,7 @@ class EyeSight(QMainWindow):
             self.fit_win.setIcon(QIcon('icon:toggle-on.svg'))
             logger.debug('Fit to Window checked')
             self.pw_toolbar.activateWindow()
-            viewport_size = self.pic_scroll.viewport().size()
-            scaled = self.pixmap.scaled(viewport_size,
-                                Qt.AspectRatioMode.KeepAspectRatio,
-                                Qt.TransformationMode.SmoothTransformation
-                            )
-            self.lbl_pict.setPixmap(scaled)
-            self.lbl_pict.resize(scaled.size())
+            self.fit_image()
             # Disable zoom actions while fit mode is toggled
             self.image_zoom_in_action.setEnabled(False)
             self.image_zoom_out_action.setEnabled(False)
@@ -339,88 +519,269 @@ class EyeSight(QMainWindow):
             self.image_zoom_in_action.setEnabled(True)
             self.image_zoom_out_action.setEnabled(True)
 
+    def min_scale(self):
+        """ smallest zoom. a big image can always be zoomed out to fit. """
+        return min(MIN_SCALE, self.pic_view.fit_scale())
+
     def scale_image(self, factor):
         """
-        Scale the image based on zoom factor, maintaining aspect ratio and updating scrollbars.
+        Scale the image based on zoom factor, maintaining aspect ratio.
         This should only be called once per zoom action (button click or wheel event).
         Enables/disables zoom actions at max/min zoom.
+        Only the view transform changes. The view keeps its center and
+        the tiles are redrawn from the level that suits the new zoom.
         """
-        if not self.pixmap:
+        if self.pic_view.image_item is None:
             return
 
         # Update scale factor, clamp to allowed range
-        max_scale = 6.0
-        min_scale = 0.333
-        self.scale_factor *= factor
-        if self.scale_factor > max_scale:
-            self.scale_factor = max_scale
-        if self.scale_factor < min_scale:
-            self.scale_factor = min_scale
+        self.auto_fit = False
+        self.scale_factor = self.pic_view.scale_factor() * factor
+        self.scale_factor = max(self.min_scale(), min(self.scale_factor, MAX_SCALE))
 
         logger.debug(f'scale_image: factor: {factor} | scale factor {self.scale_factor}')
+        self.pic_view.set_scale(self.scale_factor)
+        self.update_zoom_actions()
 
-        new_size = self.scale_factor * self.pixmap.size()
-        scaled = self.pixmap.scaled(
-            new_size,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self.lbl_pict.setPixmap(scaled)
-        self.lbl_pict.resize(scaled.size())
-        self.adjust_scrollbar(self.pic_scroll.horizontalScrollBar(), factor)
-        self.adjust_scrollbar(self.pic_scroll.verticalScrollBar(), factor)
-
+    def update_zoom_actions(self):
         # Enable/disable zoom actions at limits
-        self.image_zoom_in_action.setEnabled(self.scale_factor < max_scale)
-        self.image_zoom_out_action.setEnabled(self.scale_factor > min_scale)
-
-    def adjust_scrollbar(self, scrollbar, factor):
-        # Center the view on zoom
-        scrollbar.setValue(int(factor * scrollbar.value() + ((factor - 1) * scrollbar.pageStep() / 2)))
+        self.image_zoom_in_action.setEnabled(self.scale_factor < MAX_SCALE)
+        self.image_zoom_out_action.setEnabled(self.scale_factor > self.min_scale())
 
-    def load_image(self, img_file):
+    def load_image(self, img_file, preview=None):
         """
-        Loads and displays an image. shows error message if unable to load
-        :param file_path: String. Fully qualified path to the image file.
-
-        called by Eyesight.__init__()
+        Show an image. If it was decoded ahead of time it's shown right
+        away. Otherwise the preview, if there is one, is shown scaled up to
+        the size of the image and the image itself is decoded by an
+        ImageLoader in the thread pool. See image_loaded().
+        shows error message if unable to load
+        :param img_file: String. Fully qualified path to the image file.
+        :param preview: QPixmap. the thumbnail of the image, or None.
+
+        called by Eyesight.__init__() and show_image()
         """
         logger.debug('start load_image()')
-        try:
-            self.pixmap = QPixmap(img_file)
-            if self.pixmap.isNull():
-                raise ValueError(f'Unable to Load {img_file}')
-        except Exception as ex:
-            logger.debug('Load_image() raised Exception. No SD metadata in image.')
-            self.lbl_pict.setText("OOPS....")
-
-            mbox = QMessageBox(self)
-            mbox.setIcon(QMessageBox.Icon.Critical)
-            mbox.setWindowTitle("I/O Error")
-            mbox.setText(f"Error loading image:\n{img_file}")
-            mbox.setInformativeText(f"Details:\n{ex}")
-            mbox.setStandardButtons(QMessageBox.StandardButton.Ok)
-            mbox.exec()
-            # Do I want a close here?
-            self.close()
+        self.picture_path = img_file
+        self.released = False
+        self.update_title()
+        self.lbl_pict.hide()
+        # loads that are still going for images that aren't near this one
+        # aren't wanted now.
+        self.cancel_loads(self.wanted_images())
+        self.play_action.setEnabled(False)
+        pyramid = self.cache.get(img_file)
+        if is_animated(img_file):
+            self.play_animation(img_file, preview)
+        elif pyramid is not None:
+            hit('decoded images', True)
+            self.show_pyramid(pyramid, fit=True)
         else:
-            logger.debug('load_image(): else of try..except ')
-            self.lbl_pict.setPixmap(
-                self.pixmap.scaled(
-                    self.size(),
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-            )
+            hit('decoded images', False)
+            full_size = image_size(img_file)
+            if preview is not None and not preview.isNull() and full_size.isValid():
+                self.pic_view.set_preview(preview, full_size)
+                self.fit_image()
+            else:
+                self.pic_view.set_pyramid(None)
+            self.pyramid = None
+            self.request_image(img_file, CURRENT_PRIORITY)
+        self.prefetch()
         logger.debug('exiting load_image()')
 
-    def adjust_scrollbar(self, scrollBar, factor):
+    def play_animation(self, img_file, preview=None):
+        """ show an animated image. the view decodes its frames as it plays. """
+        player = AnimationPlayer(img_file, parent=self)
+        player.failed.connect(self.image_failed)
+        self.pic_view.set_animation(player, preview)
+        self.pyramid = None
+        self.fit_image()
+        self.update_zoom_actions()
+        self.play_action.setEnabled(True)
+        player.play()
+
+    def toggle_animation(self):
+        if self.pic_view.player is not None:
+            self.pic_view.player.toggle()
+
+    def request_image(self, img_file, priority=0):
+        """ start an ImageLoader for an image, unless it's loaded or loading. """
+        if img_file in self.cache or img_file in self.loading:
+            return
+        cancel_flag = [False]
+        self.loading[img_file] = cancel_flag
+        loader = ImageLoader(img_file, cancel_flag)
+        loader.signals.loaded.connect(self.image_loaded)
+        loader.signals.failed.connect(self.image_failed)
+        QThreadPool.globalInstance().start(loader, priority)
+
+    def cancel_loads(self, keep=()):
+        """ cancel the ImageLoaders of every image not in keep. """
+        for img_file in [f for f in self.loading if f not in keep]:
+            self.loading.pop(img_file)[0] = True
+
+    def wanted_images(self):
+        """
+        The current image and its neighbors, in the order they are wanted.
+        The ones in the direction of travel come first.
+        """
+        wanted = [self.picture_path]
+        if self.image_index is None:
+            return wanted
+        step = self.direction
+        neighbors = [self.image_index + step * i for i in range(1, PREFETCH_AHEAD + 1)]
+        neighbors += [self.image_index - step * i for i in range(1, PREFETCH_BEHIND + 1)]
+        wanted += [self.image_list[i] for i in neighbors if 0 <= i < len(self.image_list)]
+        return wanted
+
+    def prefetch(self):
+        """
+        Decode the neighbors of the current image ahead of time, as many
+        as fit in the cache budget.
+        """
+        wanted = self.wanted_images()
+        self.cache.trim(wanted)
+        budget = self.cache.budget()
+        used = estimated_bytes(image_size(self.picture_path))
+        for img_file in wanted[1:]:
+            if is_animated(img_file):
+                # animations are decoded as they play. nothing to do ahead of time.
+                continue
+            pyramid = self.cache.get(img_file)
+            used += pyramid.byte_count() if pyramid else estimated_bytes(image_size(img_file))
+            if used > budget:
+                break
+            self.request_image(img_file)
+
+    def show_pyramid(self, pyramid, fit=False):
+        """ show a decoded image. """
+        self.pyramid = pyramid
+        # the scene rect is the same as the preview's so the zoom and
+        # scroll position stay where they are.
+        with span('eyesight show'):
+            self.pic_view.set_pyramid(self.pyramid)
+            if fit or self.auto_fit or self.fit_win.isChecked():
+                self.fit_image()
+        self.update_zoom_actions()
+
+    def image_loaded(self, pyramid, img_file):
+        """ an ImageLoader is done. swap the full image in for the preview. """
+        self.loading.pop(img_file, None)
+        if img_file not in self.wanted_images():
+            pyramid.release()
+            return
+        logger.debug(f'image_loaded(): {img_file}')
+        self.cache.put(img_file, pyramid)
+        if img_file == self.picture_path:
+            had_preview = self.pic_view.image_item is not None
+            self.show_pyramid(pyramid, fit=not had_preview)
+        self.cache.trim(self.wanted_images())
+        # this window holds more now. other windows may have to give some back.
+        EyeSightManager.instance().enforce_budget()
+
+    def image_failed(self, img_file, error):
+        """ shows error message if unable to load """
+        self.loading.pop(img_file, None)
+        if img_file != self.picture_path:
+            return
+        logger.debug('image_failed(): unable to load the image.')
+        self.pic_view.set_pyramid(None)
+        self.lbl_pict.setText("OOPS....")
+        self.lbl_pict.adjustSize()
+        self.lbl_pict.show()
+
+        mbox = QMessageBox(self)
+        mbox.setIcon(QMessageBox.Icon.Critical)
+        mbox.setWindowTitle("I/O Error")
+        mbox.setText(f"Error loading image:\n{img_file}")
+        mbox.setInformativeText(f"Details:\n{error}")
+        mbox.setStandardButtons(QMessageBox.StandardButton.Ok)
+        mbox.exec()
+        # Do I want a close here? Not if there are other images to go to.
+        if len(self.image_list) < 2:
+            self.close()
+
+    def show_image(self, index):
+        """ show the image at a position in image_list. """
+        if not 0 <= index < len(self.image_list):
+            return
+        self.direction = 1 if self.image_index is None or index >= self.image_index else -1
+        self.image_index = index
+        self.auto_fit = True
+        img_file = self.image_list[index]
+        self.load_image(img_file, self.previews.get(img_file))
+        self.update_nav_actions()
+
+    def set_image_list(self, image_path, image_list=None, previews=None):
+        """ the images to step through with next and previous. see __init__() """
+        self.image_list = list(image_list or [])
+        self.previews = previews or {}
+        self.image_index = self.image_list.index(image_path) if image_path in self.image_list else None
+        self.direction = 1
+        self.auto_fit = True
+
+    def decoded_pixels(self):
+        """ pixels of the decoded images this window holds, the smaller levels included. """
+        held = self.cache.byte_count()
+        if self.pic_view.player is not None:
+            held += self.pic_view.player.byte_count()
+        return held // 4
+
+    def release_to_preview(self):
         """
-        Adjust the scrollbar position based on the zoom level
-        Args: what QScrollBar to adjust, zoom factor
+        Give up the decoded images and show a small preview of the image
+        instead. restore() loads it again. Used by EyeSightManager.
         """
-        scrollBar.setValue(int(factor * scrollBar.value()
-                               + ((factor - 1) * scrollBar.pageStep() / 2)))
+        if self.released:
+            return
+        self.released = True
+        self.cancel_loads()
+        if self.pic_view.player is not None:
+            # the frame that's showing stays. play() decodes them again.
+            self.pic_view.player.release()
+        preview = self.previews.get(self.picture_path)
+        if (preview is None or preview.isNull()) and self.pyramid is not None:
+            # no thumbnail. the smallest level of the image is about the same.
+            preview = QPixmap.fromImage(self.pyramid.level(self.pyramid.level_count - 1))
+        if preview is not None and not preview.isNull() and self.pyramid is not None:
+            # the scene rect stays the same so the zoom and scroll position do too.
+            self.pic_view.set_preview(preview, QSize(self.pyramid.width, self.pyramid.height))
+        self.pyramid = None
+        self.cache.clear()
+
+    def restore(self):
+        """ load the image again after release_to_preview() """
+        if not self.released:
+            return
+        self.released = False
+        if self.pic_view.player is not None:
+            self.pic_view.player.play()
+        else:
+            self.request_image(self.picture_path, CURRENT_PRIORITY)
+        self.prefetch()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow():
+            EyeSightManager.instance().touch(self)
+        super().changeEvent(event)
+
+    def next_image(self):
+        if self.image_index is not None:
+            self.show_image(self.image_index + 1)
+
+    def previous_image(self):
+        if self.image_index is not None:
+            self.show_image(self.image_index - 1)
+
+    def update_nav_actions(self):
+        index = -1 if self.image_index is None else self.image_index
+        self.next_action.setEnabled(0 <= index < len(self.image_list) - 1)
+        self.prev_action.setEnabled(index > 0)
+
+    def update_title(self):
+        _title = "EyeSight - " + self.picture_path
+        if self.image_index is not None:
+            _title += f'  ({self.image_index + 1} of {len(self.image_list)})'
+        self.setWindowTitle(_title)
 
     def wheelEvent(self, event: QWheelEvent):
         """ Handles QWheelEvent - zooming with Alt/Opt + Mouse Wheel """
@@ -440,18 +801,106 @@ class EyeSight(QMainWindow):
         else:   # if its not Mac, its either Linux or Windows.
             return modifiers & Qt.KeyboardModifier.AltModifier
 
-    def resizeEvent(self, event):
-        if self.fit_win.isChecked():
-            self.fit_to_window()
-        super().resizeEvent(event)
+    def view_resized(self):
+        if self.fit_win.isChecked() or self.auto_fit:
+            self.fit_image()
 
     def closeEvent(self, event):
         """
-        Explicitly delete the pixmap to free memory
+        Explicitly delete the image and its tiles to free memory
         and Cleanup resources when the window is closed.
         when close even triggered.
         """
-        self.pixmap = None
+        self.cancel_loads()
+        self.pic_view.set_pyramid(None)
+        if self.pyramid:
+            self.pyramid.release()
+        self.pyramid = None
+        self.cache.clear()
         self.lbl_pict.clear()
+        EyeSightManager.instance().closed(self)
         self.deleteLater()
         super().closeEvent(event)
+
+
+class EyeSightManager:
+    """
+    Keeps track of the EyeSight windows.
+    By default there is one viewer and opening an image shows it in that
+    viewer. With multi_window on, each image gets a new window. Either
+    way, the decoded images of all the windows share one pixel budget.
+    When the windows go over it, the least recently used windows give
+    their decoded images back and show a preview until they're used again.
+    """
+    _instance = None
+
+    def __init__(self, pixel_budget=WINDOW_PIXEL_BUDGET):
+        self.pixel_budget = pixel_budget
+        self.multi_window = False
+        # least recently used first.
+        self.windows = []
+        PerfStats.instance().add_gauge('EyeSight images loading',
+                                       lambda: sum(len(window.loading) for window in self.windows))
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def open(self, image_path, preview=None, image_list=None, previews=None):
+        """
+        Show an image in EyeSight. Same arguments as EyeSight().
+        Returns: the EyeSight window showing it.
+        """
+        if self.windows and not self.multi_window:
+            viewer = self.windows[-1]
+            viewer.set_image_list(image_path, image_list, previews)
+            viewer.load_image(image_path, preview)
+            viewer.update_nav_actions()
+        else:
+            viewer = EyeSight(image_path, preview, image_list, previews)
+            self.windows.append(viewer)
+        viewer.show()
+        viewer.raise_()
+        viewer.activateWindow()
+        self.touch(viewer)
+        return viewer
+
+    def set_multi_window(self, checked):
+        """ open each image in a new window, or reuse the viewer. """
+        self.multi_window = bool(checked)
+        for window in self.windows:
+            window.multi_window_action.setChecked(self.multi_window)
+
+    def touch(self, window):
+        """ a window was used. it's the most recently used now. """
+        if window not in self.windows:
+            return
+        self.windows.remove(window)
+        self.windows.append(window)
+        window.restore()
+        self.enforce_budget()
+
+    def closed(self, window):
+        if window in self.windows:
+            self.windows.remove(window)
+
+    def decoded_pixels(self):
+        return sum(window.decoded_pixels() for window in self.windows)
+
+    def enforce_budget(self):
+        """
+        Make the least recently used windows give up their decoded images
+        until the windows fit in the pixel budget. The most recently used
+        window always keeps its images.
+        """
+        total = self.decoded_pixels()
+        for window in self.windows[:-1]:
+            if total <= self.pixel_budget:
+                break
+            pixels = window.decoded_pixels()
+            if pixels:
+                logger.debug(f'enforce_budget(): releasing {pixels} pixels of {window.picture_path}')
+                window.release_to_preview()
+                total -= pixels
@@ -7,15 +7,18 @@
 
 import sys
 import logging
+import time
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QDir, QStorageInfo, pyqtSignal
+from PyQt6.QtCore import Qt, QDir, QDirIterator, QStorageInfo, QTimer, pyqtSignal
 from PyQt6.QtWidgets import QTreeView, QVBoxLayout, QWidget, QLabel, QComboBox
 from PyQt6.QtGui import QFileSystemModel, QColor, QFont, QIcon
 
 # # Set up logging
 logger = logging.getLogger(__name__)
 
+# seconds a directory's "has images" is remembered. see CustomFileSystemModel.has_images()
+HAS_IMAGES_TTL = 10.0
 
 class CustomFileSystemModel(QFileSystemModel):
     """
@@ -31,6 +34,25 @@ class CustomFileSystemModel(QFileSystemModel):
         # imho, pathlib.Path doesn't make this path easier to read and it has to be wrapped in str.
         # this allegedly is progress... smh.
         QDir.addSearchPath('icon', str(Path(__file__).parent.parent / 'assets/icons/darkModeIcons'))
+        # path: (has images, time checked)
+        self._has_images = {}
+
+    def has_images(self, dir_path):
+        """
+        True if the directory has a file that matches the name filters.
+        data() is called for every role of every visible directory on
+        every repaint. Listing the directory each time made the first
+        paint of the window take a quarter of a second, so the answer is
+        remembered for HAS_IMAGES_TTL seconds and the listing stops at
+        the first match.
+        """
+        now = time.monotonic()
+        cached = self._has_images.get(dir_path)
+        if cached is not None and now - cached[1] < HAS_IMAGES_TTL:
+            return cached[0]
+        found = QDirIterator(dir_path, self.nameFilters(), QDir.Filter.Files).hasNext()
+        self._has_images[dir_path] = (found, now)
+        return found
 
     def data(self, index, role):
         """
@@ -43,12 +65,10 @@ class CustomFileSystemModel(QFileSystemModel):
         """
 
         # if item is a directory
-        if self.isDir(index):
-            dir_path = self.filePath(index)
-            directory = QDir(dir_path)
+        if role in (Qt.ItemDataRole.DecorationRole, Qt.ItemDataRole.ForegroundRole,
+                    Qt.ItemDataRole.FontRole) and self.isDir(index):
             # and contains filter matching files
-            contains_matching_files = bool(directory.entryList(
-                                      self.nameFilters(), QDir.Filter.Files ))
+            contains_matching_files = self.has_images(self.filePath(index))
 
             # By default, QFileSystemModel uses native icons
             # for directories and files. To override these, you must
@@ -134,8 +154,9 @@ class FileTreeView(QWidget):
 
         # Dropdown for drives/volumes
         self.driveSelector = QComboBox()
-        self.populateDrives()
-        self.driveSelector.currentTextChanged.connect(self.changeDrive)
+        # listing the volumes can take a while (network shares, disks that
+        # are asleep). It's done once the window is showing. see startup.py
+        QTimer.singleShot(0, self.init_drives)
 
         # The simple layout
         layout = QVBoxLayout(self)
@@ -144,6 +165,11 @@ class FileTreeView(QWidget):
         layout.addWidget(self.tree)
         self.setLayout(layout)
 
+    def init_drives(self):
+        self.populateDrives()
+        # connected after so adding the drives doesn't change the tree.
+        self.driveSelector.currentTextChanged.connect(self.changeDrive)
+
     def populateDrives(self):
         """
         Populate the dropdown with available drives or volumes using QStorageInfo.
@@ -205,6 +231,22 @@ class FileTreeView(QWidget):
             new_index = self.model.setRootPath(drive_path)
             self.tree.setRootIndex(new_index)
 
+    def show_directory(self, directory):
+        """
+        Expand the tree down to a directory and select it. directoryChosen
+        isn't emitted.
+        Args: string - path of the directory.
+        """
+        index = self.model.index(directory)
+        if not index.isValid():
+            return
+        parent = index.parent()
+        while parent.isValid():
+            self.tree.expand(parent)
+            parent = parent.parent()
+        self.tree.setCurrentIndex(index)
+        self.tree.scrollTo(index)
+
     def onFileSelected(self, index):
         """
         Handle the event when a file or directory is selected in the tree view.
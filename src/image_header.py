@@ -0,0 +1,346 @@
+# image_header.py
+# Read the metadata of PNG, JPEG and WebP files straight from the file
+# headers without opening the image with an imaging library.
+#
+# sd-prompt-reader opens every file with PIL, works out which tool made
+# the image and then parses the metadata. For the common cases (A1111,
+# ComfyUI, and friends) all it really needs are the text chunks, so this
+# walks the PNG chunks (via mmap) and stops at the first IDAT, or reads
+# the JPEG APP/COM segments up to the start of scan, or the WebP RIFF
+# chunks. No pixel data is touched.
+#
+# The result is handed to the same sd-prompt-reader format parsers that
+# ImageDataReader uses so the metadata comes out identical. Anything that
+# isn't recognized here returns None and the caller falls back to
+# ImageDataReader. e.g. NovelAI stealth info hidden in the alpha channel.
+#
+# Date: Oct 2026
+
+import json
+import logging
+import mmap
+import struct
+import zlib
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# don't let a corrupt (or nasty) zTXt/iTXt chunk decompress into gigabytes.
+MAX_TEXT_CHUNK = 64 * 1024 * 1024
+
+
+class ImageHeader:
+    """
+    What was found in the image file headers.
+        format = str. 'PNG', 'JPEG' or 'WEBP'. Same names PIL uses.
+        width, height = int. image size in pixels.
+        has_alpha = bool. PIL would open this as RGBA.
+        info = dict. text chunks, exif etc. Same keys as PIL Image.info
+    """
+    __slots__ = ('format', 'width', 'height', 'has_alpha', 'info')
+
+    def __init__(self, image_format, width=0, height=0, has_alpha=False, info=None):
+        self.format = image_format
+        self.width = width
+        self.height = height
+        self.has_alpha = has_alpha
+        self.info = info if info is not None else {}
+
+
+def read_image_header(image_path, text_keys=None):
+    """
+    Read the header of an image file.
+    Args: image_path: str. FQFN of the image.
+          text_keys: set of PNG text chunk keys to read. None reads all of
+                     them. The other chunks are skipped without decoding.
+    Returns: ImageHeader or None if the file isn't a PNG, JPEG or WebP
+             or it is too damaged to make sense of.
+    Raises: OSError if the file can't be opened.
+    """
+    with open(image_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # can't mmap an empty file.
+            return None
+        with buf:
+            try:
+                if buf[:8] == PNG_SIGNATURE:
+                    return _read_png(buf, text_keys)
+                if buf[:2] == b'\xff\xd8':
+                    return _read_jpeg(buf)
+                if buf[:4] == b'RIFF' and buf[8:12] == b'WEBP':
+                    return _read_webp(buf)
+            except (struct.error, zlib.error, IndexError, ValueError) as e:
+                logger.debug(f'read_image_header(): unable to parse header of {image_path}: {e}')
+    return None
+
+
+def read_text_keys(image_path):
+    """
+    The keys of the text chunks of a PNG. Only the chunk headers and the
+    keys are looked at, the text itself isn't read or inflated.
+    Args: image_path: str. FQFN of the image.
+    Returns: set of str. Empty if it isn't a PNG or has no text chunks.
+    Raises: OSError if the file can't be opened.
+    """
+    keys = set()
+    with open(image_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return keys
+        with buf:
+            if buf[:8] != PNG_SIGNATURE:
+                return keys
+            pos = 8
+            end = len(buf)
+            while pos + 8 <= end:
+                length, ctype = struct.unpack_from('>I4s', buf, pos)
+                data_start = pos + 8
+                data_end = data_start + length
+                if ctype in (b'IDAT', b'IEND') or data_end > end:
+                    break
+                if ctype in (b'tEXt', b'zTXt', b'iTXt'):
+                    key_end = buf.find(b'\0', data_start, min(data_end, data_start + 80))
+                    if key_end > data_start:
+                        keys.add(buf[data_start:key_end].decode('latin-1'))
+                pos = data_end + 4      # skip the crc
+    return keys
+
+
+def _read_png(buf, text_keys=None):
+    """ walk the PNG chunks up to the first IDAT. """
+    header = ImageHeader('PNG')
+    info = header.info
+    pos = 8
+    end = len(buf)
+    while pos + 8 <= end:
+        length, ctype = struct.unpack_from('>I4s', buf, pos)
+        data_start = pos + 8
+        data_end = data_start + length
+        if ctype == b'IDAT' or data_end > end:
+            break
+        if text_keys is not None and ctype in (b'tEXt', b'zTXt', b'iTXt'):
+            key_end = buf.find(b'\0', data_start, data_end)
+            if buf[data_start:key_end].decode('latin-1') not in text_keys:
+                pos = data_end + 4
+                continue
+        if ctype == b'IHDR':
+            header.width, header.height, _depth, color_type = struct.unpack_from('>IIBB', buf, data_start)
+            # 6 is truecolor with alpha. PIL opens that as RGBA.
+            header.has_alpha = color_type == 6
+        elif ctype == b'tEXt':
+            key, _, value = buf[data_start:data_end].partition(b'\0')
+            info[key.decode('latin-1')] = value.decode('latin-1')
+        elif ctype == b'zTXt':
+            key, _, value = buf[data_start:data_end].partition(b'\0')
+            # value[0] is the compression method, always 0 (zlib)
+            info[key.decode('latin-1')] = _inflate(value[1:]).decode('latin-1')
+        elif ctype == b'iTXt':
+            key, _, rest = buf[data_start:data_end].partition(b'\0')
+            compressed = rest[0]
+            _lang, _, rest = rest[2:].partition(b'\0')
+            _translated, _, value = rest.partition(b'\0')
+            if compressed:
+                value = _inflate(value)
+            info[key.decode('latin-1')] = value.decode('utf-8')
+        elif ctype == b'eXIf':
+            info['exif'] = bytes(buf[data_start:data_end])
+        elif ctype == b'IEND':
+            break
+        pos = data_end + 4      # skip the crc
+    return header
+
+
+def _inflate(data):
+    decomp = zlib.decompressobj()
+    text = decomp.decompress(data, MAX_TEXT_CHUNK)
+    if decomp.unconsumed_tail:
+        raise ValueError('text chunk too large')
+    return text
+
+
+def _read_jpeg(buf):
+    """ read the JPEG segments up to the start of scan. """
+    header = ImageHeader('JPEG')
+    info = header.info
+    pos = 2
+    end = len(buf)
+    while pos + 4 <= end:
+        if buf[pos] != 0xFF:
+            break
+        marker = buf[pos + 1]
+        if marker == 0xFF:      # fill byte
+            pos += 1
+            continue
+        if marker == 0xDA or marker == 0xD9:    # start of scan or end of image
+            break
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:    # no length
+            pos += 2
+            continue
+        length = struct.unpack_from('>H', buf, pos + 2)[0]
+        data = buf[pos + 4:pos + 2 + length]
+        if marker == 0xE1 and data[:6] == b'Exif\0\0' and 'exif' not in info:
+            info['exif'] = bytes(data)
+        elif marker == 0xE1 and data.startswith(b'http://ns.adobe.com/xap/1.0/\0'):
+            info['xmp'] = bytes(data[29:])
+        elif marker == 0xFE:
+            info['comment'] = bytes(data)
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            # start of frame
+            header.height, header.width = struct.unpack_from('>HH', data, 1)
+        pos += 2 + length
+    return header
+
+
+def _read_webp(buf):
+    """ read the WebP RIFF chunks. The image data chunks are skipped over. """
+    header = ImageHeader('WEBP')
+    info = header.info
+    pos = 12
+    end = min(len(buf), 8 + struct.unpack_from('<I', buf, 4)[0])
+    while pos + 8 <= end:
+        ctype, length = struct.unpack_from('<4sI', buf, pos)
+        data_start = pos + 8
+        if ctype == b'VP8X':
+            flags = buf[data_start]
+            header.has_alpha = bool(flags & 0x10)
+            w = int.from_bytes(buf[data_start + 4:data_start + 7], 'little') + 1
+            h = int.from_bytes(buf[data_start + 7:data_start + 10], 'little') + 1
+            header.width, header.height = w, h
+        elif ctype == b'VP8 ' and not header.width:
+            w, h = struct.unpack_from('<HH', buf, data_start + 6)
+            header.width, header.height = w & 0x3FFF, h & 0x3FFF
+        elif ctype == b'VP8L' and not header.width:
+            bits = struct.unpack_from('<I', buf, data_start + 1)[0]
+            header.width = (bits & 0x3FFF) + 1
+            header.height = ((bits >> 14) & 0x3FFF) + 1
+            header.has_alpha = bool((bits >> 28) & 1)
+        elif ctype == b'EXIF':
+            info['exif'] = bytes(buf[data_start:data_start + length])
+        elif ctype == b'XMP ':
+            info['xmp'] = bytes(buf[data_start:data_start + length])
+        # chunks are padded to an even size
+        pos = data_start + length + (length & 1)
+    return header
+
+
+class HeaderDataReader:
+    """
+    A stand in for sd_prompt_reader's ImageDataReader built from an
+    ImageHeader. Only the parts of ImageDataReader that LatentEye uses
+    are here: status, props, setting, tool, positive, negative, info.
+    Use header_data_reader() to make one.
+    """
+    def __init__(self, header, tool, parser, status):
+        self.header = header
+        self.tool = tool
+        self._parser = parser
+        self.status = status
+
+    @property
+    def info(self):
+        return self.header.info
+
+    @property
+    def props(self):
+        return self._parser.props if self._parser else ''
+
+    @property
+    def setting(self):
+        return self._parser.setting if self._parser else ''
+
+    @property
+    def positive(self):
+        return self._parser.positive if self._parser else ''
+
+    @property
+    def negative(self):
+        return self._parser.negative if self._parser else ''
+
+
+def header_data_reader(header):
+    """
+    Work out which tool made the image from the header and parse its
+    metadata, following the same rules as ImageDataReader.read_data().
+    Args: header: ImageHeader from read_image_header()
+    Returns: HeaderDataReader or None if ImageDataReader is needed.
+    """
+    # sd_prompt_reader is only needed once there is something to parse.
+    from sd_prompt_reader.format import (BaseFormat, A1111, ComfyUI, EasyDiffusion,
+                                         Fooocus, InvokeAI, SwarmUI)
+    info = header.info
+    parser = None
+    tool = ''
+
+    exif = {}
+    if 'exif' in info:
+        try:
+            import piexif
+            exif = piexif.load(info['exif']) or {}
+        except Exception as e:
+            logger.debug(f'header_data_reader(): exif not understood: {e}')
+            return None
+    # old SwarmUI puts its metadata in the exif Model tag. ImageDataReader
+    # checks that first. It's rare enough to let ImageDataReader handle it.
+    if exif.get('0th', {}).get(0x0110) is not None:
+        return None
+
+    if header.format == 'PNG':
+        if 'parameters' in info:
+            if 'sui_image_params' in info['parameters']:
+                tool, parser = 'StableSwarmUI', SwarmUI(raw=info['parameters'])
+            else:
+                tool = 'ComfyUI\n(A1111 compatible)' if 'prompt' in info else 'A1111 webUI'
+                parser = A1111(info=info)
+        elif 'postprocessing' in info:
+            tool, parser = 'A1111 webUI\n(Postprocessing)', A1111(info=info)
+        elif 'negative_prompt' in info or 'Negative Prompt' in info:
+            tool, parser = 'Easy Diffusion', EasyDiffusion(info=info)
+        elif 'invokeai_metadata' in info or 'sd-metadata' in info or 'Dream' in info:
+            tool, parser = 'InvokeAI', InvokeAI(info=info)
+        elif info.get('Software') == 'NovelAI':
+            return None
+        elif 'prompt' in info:
+            tool, parser = 'ComfyUI', ComfyUI(info=info, width=header.width, height=header.height)
+        elif 'Comment' in info:
+            try:
+                tool, parser = 'Fooocus', Fooocus(info=json.loads(info['Comment']))
+            except ValueError:
+                return None
+        elif 'XML:com.adobe.xmp' in info or header.has_alpha:
+            # Draw Things xmp or maybe NovelAI stealth info. let
+            # ImageDataReader deal with those.
+            return None
+        else:
+            # nothing there. ImageDataReader would say the same.
+            return HeaderDataReader(header, '', None, BaseFormat.Status.UNREAD)
+    else:
+        # JPEG and WEBP
+        if 'comment' in info or header.has_alpha:
+            return None
+        if 'exif' not in info:
+            # ImageDataReader logs this as an "Empty jpeg"
+            return HeaderDataReader(header, '', None, BaseFormat.Status.FORMAT_ERROR)
+        try:
+            import piexif
+            import piexif.helper
+            user_comment = exif.get('Exif', {}).get(piexif.ExifIFD.UserComment)
+            if user_comment is None:
+                return HeaderDataReader(header, '', None, BaseFormat.Status.FORMAT_ERROR)
+            if 'sui_image_params' in user_comment[8:].decode('utf-16'):
+                tool, parser = 'StableSwarmUI', SwarmUI(raw=user_comment[8:].decode('utf-16'))
+            else:
+                raw = piexif.helper.UserComment.load(user_comment)
+                if raw[0] == '{':
+                    tool, parser = 'Easy Diffusion', EasyDiffusion(raw=raw)
+                else:
+                    tool, parser = 'A1111 webUI', A1111(raw=raw)
+        except Exception as e:
+            logger.debug(f'header_data_reader(): exif not understood: {e}')
+            return None
+
+    status = parser.parse()
+    return HeaderDataReader(header, tool, parser, status)
+
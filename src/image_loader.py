@@ -0,0 +1,164 @@
+# image_loader.py
+# Decode full size images off the GUI thread for EyeSight.
+#
+# A big PNG can take a second or more to decode. EyeSight shows the
+# thumbnail scaled up right away and an ImageLoader decodes the real
+# image, and makes its pyramid levels, in the thread pool. When it's done
+# the full image replaces the preview.
+#
+# DecodedImageCache keeps the images next to the one that's showing,
+# decoded ahead of time, so stepping through a folder doesn't wait on a
+# decode for every image.
+#
+# Date: Oct 2026
+
+import logging
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+from .decode_policy import DecodePolicy
+from .image_pyramid import ImagePyramid
+from .latent_tools import available_memory
+from .perf import span
+
+logger = logging.getLogger(__name__)
+
+# most memory the decoded images for next / previous can use.
+DECODED_CACHE_BYTES = 1024 * 1024 * 1024
+# and never more than this share of the memory that is free.
+MEMORY_SHARE = 0.25
+
+
+def image_size(image_path):
+    """
+    Size of an image from its header, without decoding it. EXIF rotation
+    is taken into account so it's the size the image will be shown at.
+    Returns: QSize. Invalid if the file can't be read.
+    """
+    return DecodePolicy.header_size(DecodePolicy.reader(image_path))
+
+
+def estimated_bytes(size):
+    """ memory an ImagePyramid of an image this size will take. The decoded image plus 1/3 for the levels. """
+    return DecodePolicy.instance().view_bytes(size) * 4 // 3
+
+
+class DecodedImageCache:
+    """
+    The decoded images (ImagePyramids) around the one EyeSight is showing,
+    so next and previous don't have to wait for a decode.
+    It works like a ring buffer that moves with the current image: the
+    images that are no longer near it are dropped first, then the ones
+    furthest away until it fits the budget. The budget is the smaller of
+    max_bytes and a share of the memory that is free, worked out each
+    time the cache is trimmed, so the cache shrinks when memory gets
+    tight.
+    Args: max_bytes = int. most memory to use.
+    """
+    def __init__(self, max_bytes=DECODED_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._images = {}
+
+    def __contains__(self, image_path):
+        return image_path in self._images
+
+    def get(self, image_path):
+        return self._images.get(image_path)
+
+    def put(self, image_path, pyramid):
+        old = self._images.pop(image_path, None)
+        if old is not None and old is not pyramid:
+            old.release()
+        self._images[image_path] = pyramid
+
+    def byte_count(self):
+        return sum(pyramid.byte_count() for pyramid in self._images.values())
+
+    def budget(self):
+        """ bytes the cache can use right now """
+        free = available_memory()
+        if free is None:
+            return self.max_bytes
+        # what the cache holds now could be given back, count it as free.
+        return min(self.max_bytes, int((free + self.byte_count()) * MEMORY_SHARE))
+
+    def trim(self, wanted):
+        """
+        Drop images until the cache fits its budget.
+        Args: wanted = list of str. the paths to keep, most wanted first.
+              The first is the image that is showing. It's never dropped.
+        """
+        rank = {path: i for i, path in enumerate(wanted)}
+        for path in [p for p in self._images if p not in rank]:
+            self._images.pop(path).release()
+        budget = self.budget()
+        held = sorted(self._images, key=rank.get)
+        total = self.byte_count()
+        showing = wanted[0] if wanted else None
+        while total > budget and held and held[-1] != showing:
+            pyramid = self._images.pop(held.pop())
+            total -= pyramid.byte_count()
+            pyramid.release()
+
+    def clear(self):
+        for pyramid in self._images.values():
+            pyramid.release()
+        self._images.clear()
+
+
+class ImageLoaderSignals(QObject):
+    """
+    Thread Signals -
+        loaded: (object, str) the ImagePyramid of the image and its path.
+        failed: (str, str) the path and the error message.
+    """
+    loaded = pyqtSignal(object, str)
+    failed = pyqtSignal(str, str)
+
+
+class ImageLoader(QRunnable):
+    """
+    Decode an image and build its ImagePyramid in the background.
+    The image is decoded at the size the DecodePolicy allows.
+    Nothing is emitted if it's canceled. A decode that has started can't
+    be stopped part way but the image is dropped as soon as it's done
+    rather than made into a pyramid.
+    Args:
+        image_path = str. FQPN of the image.
+        cancel_flag = (list[bool]) Mutable flag to allow cancellation of the worker from the main thread.
+    """
+    def __init__(self, image_path, cancel_flag):
+        super().__init__()
+        self.image_path = image_path
+        self.cancel_flag = cancel_flag
+        self.signals = ImageLoaderSignals()
+
+    @pyqtSlot()
+    def run(self):
+        if self.cancel_flag[0]:
+            return
+        try:
+            policy = DecodePolicy.instance()
+            with span('image decode', self.image_path):
+                image, full_size, level = policy.read_for_view(self.image_path)
+            if self.cancel_flag[0]:
+                logger.debug(f'ImageLoader canceled: {self.image_path}')
+                return
+            # decoded smaller than full size. the detail is decoded a tile at
+            # a time if the format can do that.
+            source = self.image_path if level and policy.can_read_regions(self.image_path) else None
+            pyramid = ImagePyramid(image, level, full_size, source)
+            del image
+            # the smaller levels are what gets drawn first when the image is
+            # fitted to the window. make them here and not in paint().
+            with span('image pyramid', self.image_path):
+                pyramid.build_levels()
+        except Exception as e:
+            logger.error(f'ImageLoader: error loading {self.image_path}: {e}')
+            if not self.cancel_flag[0]:
+                self.signals.failed.emit(self.image_path, str(e))
+            return
+        if self.cancel_flag[0]:
+            logger.debug(f'ImageLoader canceled: {self.image_path}')
+            return
+        self.signals.loaded.emit(pyramid, self.image_path)
@@ -0,0 +1,375 @@
+# image_pyramid.py
+# Tiled, level of detail image drawing for EyeSight.
+#
+# EyeSight used to rescale the whole full resolution pixmap on every
+# zoom step. With a 4096x4096 (or bigger) upscale that's hundreds of MB
+# and most of a second per step, for an image that is mostly off screen
+# or shrunk to a quarter of its size anyway.
+#
+# Now the image is kept as a pyramid: the full image (level 0) and
+# copies at 1/2, 1/4, 1/8... size. The levels are cut into tiles and
+# TiledImageItem only draws the tiles that are on screen, from the level
+# closest to the current zoom. Zooming is just a QGraphicsView transform.
+# Tiles are turned into pixmaps as they are needed and kept in a shared
+# TileCache that is capped in bytes, so memory stays bounded no matter
+# how many images or zoom levels have been looked at.
+#
+# Images too big for the decode budget (see decode_policy.py) are decoded
+# smaller. The pyramid then starts at that level (base_level) and, if the
+# file format can decode part of an image, the more detailed levels are
+# decoded a tile at a time by RegionLoaders when they are zoomed into.
+# The decoded level is drawn scaled up until the detail tiles arrive.
+#
+# Date: Oct 2026
+
+import itertools
+import logging
+import math
+import threading
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QObject, QRect, QRectF, QRunnable, QSize, QThreadPool, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImage, QPainter, QPixmap
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsObject, QStyleOptionGraphicsItem
+
+from .decode_policy import DecodePolicy
+from .perf import hit, span
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 512
+# pixmaps of tiles kept around for all the open images.
+TILE_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class ImagePyramid:
+    """
+    An image and its smaller versions, each half the size of the one
+    before, down to about TILE_SIZE. Levels are made the first time they
+    are asked for, build_levels() makes them all up front (it's safe to
+    call from a worker thread).
+    Sizes and positions are always in full size pixels, whatever level
+    was decoded.
+    Args:
+        image = QImage. The decoded image.
+        base_level = int. the level image is. 0 if it's full size.
+        full_size = QSize. size of the full image. Needed if base_level isn't 0.
+        source = str. FQPN of the image file. If given, the levels below
+                 base_level are decoded from it a tile at a time.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, image, base_level=0, full_size=None, source=None):
+        self.key = next(self._ids)      # tile cache key. id() can be reused.
+        self.base_level = base_level
+        self.source = source if base_level else None
+        if image.format() not in (QImage.Format.Format_ARGB32_Premultiplied, QImage.Format.Format_RGB32):
+            # the formats QPainter draws fastest
+            fmt = (QImage.Format.Format_ARGB32_Premultiplied if image.hasAlphaChannel()
+                   else QImage.Format.Format_RGB32)
+            image = image.convertToFormat(fmt)
+        if full_size is None:
+            full_size = image.size()
+        self.width = full_size.width()
+        self.height = full_size.height()
+        # _levels[0] is base_level, _levels[1] is base_level + 1 ...
+        self._levels = [image]
+        self._lock = threading.Lock()
+        longest = max(self.width, self.height, 1)
+        self.level_count = max(1, math.ceil(math.log2(longest / TILE_SIZE)) + 1) if longest > TILE_SIZE else 1
+
+    @property
+    def image(self):
+        """ the decoded image. full size unless base_level isn't 0 """
+        return self._levels[0]
+
+    def level(self, number):
+        """
+        QImage of a level. 0 is full size, each level is half the size of
+        the one before it. Levels below base_level aren't decoded, the
+        base_level image is returned for those.
+        """
+        number = max(0, min(number, self.level_count - 1) - self.base_level)
+        with self._lock:
+            while len(self._levels) <= number:
+                prev = self._levels[-1]
+                self._levels.append(prev.scaled(max(prev.width() // 2, 1), max(prev.height() // 2, 1),
+                                                Qt.AspectRatioMode.IgnoreAspectRatio,
+                                                Qt.TransformationMode.SmoothTransformation))
+            return self._levels[number]
+
+    def build_levels(self):
+        """ make all the levels now instead of when they are first drawn. """
+        self.level(self.level_count - 1)
+
+    def level_for_scale(self, scale):
+        """
+        The level to draw at a zoom scale. The level is never smaller than
+        what is on screen so the image is only ever scaled down when drawn.
+        Without a source to decode detail tiles from, base_level is as
+        detailed as it gets.
+        """
+        finest = 0 if self.source else self.base_level
+        if scale >= 1.0 or scale <= 0:
+            return finest
+        return max(finest, min(int(math.floor(math.log2(1.0 / scale))), self.level_count - 1))
+
+    def is_region_level(self, level):
+        """ True if the level is decoded a tile at a time. see RegionLoader """
+        return level < self.base_level
+
+    def region(self, level, column, row):
+        """
+        Where a detail tile is in the full image and the size it's decoded at.
+        Returns: (QRect in full size pixels, QSize)
+        """
+        span = TILE_SIZE << level
+        rect = QRect(column * span, row * span, span, span).intersected(QRect(0, 0, self.width, self.height))
+        size = QSize(max(-(-rect.width() >> level), 1), max(-(-rect.height() >> level), 1))
+        return rect, size
+
+    def byte_count(self):
+        """ memory used by the levels made so far. """
+        return sum(level.sizeInBytes() for level in self._levels)
+
+    def release(self):
+        """ drop the levels and their tiles. The pyramid can't be drawn after this. """
+        TileCache.instance().discard(self.key)
+        with self._lock:
+            self._levels = [QImage()]
+
+
+class TileCache:
+    """
+    LRU cache of tile pixmaps shared by every pyramid. Capped in bytes.
+    Pixmaps must be made on the GUI thread so this is only used from
+    paint().
+    """
+    _instance = None
+
+    def __init__(self, max_bytes=TILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._tiles = OrderedDict()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __contains__(self, key):
+        return key in self._tiles
+
+    def tile(self, pyramid, level, column, row):
+        """
+        pixmap of one tile. made from the level image if it isn't cached.
+        Detail tiles (see ImagePyramid.is_region_level()) are only made by
+        RegionLoaders, None if it isn't cached.
+        """
+        key = (pyramid.key, level, column, row)
+        pixmap = self._tiles.get(key)
+        hit('tile cache', pixmap is not None)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+        if pyramid.is_region_level(level):
+            return None
+        image = pyramid.level(level)
+        rect = QRect(column * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE).intersected(image.rect())
+        with span('tile pixmap'):
+            pixmap = QPixmap.fromImage(image.copy(rect))
+        self.insert(key, pixmap)
+        return pixmap
+
+    def insert(self, key, pixmap):
+        """ add a tile. (pyramid key, level, column, row) """
+        old = self._tiles.pop(key, None)
+        if old is not None:
+            self.bytes -= self._pixmap_bytes(old)
+        self._tiles[key] = pixmap
+        self.bytes += self._pixmap_bytes(pixmap)
+        while self.bytes > self.max_bytes and len(self._tiles) > 1:
+            _key, old = self._tiles.popitem(last=False)
+            self.bytes -= self._pixmap_bytes(old)
+
+    def discard(self, pyramid_key):
+        """ forget every tile of a pyramid """
+        for key in [k for k in self._tiles if k[0] == pyramid_key]:
+            self.bytes -= self._pixmap_bytes(self._tiles.pop(key))
+
+    @staticmethod
+    def _pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class RegionLoaderSignals(QObject):
+    """
+    Thread Signals -
+        loaded: (tuple, QImage) the tile key and the decoded tile. The
+                image is null if it couldn't be decoded.
+    """
+    loaded = pyqtSignal(tuple, QImage)
+
+
+class RegionLoader(QRunnable):
+    """
+    Decode detail tiles of an image in the background.
+    The tiles are all in one row. They are decoded as one strip and cut
+    up: JPEG has to decode every line above the part it wants, so a strip
+    costs about the same as one tile.
+    Args:
+        image_path = str. FQPN of the image.
+        pyramid = ImagePyramid. for the tile positions.
+        keys = list of tuple. TileCache keys of the tiles. Same level and row.
+        cancel_flag = (list[bool]) Mutable flag to allow cancellation of the worker from the main thread.
+    """
+    def __init__(self, image_path, pyramid, keys, cancel_flag):
+        super().__init__()
+        self.image_path = image_path
+        self.keys = keys
+        self.regions = [pyramid.region(*key[1:]) for key in keys]
+        self.cancel_flag = cancel_flag
+        self.signals = RegionLoaderSignals()
+
+    @pyqtSlot()
+    def run(self):
+        if self.cancel_flag[0]:
+            return
+        level = self.keys[0][1]
+        strip = QRect()
+        for rect, _size in self.regions:
+            strip = strip.united(rect)
+        size = QSize(max(-(-strip.width() >> level), 1), self.regions[0][1].height())
+        image = DecodePolicy.read_region(self.image_path, strip, size)
+        for key, (rect, tile_size) in zip(self.keys, self.regions):
+            if self.cancel_flag[0]:
+                return
+            tile = QImage() if image.isNull() else image.copy(
+                (rect.x() - strip.x()) >> level, 0, tile_size.width(), tile_size.height())
+            self.signals.loaded.emit(key, tile)
+
+
+class TiledImageItem(QGraphicsObject):
+    """
+    QGraphicsItem that draws an ImagePyramid. Only the tiles in the exposed
+    rect are drawn, from the level that matches the view's zoom.
+    The item is always in full size image coordinates.
+    In fast mode (while the window is being resized) the next smaller
+    level is drawn without smoothing. It's a quarter of the pixels and
+    the tiles are usually already cached from the last zoom.
+    Detail tiles of an image that was decoded smaller than full size are
+    loaded by RegionLoaders as they come into view. Until they arrive the
+    decoded level is drawn scaled up in their place.
+    """
+    def __init__(self, pyramid, parent=None):
+        super().__init__(parent)
+        self.pyramid = pyramid
+        self.fast = False
+        # key: cancel flag of the RegionLoaders that are running.
+        self.loading = {}
+        # detail tiles that couldn't be decoded. Not tried again.
+        self.failed = set()
+        # exposedRect is only filled in with this flag set.
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption)
+        self.setCacheMode(QGraphicsItem.CacheMode.NoCache)
+
+    def set_fast(self, fast):
+        """ draw quick and rough (True) or smooth (False) """
+        if fast != self.fast:
+            self.fast = fast
+            self.update()
+
+    def cancel(self):
+        """ cancel the RegionLoaders. call before the item is thrown away. """
+        for flag in self.loading.values():
+            flag[0] = True
+        self.loading.clear()
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.pyramid.width, self.pyramid.height)
+
+    def paint(self, painter, option, widget=None):
+        with span('tile paint'):
+            self.paint_tiles(painter, option, widget)
+
+    def paint_tiles(self, painter, option, widget):
+        """ paint() without the timing. """
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.pyramid.level_for_scale(scale)
+        if self.fast:
+            # no new detail tiles while resizing.
+            level = max(min(level + 1, self.pyramid.level_count - 1), self.pyramid.base_level)
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        if exposed.isEmpty():
+            return
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, not self.fast)
+        if self.pyramid.is_region_level(level):
+            # the decoded level underneath, then whatever detail tiles are ready.
+            self.draw_tiles(painter, exposed, self.pyramid.base_level)
+            self.draw_tiles(painter, exposed, level)
+            # exposed can be just one tile that arrived. Load for all of the view.
+            visible = exposed
+            if widget is not None:
+                inverse, ok = painter.worldTransform().inverted()
+                if ok:
+                    visible = inverse.mapRect(QRectF(widget.rect())).intersected(self.boundingRect())
+            self.load_regions(level, visible)
+        else:
+            self.draw_tiles(painter, exposed, level)
+
+    @staticmethod
+    def tiles_in(rect, level):
+        """ (column, row) of the tiles of a level that cover a rect in full size pixels. """
+        tile_span = TILE_SIZE << level
+        for row in range(int(rect.top() // tile_span), int(math.ceil(rect.bottom() / tile_span))):
+            for col in range(int(rect.left() // tile_span), int(math.ceil(rect.right() / tile_span))):
+                yield col, row
+
+    def draw_tiles(self, painter, exposed, level):
+        """ Draw the tiles of a level that are in the exposed rect and ready. """
+        factor = 1 << level
+        tile_span = TILE_SIZE * factor
+        cache = TileCache.instance()
+        for col, row in self.tiles_in(exposed, level):
+            pixmap = cache.tile(self.pyramid, level, col, row)
+            if pixmap is None or pixmap.isNull():
+                continue
+            if self.pyramid.is_region_level(level):
+                target = QRectF(self.pyramid.region(level, col, row)[0])
+            else:
+                target = QRectF(col * tile_span, row * tile_span,
+                                pixmap.width() * factor, pixmap.height() * factor)
+            painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+
+    def load_regions(self, level, visible):
+        """ start RegionLoaders for the detail tiles in view. the ones no longer in view are canceled. """
+        cache = TileCache.instance()
+        wanted = {(self.pyramid.key, level, col, row) for col, row in self.tiles_in(visible, level)}
+        wanted = {key for key in wanted if key not in cache}
+        for key in [k for k in self.loading if k not in wanted]:
+            if key in self.loading:
+                # a loader does a whole row of tiles. all of them go.
+                flag = self.loading[key]
+                flag[0] = True
+                for other in [k for k, f in self.loading.items() if f is flag]:
+                    del self.loading[other]
+        rows = {}
+        for key in sorted(wanted - self.loading.keys() - self.failed):
+            rows.setdefault(key[3], []).append(key)
+        for keys in rows.values():
+            cancel_flag = [False]
+            for key in keys:
+                self.loading[key] = cancel_flag
+            loader = RegionLoader(self.pyramid.source, self.pyramid, keys, cancel_flag)
+            loader.signals.loaded.connect(self.region_loaded)
+            QThreadPool.globalInstance().start(loader)
+
+    def region_loaded(self, key, image):
+        self.loading.pop(key, None)
+        if image.isNull():
+            logger.warning(f'unable to decode a tile of {self.pyramid.source}: {key}')
+            self.failed.add(key)
+            return
+        TileCache.instance().insert(key, QPixmap.fromImage(image))
+        self.update(QRectF(self.pyramid.region(*key[1:])[0]))
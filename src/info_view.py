@@ -17,12 +17,12 @@ from pathlib import Path
 
 from PyQt6.QtCore import Qt, QDir, QSize
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QDialog,
-                             QTableWidget,  QTableWidgetItem, QTextEdit, QPushButton,
-                             QMessageBox)
+                             QTextEdit, QPushButton, QMessageBox)
 from PyQt6.QtGui import QIcon
 
 from .metadatatable import MetadataTable
-from .latent_tools import Settings, clipboard_copy, Style
+from .latent_tools import Settings, clipboard_copy, show_error_box
+from .workflow_graph import has_workflow, workflow_cache
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -42,14 +42,11 @@ class InfoView(QWidget):
         self.picture_path = ''
         iLayout = QVBoxLayout()     # info Layout but i couldn't resist iLayout because iPunny. :-D
 
-        self.md_table = QTableWidget()
+        # The one and only metadata table. It gets reused for every image.
+        self.md_table = MetadataTable()
         # setup table for initial display.
         # this will be displayed until an image is clicked on.
-        self.md_table.setColumnCount(2)
-        self.md_table.setRowCount(1)
-        self.md_table.setHorizontalHeaderLabels(['Image Info', 'Value'])
-        self.md_table.setItem(0, 0,  QTableWidgetItem(' No Data '))
-        self.md_table.setItem(0, 1,  QTableWidgetItem(' here yet.'))
+        self.md_table.md_model.set_message(' No Data ', ' here yet.')
 
         btn_layout = QHBoxLayout()
         logger.debug(f'Current app directory: {str(QDir.currentPath())}')
@@ -58,14 +55,14 @@ class InfoView(QWidget):
         self.copy_btn.setEnabled(True)
         self.copy_btn.setIconSize(QSize(30, 30))
         self.copy_btn.resize(self.copy_btn.sizeHint())
-        self.copy_btn.clicked.connect(lambda: clipboard_copy(self.picture_path, self.md_table))
+        self.copy_btn.clicked.connect(lambda: clipboard_copy(self.picture_path, self.md_table.metadata))
 
         self.wf_show = QPushButton(icon=QIcon('icon:workflow-eye.svg'), text='Show Workflow', parent=self)
-        self.wf_show.setEnabled(False)        # until workflow works, disable it.
-        self.wf_show.setToolTip('Still a work in Progress.')
+        self.wf_show.setEnabled(False)        # enabled once an image with a workflow is selected.
+        self.wf_show.setToolTip('Show the ComfyUI workflow of the selected image.')
         self.wf_show.setIconSize(QSize(30, 30))
         self.wf_show.resize(self.copy_btn.sizeHint())
-        self.wf_show.clicked.connect(lambda: self.show_comfyui_workflow(self.img_path))
+        self.wf_show.clicked.connect(lambda: self.show_comfyui_workflow(self.picture_path))
         btn_layout.addWidget(self.copy_btn)
         btn_layout.addWidget(self.wf_show)
 
@@ -81,53 +78,22 @@ class InfoView(QWidget):
              (int): Width of the second column in the metadata table.
                     Defaults to 300.
         """
-        # get the metadata table info
         # it seems that all the programmatic ways to get the available
         # width for a column, make the data column too wide. at least
         # the ways I tried. So it's hard coded. C'est La PyQt
         self.picture_path = image_path
         logger.debug(f'show_metadata(): {self.picture_path=}')
-        mtab = MetadataTable()
-        new_mdtable = mtab.get_metadata_table(self.picture_path)
-        layout = self.layout()
-
-        if new_mdtable.rowCount() >1:
-            self.md_table.clearContents()
-            logger.debug('show_metadata(): New Metadata Table populated')
-            logger.debug(f'{new_mdtable.rowCount() } rows in metadata Table')
-            # col_width = 625
-            new_mdtable.setWordWrap(True)
-            new_mdtable.setColumnWidth(1, width)
-            new_mdtable.resizeRowToContents(0)
-            new_mdtable.resizeRowToContents(1)
-
-            # Ah the Wonders of Qt. There is no refresh or update AFAIK
-            # based on the research I've done. In order to properly
-            # update the new table it has to be removed from the layout
-            # and replaced. Odd. but this works even if it is ugly.
-            # if there is a better way, please let me know.
-            if self.md_table:
-                layout.removeWidget(self.md_table)
-                self.md_table.deleteLater()
-                layout.update()
-
-            logger.debug('show_metadata(): adding new Table and updating layout')
-            self.md_table = new_mdtable
-            layout.addWidget(self.md_table)
-            layout.update()
+        # no more swapping tables in and out of the layout. The same
+        # table just gets new data.
+        self.md_table.setColumnWidth(1, width)
+        if self.md_table.show_image(self.picture_path):
+            logger.debug(f'show_metadata(): {self.md_table.md_model.rowCount()} rows in metadata Table')
         else:
             logger.debug('show_metadata(): (else) Metadata Table NOT populated')
             logger.warning('Metadata Table NOT populated. Possibly no info in image.')
-            self.md_table.clearContents()
-            self.md_table.setRowCount(1)
-            self.md_table.setItem(0, 0,  QTableWidgetItem('No metadata '))
-            msg = f'found in {Path(self.picture_path).name}'
-            self.md_table.setItem(0, 1,  QTableWidgetItem(msg))
-            Style.set_table_styling(self.md_table)
-            self.md_table.resizeColumnToContents(1)
-            logger.debug(f'InfoView: TABLE SIZING PROBS?')
-            layout.addWidget(self.md_table)
-            layout.update()
+        # only checks that the workflow is there. It isn't parsed until
+        # the Show Workflow button is clicked.
+        self.wf_show.setEnabled(has_workflow(self.picture_path))
 
     def show_metadata_error(self):
         """
@@ -158,23 +124,35 @@ class InfoView(QWidget):
     #
     def show_comfyui_workflow(self, filepath):
         """
-        eventually show the workflow associated with the selected image.
-        However, this is still a work in progress.
+        Show the ComfyUI workflow of the selected image as a block diagram
+        in a non-modal, resizable, dialog.
+        Args: (str) FQPN of the image.
         """
-        # WORK IN PROGRESS
-        # Opens a resizable dialog to display the ComfyUI workflow.
-        # show_comfyui_workflow() needs a lot of work.
         # AUG 2025 - This will likely move to its own module or package.
-        #
-        # WOW from what I have found this seems like this is gonna be a LOT of work.
+        # OCT 2026 - it did. workflow_graph.py parses, workflow_view.py draws.
         logger.debug("show_comfyui_workflow(): Displaying ComfyUI workflow.")
-
-    def get_current_workflow(self):
-        # WORK IN PROGRESS
-        # the eventual plan is to, if it exists,
-        # Extract and return the current image's ComfyUI workflow.
-        logger.debug("TBD: Extracting ComfyUI workflow.")
-        # Placeholder for real workflow extraction logic
-        # extract the ComfyUI workflow from metadata and
-        # return it to show_comfyui_workflow()
-        return "ComfyUI workflow data..."
+        graph = self.get_current_workflow(filepath)
+        if graph is None:
+            show_error_box(f'No ComfyUI workflow could be found in {Path(filepath).name}', 'info')
+            return
+        # imported the first time a workflow is shown.
+        from .workflow_view import WorkflowView
+        wf_view = WorkflowView(graph, Path(filepath).name, self)
+        wf_view.show()      # Non-Modal.
+
+    def get_current_workflow(self, filepath=None):
+        """
+        Extract and return the current image's ComfyUI workflow.
+        The workflow is only parsed here, when it's asked for, and then
+        it's cached so the next time is free.
+        Args: (str) FQPN of the image. defaults to the current image.
+        Returns: WorkflowGraph or None if the image has no workflow.
+        """
+        filepath = filepath or self.picture_path
+        if not filepath:
+            return None
+        try:
+            return workflow_cache.get(filepath)
+        except OSError as e:
+            logger.error(f'get_current_workflow(): unable to read {filepath}: {e}')
+            return None
@@ -9,12 +9,17 @@
 
 
 import logging
+import os
+import sys
 from enum import StrEnum
 from pathlib import Path
 
+from PyQt6.QtCore import QSettings
 from PyQt6.QtWidgets import QApplication, QMessageBox, QHeaderView
 from PyQt6.QtGui import QIcon, QFont, QFontMetrics
 
+from .model_assets import display_value
+
 logger = logging.getLogger(__name__)
 
 def show_error_box(errormessage, severity=None):
@@ -51,38 +56,77 @@ def show_error_box(errormessage, severity=None):
     mbox.adjustSize()
     mbox.exec()
 
-def clipboard_copy(pic_path, datatable):
+def clipboard_copy(pic_path, metadata):
     """ Copies metadata info to system clipboard
         requires:
             pic_path - string. FQPN of the image.
-            datatable - dict. dict that contains the metadata.
+            metadata - dict. dict that contains the metadata.
     """
     # this is used by EyeSight and InfoView.
-    # Copy the table's content to the clipboard.
-    logger.debug('Copying table content to clipboard')
+    # Copy the metadata to the clipboard. Straight from the dict the
+    # table is showing, no need to walk the table cells. display_value()
+    # is what the table uses, so the paste reads the same as the table.
+    logger.debug('Copying metadata to clipboard')
     clipboard = QApplication.clipboard()
 
-    # if there isn't anything useful in the table, don't return anything.
-    if datatable.rowCount() <= 3:
+    # if there isn't anything useful, don't return anything.
+    if not metadata:
         logger.debug('nothing to copy to clipboard. clipboard set to None.')
         show_error_box('You need to select an image before you go poking buttons. <br>There is no metadata to copy.', 'warn' )
         return clipboard.setText(None)
 
     content = []
     content.append(f'Metadata for {pic_path}\n')
-    for row in range(datatable.rowCount()):
-        row_data = []
-        for col in range(datatable.columnCount()):
-            item = datatable.item(row, col)
-            row_data.append(item.text() if item else "")
-        content.append("\t".join(row_data))
+    for key, value in metadata.items():
+        content.append(f'{str(key).capitalize()}\t{display_value(key, value)}')
     clipboard.setText("\n".join(content))
-    logger.debug('Table content copied to clipboard successfully')
+    logger.debug('Metadata copied to clipboard successfully')
+
+def available_memory():
+    """
+    Memory that can be used right now without swapping, in bytes.
+    Used to back off caches when the machine is short on memory.
+    Returns: int or None if it can't be found out on this platform.
+    """
+    try:
+        if sys.platform.startswith('linux'):
+            with open('/proc/meminfo') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) * 1024
+        elif sys.platform == 'win32':
+            import ctypes
+
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                            ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                            ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                            ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                            ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullAvailPhys
+        else:
+            # macOS. free pages only, it doesn't count the file cache that
+            # could be given back so it's on the low side. That's OK here.
+            return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError) as e:
+        logger.debug(f'available_memory(): {e}')
+    return None
 
 def read_user_config(self) :
     ...
     # FV - configparser setup for user settings.
 
+def user_settings():
+    """
+    The user's settings. LatentEye/settings.ini in the user's config
+    directory. The keys are in Settings, e.g. Settings.VIEW_BUDGET_MB
+    Returns: QSettings
+    """
+    return QSettings(QSettings.Format.IniFormat, QSettings.Scope.UserScope, Settings.APPNAME.value, 'settings')
+
 
 class Settings(StrEnum):
     APPNAME = 'LatentEye'
@@ -90,6 +134,9 @@ class Settings(StrEnum):
     AUTHOR = 'Greg W. Moore aka AnotherWorkingNerd'
     HOMEPAGE = 'https://github.com/AnotherWorkingNerd/LatentEye'
     DOCS =  ' URL to docs' # maybe git web page with help and can tie it to F1/help
+    # keys in the user's settings.ini, see user_settings() and decode_policy.py
+    ALLOCATION_LIMIT_MB = 'decode/allocation_limit_mb'
+    VIEW_BUDGET_MB = 'decode/view_budget_mb'
 # Other stuff?
 
 
@@ -195,6 +242,8 @@ class Style:
                 padding: 2px;
             }}
         """
+    # thumbnails Ctrl+clicked to be compared. see ThumbnailView.toggle_compare_mark()
+    COMPARE_MARK_QSS = 'QToolTip { font: 14px; padding: 2px; } QLabel { border: 2px solid orange; }'
 
     @staticmethod
     def set_table_styling(table):
@@ -202,11 +251,11 @@ class Style:
         Add style to the passed in table.
         style consists of header row, colors, and fonts.
         Args:
-            QTableWidget. Table to style
+            QTableView (or QTableWidget). Table to style
         """
         logger.debug('entering table_styling()')
         # Define fonts and colors. Eventually this should make its way to Settings.
-        # so I think I'll just call this default styling. Since a QTableWidget
+        # so I think I'll just call this default styling. Since a QTableView
         # is being returned. It can be "restyled", right?
 
         fontsize = 15
@@ -217,7 +266,7 @@ class Style:
         text_color = "#FFFFFF"          # White
 
         table_style_string = f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: {background_color};
                 alternate-background-color: {alternate_color};
             }}
@@ -7,17 +7,22 @@
 # Date: November 2024
 
 import logging
+import sys
+from datetime import datetime
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QDir, pyqtSignal
-from PyQt6.QtWidgets import (QApplication, QComboBox, QLabel, QMainWindow,
+from PyQt6.QtCore import Qt, QDir, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (QApplication, QComboBox, QFileDialog, QInputDialog, QLabel, QLineEdit, QMainWindow,
                              QMessageBox, QVBoxLayout, QSplitter, QWidget)
 from PyQt6.QtGui import QAction, QIcon, QKeySequence
 
+# the thumbnail and metadata panels, EyeSight and the rest are imported
+# where they are first used, after the window is showing. see startup.py
 from .file_tree import FileTreeView
-from .info_view import InfoView
-from .latent_tools import Settings, show_error_box
-from .thumbnail_view import ThumbnailView
+from .latent_tools import Settings, available_memory, show_error_box
+from .perf import PerfHud, PerfStats
+from .session import Session
+from .startup import StartupTimer
 
 
 logger = logging.getLogger(__name__)
@@ -28,6 +33,8 @@ class MainWindow(QMainWindow):
     and center thumbnail view.
     """
     sortMethodChanged = pyqtSignal(str)
+    SEARCH_PAGE_SIZE = 200      # thumbnails per page of search results
+
     def __init__(self):
         super().__init__()
 
@@ -53,25 +60,80 @@ class MainWindow(QMainWindow):
         logger.debug('Setting up qsplitter')
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
         self.filetree_view = FileTreeView()
-        self.thumbnail_view = ThumbnailView()
-        self.info_view = InfoView()
-
+        # the thumbnail and metadata panels are built once the window is
+        # showing, see build_panels(). Empty widgets hold their places so
+        # the splitter has its sizes from the start.
+        self.thumbnail_view = None
+        self.info_view = None
+        self.panels_pending = False
         self.splitter.addWidget(self.filetree_view)
-        self.splitter.addWidget(self.thumbnail_view)
-        self.splitter.addWidget(self.info_view)
+        self.splitter.addWidget(QWidget())
+        self.splitter.addWidget(QWidget())
 
         # Optional: Set minimum sizes to prevent views from becoming too small
         self.filetree_view.setMinimumWidth(50)
+        self.splitter.widget(1).setMinimumWidth(400)
+        self.splitter.widget(2).setMinimumWidth(120)
+        main_layout.addWidget(self.splitter, stretch=1)
+
+        self.current_directory = ''         # used later by get_selected_directory and on_sort
+        self.search_page = 0                # current page of prompt search results
+        self.slideshow_interval = None      # last one used. see start_slideshow()
+        self.setCentralWidget(self.splitter)
+        logger.debug('past setCentralWidget().')
+
+        # View > Performance HUD. see perf.py
+        self.perf_hud = PerfHud(self)
+        PerfStats.instance().add_gauge('thread pool busy', QThreadPool.globalInstance().activeThreadCount)
+
+        # the last session. The sizes go back now, before the window is
+        # shown. The directory and EyeSight windows once it's showing.
+        self.session = Session()
+        self.saved_session = self.session.load()
+        # LatentEye.py centers the window unless it was put back where it was.
+        self.geometry_restored = False
+        if self.saved_session['geometry'] is not None:
+            self.geometry_restored = self.restoreGeometry(self.saved_session['geometry'])
+        if len(self.saved_session['splitter_sizes']) == self.splitter.count():
+            self.splitter.setSizes(self.saved_session['splitter_sizes'])
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        # the first paint has happened once this returns. a show event is
+        # too early, the window isn't painted until the event loop gets to it.
+        if self.thumbnail_view is None and not self.panels_pending:
+            self.panels_pending = True
+            QTimer.singleShot(0, self.build_panels)
+
+    def build_panels(self):
+        """
+        Make the thumbnail and metadata panels, then open the last
+        session. Called after the first paint so the imports they
+        need (EyeSight, MetadataTable...) aren't in the way of the first
+        paint. see startup.py
+        """
+        if self.thumbnail_view is not None:
+            return
+        from .decode_policy import DecodePolicy
+        from .info_view import InfoView
+        from .thumbnail_view import ThumbnailView
+        # Qt's limit on how much memory one image decode can take.
+        # see decode_policy.py
+        DecodePolicy.instance().install()
+
+        self.thumbnail_view = ThumbnailView()
+        self.info_view = InfoView()
         self.thumbnail_view.setMinimumWidth(400)
         self.info_view.setMinimumWidth(120)
-        main_layout.addWidget(self.splitter, stretch=1)
+        # replaceWidget() keeps the size the placeholder had.
+        for index, widget in ((1, self.thumbnail_view), (2, self.info_view)):
+            self.splitter.replaceWidget(index, widget).deleteLater()
 
         # Connect file tree selection to updating the thumbnails
         self.filetree_view.directoryChosen.connect(self.get_selected_directory)
         self.thumbnail_view.thumbnail_selected.connect(self.get_thumbnail_metadata)
-        self.current_directory = ''         # used later by get_selected_directory and on_sort
-        self.setCentralWidget(self.splitter)
-        logger.debug('past setCentralWidget().')
+        StartupTimer.instance().mark('panels built')
+        self.restore_session()
 
     def center_window(self):
         """
@@ -97,11 +159,56 @@ class MainWindow(QMainWindow):
         quit_action.triggered.connect(self.close)
         file_menu.addAction(quit_action)
 
+        library_menu = menu_bar.addMenu('Library')
+        dupes_action = QAction('Show Duplicates in Folder', self)
+        dupes_action.setToolTip('Images in this folder that look alike, grouped together')
+        dupes_action.triggered.connect(lambda: self.show_duplicates(self.current_directory))
+        library_menu.addAction(dupes_action)
+        library_dupes_action = QAction('Show Duplicates in Library', self)
+        library_dupes_action.triggered.connect(lambda: self.show_duplicates(None))
+        library_menu.addAction(library_dupes_action)
+        library_menu.addSeparator()
+        clusters_action = QAction('Group Similar Prompts in Folder', self)
+        clusters_action.triggered.connect(lambda: self.show_prompt_clusters(self.current_directory))
+        library_menu.addAction(clusters_action)
+        library_clusters_action = QAction('Group Similar Prompts in Library', self)
+        library_clusters_action.triggered.connect(lambda: self.show_prompt_clusters(None))
+        library_menu.addAction(library_clusters_action)
+
+        view_menu = menu_bar.addMenu('View')
+        slideshow_action = QAction('Slideshow...', self)
+        slideshow_action.setShortcut(QKeySequence(Qt.Key.Key_F5))
+        slideshow_action.setToolTip('Full screen slideshow of the thumbnails, in the order shown')
+        slideshow_action.triggered.connect(self.start_slideshow)
+        view_menu.addAction(slideshow_action)
+        perf_action = QAction('Performance HUD', self)
+        perf_action.setCheckable(True)
+        perf_action.setShortcut('Ctrl+Shift+P')
+        perf_action.setToolTip('Timings of the slow parts, queue depths and cache hit rates')
+        perf_action.toggled.connect(self.toggle_perf_hud)
+        view_menu.addAction(perf_action)
+        trace_action = QAction('Record Trace', self)
+        trace_action.setCheckable(True)
+        trace_action.setToolTip('Record the thumbnail and metadata work. Saved as a Chrome trace when stopped')
+        trace_action.toggled.connect(self.toggle_trace)
+        view_menu.addAction(trace_action)
+        view_menu.addSeparator()
+        budget_action = QAction('EyeSight Memory Budget...', self)
+        budget_action.setToolTip('Images bigger than this are shown at 1/2, 1/4... size')
+        budget_action.triggered.connect(self.set_view_budget)
+        view_menu.addAction(budget_action)
+
         help_menu = menu_bar.addMenu('Help')
         docs_action = QAction('Docs', self)
         docs_action.setShortcut(QKeySequence.StandardKey.HelpContents)
         docs_action.triggered.connect(self.helpMe)
         help_menu.addAction(docs_action)
+        memory_action = QAction('Memory Usage', self)
+        memory_action.triggered.connect(self.show_memory_usage)
+        help_menu.addAction(memory_action)
+        startup_action = QAction('Startup Report', self)
+        startup_action.triggered.connect(self.show_startup_report)
+        help_menu.addAction(startup_action)
         help_menu.addSeparator()
         about_action = QAction('&About', self)
         about_action.triggered.connect(self.about_box)
@@ -126,7 +233,10 @@ class MainWindow(QMainWindow):
         sort_lbl = QLabel('Sort: ')
         toolbar.addWidget(sort_lbl)
         self.sort_dropdown = QComboBox()
-        self.sort_dropdown.addItems(['Name', 'Last modified date', 'File Size', 'Extension', 'Default'])
+        self.sort_dropdown.addItems(['Name', 'Last modified date', 'File Size', 'Extension', 'Default',
+                                     'Seed', 'Steps', 'CFG', 'Sampler', 'Model'])
+        self.sort_dropdown.setToolTip('Seed, Steps, CFG, Sampler and Model come from the metadata index.\n'
+                                      'Images without them, or not indexed yet, are sorted last.')
         self.sort_dropdown.activated.connect(self.on_sort_changed)
         toolbar.addWidget(self.sort_dropdown)
 
@@ -139,26 +249,176 @@ class MainWindow(QMainWindow):
         toggle_metapanel_action.triggered.connect(self.toggle_metadata_panel)
         toolbar.addAction(toggle_metapanel_action)
 
+        # Prompt search. Searches every image that has been indexed
+        # not just the current directory. Results are paged.
+        toolbar.addSeparator()
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText('Search prompts...  "a phrase" or words')
+        self.search_box.setToolTip('Full-text search of the positive and negative prompts of every indexed image.\n'
+                                   'Words are prefix matched, use "quotes" for a phrase.\n'
+                                   'lora:name, checkpoint:name, vae:name, embedding:name... (or model:name\n'
+                                   'for any kind) finds the images that used a model.')
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setMinimumWidth(250)
+        self.search_box.returnPressed.connect(lambda: self.run_search(0))
+        self.search_box.textChanged.connect(self.on_search_text_changed)
+        toolbar.addWidget(self.search_box)
+
+        self.search_prev_action = QAction('<', self)
+        self.search_prev_action.setToolTip('Previous page of search results')
+        self.search_prev_action.triggered.connect(lambda: self.run_search(self.search_page - 1))
+        self.search_prev_action.setEnabled(False)
+        toolbar.addAction(self.search_prev_action)
+        self.search_lbl = QLabel('')
+        toolbar.addWidget(self.search_lbl)
+        self.search_next_action = QAction('>', self)
+        self.search_next_action.setToolTip('Next page of search results')
+        self.search_next_action.triggered.connect(lambda: self.run_search(self.search_page + 1))
+        self.search_next_action.setEnabled(False)
+        toolbar.addAction(self.search_next_action)
+
         # Display text labels with icons
         toolbar.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
         logger.debug('exiting toolbar')
 
     def on_refresh_thumbnails(self):
         logger.debug('entering on_refresh_thumbnails()')
+        if self.thumbnail_view is None:
+            # the panels aren't built until after the first paint. see build_panels()
+            return
         sort_method = self.sort_dropdown.currentText()
         self.thumbnail_view.sort_image_files(self.current_directory, sort_method)
 
     def on_sort_changed(self, index):
         """handles sort combobox selection change."""
         logger.debug('entering on_sort_changed()')
+        if self.thumbnail_view is None:
+            return
 
         sort_method = self.sort_dropdown.itemText(index)   # get the text of the current index
-        curr_text = self.sort_dropdown.currentText()
-        curr_idx = self.sort_dropdown.currentIndex()
-        self.sortMethodChanged.connect(lambda: self.thumbnail_view.sort_image_files(self.current_directory, curr_text))
+        # re-order the thumbnails that are already there. no reload.
+        self.thumbnail_view.resort(sort_method)
         logger.debug(f"main:Sort method changed to: {sort_method}")
         self.sortMethodChanged.emit(sort_method)
 
+    def run_search(self, page):
+        """
+        Search the prompts in the metadata index and show a page of
+        results in the thumbnail view.
+        Args: int - page number of the results to show, starts at 0.
+        """
+        text = self.search_box.text().strip()
+        if not text or self.thumbnail_view is None:
+            return
+        page_size = self.SEARCH_PAGE_SIZE
+        page = max(page, 0)
+        from .metadata_index import MetadataIndex
+        paths, total = MetadataIndex.instance().search(text, limit=page_size, offset=page * page_size)
+        self.search_page = page
+        pages = max((total + page_size - 1) // page_size, 1)
+        logger.debug(f'run_search(): {text!r} page {page + 1} of {pages}, {total} matches')
+        self.search_lbl.setText(f' {total} matches, page {page + 1}/{pages} ')
+        self.search_prev_action.setEnabled(page > 0)
+        self.search_next_action.setEnabled(page + 1 < pages)
+        self.thumbnail_view.show_image_files(paths)
+
+    def show_duplicates(self, directory):
+        """
+        Show the near duplicate images in the thumbnail view.
+        Args: str - directory to look in or None for every image seen so far.
+        """
+        if directory is not None and not directory:
+            show_error_box('Select a folder first.', 'info')
+            return
+        if self.thumbnail_view is None:
+            return
+        groups, images = self.thumbnail_view.show_duplicates(directory)
+        self.search_prev_action.setEnabled(False)
+        self.search_next_action.setEnabled(False)
+        self.search_lbl.setText(f' {images} images in {groups} duplicate groups ')
+
+    def show_prompt_clusters(self, directory):
+        """
+        Show the images grouped by nearly the same prompt.
+        Args: str - directory to look in or None for every indexed image.
+        """
+        if directory is not None and not directory:
+            show_error_box('Select a folder first.', 'info')
+            return
+        if self.thumbnail_view is None:
+            return
+        groups, images = self.thumbnail_view.show_prompt_clusters(directory)
+        self.search_prev_action.setEnabled(False)
+        self.search_next_action.setEnabled(False)
+        self.search_lbl.setText(f' {images} images in {groups} prompt groups ')
+
+    def on_search_text_changed(self, text):
+        """ search box cleared. go back to showing the current directory """
+        if text or self.thumbnail_view is None:
+            return
+        self.search_page = 0
+        self.search_lbl.setText('')
+        self.search_prev_action.setEnabled(False)
+        self.search_next_action.setEnabled(False)
+        if self.current_directory:
+            self.thumbnail_view.sort_image_files(self.current_directory, self.sort_dropdown.currentText())
+
+    def start_slideshow(self):
+        """ ask how long each image is shown then start the slideshow. """
+        if self.thumbnail_view is None:
+            return
+        from .slideshow import DEFAULT_INTERVAL_MS, MIN_INTERVAL_MS
+        if self.slideshow_interval is None:
+            self.slideshow_interval = DEFAULT_INTERVAL_MS
+        seconds, ok = QInputDialog.getDouble(self, 'Slideshow', 'Seconds per image:',
+                                             self.slideshow_interval / 1000, MIN_INTERVAL_MS / 1000, 600, 1)
+        if ok:
+            self.slideshow_interval = int(seconds * 1000)
+            self.thumbnail_view.start_slideshow(self.slideshow_interval)
+
+    def set_view_budget(self):
+        """ ask for the memory EyeSight may use for one image. see decode_policy.py """
+        from .decode_policy import MIN_VIEW_BUDGET_MB, DecodePolicy
+        policy = DecodePolicy.instance()
+        budget_mb, ok = QInputDialog.getInt(
+            self, 'EyeSight Memory Budget',
+            'Most memory, in MB, for one image in EyeSight.\n'
+            'Bigger images are shown at 1/2, 1/4... size:',
+            policy.view_budget >> 20, MIN_VIEW_BUDGET_MB, 64 * 1024, 64)
+        if ok:
+            policy.set_view_budget_mb(budget_mb)
+            logger.info(f'view budget set to {budget_mb} MB, allocation limit {policy.allocation_limit_mb} MB')
+
+    def toggle_perf_hud(self, checked):
+        """ show / hide the HUD. The timings are only taken while it's showing. """
+        self.perf_hud.set_active(checked)
+
+    def toggle_trace(self, checked):
+        """ start recording a trace, or stop and save it. see perf.py """
+        stats = PerfStats.instance()
+        if checked:
+            stats.start_trace()
+            return
+        if not stats.stop_trace():
+            show_error_box('Nothing was recorded. Open a folder or an image while recording.', 'info')
+            return
+        default = str(Path.home() / f'latenteye-trace-{datetime.now():%Y%m%d-%H%M%S}.json')
+        path, _ = QFileDialog.getSaveFileName(self, 'Save Trace', default, 'Chrome trace (*.json)')
+        if not path:
+            return
+        try:
+            stats.save_trace(path)
+        except OSError as e:
+            logger.error(f'toggle_trace(): unable to save {path}: {e}')
+            show_error_box(f'<strong>Unable to save the trace</strong> {path}: <br> {e}', 'warning')
+            return
+        show_error_box(f'Trace saved to {path}<br>Open it in chrome://tracing or https://ui.perfetto.dev', 'info')
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.perf_hud.isVisible():
+            self.perf_hud.place()
+
     def toggle_files_panel(self):
         """
         does what it says. its not a unicorn farting rainbows
@@ -200,6 +460,35 @@ class MainWindow(QMainWindow):
                           'Thanks to <a href="https://www.svgrepo.com" target="_blank">SVG Repo</a> for the icons used in LatentEye.'
                           f'<p style="font-size: small;">version {Settings.VERSION}</p>')
 
+    def memory_usage(self):
+        """
+        What LatentEye is using memory for.
+        Returns: list of (label, bytes or None if unknown)
+        """
+        from .decode_policy import DecodePolicy, process_memory
+        from .image_pyramid import TileCache
+        policy = DecodePolicy.instance()
+        manager = self.eye_sight_manager()
+        return [('LatentEye process', process_memory()),
+                ('EyeSight decoded images', manager.decoded_pixels() * 4 if manager else 0),
+                ('Image tile cache', TileCache.instance().bytes),
+                ('Largest image decode (Qt limit)', policy.allocation_limit_mb * 1024 * 1024),
+                ('EyeSight full size decode budget', policy.view_budget),
+                ('Free system memory', available_memory())]
+
+    def show_memory_usage(self):
+        """ Help > Memory Usage """
+        rows = []
+        for label, value in self.memory_usage():
+            amount = 'unknown' if value is None else f'{value / (1024 * 1024):,.0f} MB'
+            logger.info(f'memory usage: {label}: {amount}')
+            rows.append(f'<tr><td>{label}</td><td align="right">&nbsp;&nbsp;{amount}</td></tr>')
+        show_error_box(f'<strong>Memory Usage</strong><table>{"".join(rows)}</table>', 'info')
+
+    def show_startup_report(self):
+        """ Help > Startup Report. see startup.py """
+        show_error_box(StartupTimer.instance().report_html(), 'info')
+
     def get_selected_directory(self, selected_dir):
         """
         Based on directory selected in file tree, updates thumbnails.
@@ -210,6 +499,8 @@ class MainWindow(QMainWindow):
         # the dropdown showing one thing and the FileTree another
         curr_dir = selected_dir
         self.current_directory = selected_dir
+        if self.thumbnail_view is None:
+            return
         curr_sort = self.sort_dropdown.currentText()
         logger.debug('get_selected_directory(): calling load_thumbnails')
         self.thumbnail_view.sort_image_files(self.current_directory, curr_sort)
@@ -220,12 +511,65 @@ class MainWindow(QMainWindow):
         in right side of MainWindow.
         """
         logger.debug(f'get_thumbnail_metadata(): {selected_tn}')
+        if self.info_view is None:
+            return
         self.info_view.show_metadata(selected_tn)
 
+    def restore_session(self):
+        """
+        Open the directory and EyeSight windows of the last session. The
+        thumbnails and the metadata index of the directory are worked on
+        in the background, same as when a directory is clicked on.
+        """
+        saved = self.saved_session
+        directory = saved['directory']
+        if not directory:
+            return
+        logger.info(f'restore_session(): {directory}')
+        if saved['sort_by'] and self.sort_dropdown.findText(saved['sort_by']) >= 0:
+            self.sort_dropdown.setCurrentText(saved['sort_by'])
+        self.filetree_view.show_directory(directory)
+        self.thumbnail_view.restore_selection = saved['selected']
+        self.get_selected_directory(directory)
+        if saved['eye_sight']:
+            from .eye_sight import EyeSightManager
+            manager = EyeSightManager.instance()
+            # every saved window gets its own window back, whatever the setting is.
+            manager.multi_window = True
+            image_files = self.thumbnail_view.image_files
+            for image_path in saved['eye_sight']:
+                manager.open(image_path, None, image_files if image_path in image_files else [image_path])
+            manager.set_multi_window(saved['multi_window'])
+            # the main window stays in front. EyeSight raised itself.
+            self.activateWindow()
+
+    @staticmethod
+    def eye_sight_manager():
+        """ the EyeSightManager or None if EyeSight hasn't been used, so it isn't imported just to ask. """
+        eye_sight = sys.modules.get(f'{__package__}.eye_sight')
+        return eye_sight.EyeSightManager.instance() if eye_sight is not None else None
+
+    def save_session(self):
+        """ save what is open now. see session.py """
+        if self.thumbnail_view is None:
+            # closed before it was all there. keep the last one.
+            return
+        selected = self.thumbnail_view.selected_path()
+        manager = self.eye_sight_manager()
+        self.session.save(directory=self.current_directory,
+                          sort_by=self.sort_dropdown.currentText(),
+                          selected=selected,
+                          geometry=self.saveGeometry(),
+                          splitter_sizes=self.splitter.sizes(),
+                          eye_sight=[window.picture_path for window in manager.windows] if manager else [],
+                          multi_window=manager.multi_window if manager else self.saved_session['multi_window'])
+
     def closeEvent(self, event):
         """
         Ensures all windows are closed when the main window is closed.
         """
+        # before the EyeSight windows are closed.
+        self.save_session()
         QApplication.closeAllWindows()
         super().closeEvent(event)
         event.accept()
@@ -0,0 +1,158 @@
+# metadata_diff.py
+# Side by side metadata of two images with the differences highlighted.
+#
+# Two re-rolls usually differ in a seed, a cfg and maybe a few words of
+# the prompt. Finding those by eyeballing two metadata tables is no fun.
+# This lines up the two metadata dicts field by field, marks the fields
+# that are different and, for the prompts, shows which words changed.
+#
+# The metadata comes from the MetadataIndex, the same dicts the metadata
+# panel shows, so no image files are opened to show the diff.
+#
+# Date: Oct 2026
+
+import difflib
+import html
+import logging
+import re
+from pathlib import Path
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import (QDialog, QSplitter, QTableWidget, QTableWidgetItem,
+                             QTextBrowser, QVBoxLayout)
+
+from .latent_tools import Style
+from .metadata_index import MetadataIndex
+from .metadatatable import MetadataModel
+
+logger = logging.getLogger(__name__)
+
+CHANGED_COLOR = '#7A5C00'       # dark amber
+MISSING_COLOR = '#5C1F1F'       # dark red
+# the fields that get a word by word diff.
+PROMPT_FIELDS = ('positive', 'negative', 'positive_sdxl', 'negative_sdxl')
+
+
+def diff_fields(first, second):
+    """
+    Line up two metadata dicts.
+    Args: two dicts from read_image_metadata(). Either can be empty.
+    Returns: list of (key, first value, second value, changed). Values
+             are None when the image doesn't have the key. The keys of the
+             first image come first in their order, then any the second
+             has that the first doesn't.
+    """
+    keys = list(first) + [k for k in second if k not in first]
+    rows = []
+    for key in keys:
+        a, b = first.get(key), second.get(key)
+        rows.append((key, a, b, str(a) != str(b)))
+    return rows
+
+
+def tokenize(text):
+    """ words, punctuation and the white space between them. joined back together they are the text. """
+    return re.findall(r'\w+|[^\w\s]|\s+', text)
+
+
+def token_diff(first, second):
+    """
+    Word level diff of two strings.
+    Returns: list of (tag, first text, second text). tag is 'equal',
+             'replace', 'delete' or 'insert' same as difflib.
+    """
+    a, b = tokenize(first), tokenize(second)
+    # autojunk would treat common words (, and the) as junk in long prompts
+    # and give strange diffs. prompts are a few hundred tokens, it's cheap.
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return [(tag, ''.join(a[i1:i2]), ''.join(b[j1:j2])) for tag, i1, i2, j1, j2 in matcher.get_opcodes()]
+
+
+def token_diff_html(first, second):
+    """
+    HTML of a word level diff. Removed text is struck through in red,
+    added text is green.
+    """
+    parts = []
+    for tag, a, b in token_diff(first, second):
+        if tag == 'equal':
+            parts.append(html.escape(a))
+            continue
+        if a:
+            parts.append(f'<span style="color:#FF6E6E; text-decoration:line-through;">{html.escape(a)}</span>')
+        if b:
+            parts.append(f'<span style="color:#7CFC7C;">{html.escape(b)}</span>')
+    return ''.join(parts)
+
+
+def indexed_metadata(image_path):
+    """
+    Metadata of an image from the index. If the image was never indexed,
+    or has changed on disk since, it's read (and indexed) again.
+    Returns: dict. empty if there is no metadata.
+    """
+    return MetadataIndex.instance().cached_metadata(image_path) or {}
+
+
+class MetadataDiffView(QDialog):
+    """
+    Non-modal dialog comparing the metadata of two images.
+    Args:
+        first_path, second_path = str. FQPN of the two images.
+        first, second = dict. metadata to compare. Read from the
+                        index when not given.
+    """
+    def __init__(self, first_path, second_path, first=None, second=None, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        first_name, second_name = Path(first_path).name, Path(second_path).name
+        self.setWindowTitle(f'Compare - {first_name} / {second_name}')
+        self.resize(1100, 750)
+
+        if first is None:
+            first = indexed_metadata(first_path)
+        if second is None:
+            second = indexed_metadata(second_path)
+        rows = diff_fields(first, second)
+
+        self.table = QTableWidget(len(rows), 3, self)
+        self.table.setHorizontalHeaderLabels(['Image Info', first_name, second_name])
+        Style.set_table_styling(self.table)
+        self.table.setWordWrap(True)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        for row, (key, a, b, changed) in enumerate(rows):
+            items = [QTableWidgetItem(str(key).capitalize()),
+                     QTableWidgetItem('' if a is None else MetadataModel.display_value(key, a)),
+                     QTableWidgetItem('' if b is None else MetadataModel.display_value(key, b))]
+            for column, item in enumerate(items):
+                if changed:
+                    missing = (a is None and column == 1) or (b is None and column == 2)
+                    item.setBackground(QColor(MISSING_COLOR if missing else CHANGED_COLOR))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+                self.table.setItem(row, column, item)
+        self.table.setColumnWidth(0, 160)
+        self.table.setColumnWidth(1, 440)
+        self.table.setColumnWidth(2, 440)
+        self.table.resizeRowsToContents()
+
+        # word level diff of the prompts that changed.
+        self.prompt_diff = QTextBrowser(self)
+        sections = []
+        for key, a, b, changed in rows:
+            if changed and key in PROMPT_FIELDS:
+                sections.append(f'<h3>{html.escape(str(key).capitalize())}</h3>'
+                                f'<p>{token_diff_html(str(a or ""), str(b or ""))}</p>')
+        changed_count = sum(r[3] for r in rows)
+        if not sections:
+            sections.append('<p>The prompts are the same.</p>' if changed_count else
+                            '<p>The metadata is the same.</p>')
+        self.prompt_diff.setHtml(''.join(sections))
+
+        splitter = QSplitter(Qt.Orientation.Vertical, self)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.prompt_diff)
+        splitter.setSizes([450, 300])
+        layout = QVBoxLayout(self)
+        layout.addWidget(splitter)
+        logger.debug(f'MetadataDiffView: {changed_count} of {len(rows)} fields differ')
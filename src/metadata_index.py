@@ -0,0 +1,632 @@
+# metadata_index.py
+# The LatentEye library index.
+#
+# A small SQLite database that remembers the metadata that
+# read_image_metadata() pulled out of every image we have looked at.
+# Re-reading PNG chunks for every search would be painfully slow so
+# the prompts are kept in a FTS5 (full-text search) table and the
+# parsed metadata dict is stored as JSON next to it.
+#
+# The index is a cache. If it gets deleted it just gets rebuilt the
+# next time a directory is opened. It lives in the users cache dir,
+# e.g. ~/.cache/LatentEye/metadata_index.sqlite on Linux.
+#
+# Each thread gets its own sqlite connection. sqlite connections
+# can't be shared between threads and the IndexWorker runs in the
+# QThreadPool.
+#
+# The model assets (checkpoints, LoRAs, VAEs...) of each image are in
+# their own table so "which images used this LoRA" is a simple indexed
+# query. See model_assets.py
+#
+# The sort_keys table holds the generation parameters the thumbnail grid
+# can be sorted by (seed, steps, cfg...) so sorting a directory is one
+# query instead of opening every file.
+#
+# image_hashes holds the perceptual hash of each thumbnail, see
+# duplicates.py. It has its own mtime and size since the hashes come from
+# the ThumbnailWorker, not the IndexWorker.
+#
+# prompt_minhash and prompt_bands are the MinHash signature and LSH
+# buckets of each positive prompt for finding near duplicate prompts.
+# see prompt_similarity.py
+#
+# Date: Oct 2026
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from PyQt6.QtCore import pyqtSignal, pyqtSlot, QObject, QRunnable, QStandardPaths
+
+from .latent_tools import Settings
+from .model_assets import ASSET_KINDS, normalize_name
+from .perf import hit, span
+from .prompt_similarity import (band_keys, cluster_buckets, minhash_signature, pack_signature,
+                                similarity, unpack_signature, DEFAULT_THRESHOLD)
+from .sd_metadata import read_image_metadata
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS images (
+        id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        directory TEXT NOT NULL,
+        mtime REAL NOT NULL,
+        size INTEGER NOT NULL,
+        metadata TEXT
+    );
+    CREATE INDEX IF NOT EXISTS images_directory ON images(directory);
+    CREATE VIRTUAL TABLE IF NOT EXISTS prompts USING fts5(
+        positive, negative,
+        tokenize = 'unicode61',
+        prefix = '2 3'
+    );
+    CREATE TABLE IF NOT EXISTS assets (
+        image_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL COLLATE NOCASE,
+        file TEXT,
+        strength_model REAL,
+        strength_clip REAL
+    );
+    CREATE INDEX IF NOT EXISTS assets_name ON assets(name, kind);
+    CREATE INDEX IF NOT EXISTS assets_image ON assets(image_id);
+    CREATE TABLE IF NOT EXISTS sort_keys (
+        image_id INTEGER PRIMARY KEY,
+        seed INTEGER,
+        steps INTEGER,
+        cfg REAL,
+        sampler TEXT,
+        model TEXT
+    );
+    CREATE TABLE IF NOT EXISTS image_hashes (
+        path TEXT PRIMARY KEY,
+        directory TEXT NOT NULL,
+        mtime REAL NOT NULL,
+        size INTEGER NOT NULL,
+        dhash INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS image_hashes_directory ON image_hashes(directory);
+    CREATE TABLE IF NOT EXISTS prompt_minhash (
+        image_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS prompt_bands (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        image_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, image_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS prompt_bands_image ON prompt_bands(image_id);
+"""
+# bump this when SCHEMA changes. An older index is thrown away and rebuilt.
+SCHEMA_VERSION = 5
+DROP_SCHEMA = """
+    DROP TABLE IF EXISTS prompt_bands;
+    DROP TABLE IF EXISTS prompt_minhash;
+    DROP TABLE IF EXISTS image_hashes;
+    DROP TABLE IF EXISTS sort_keys;
+    DROP TABLE IF EXISTS assets;
+    DROP TABLE IF EXISTS prompts;
+    DROP TABLE IF EXISTS images;
+"""
+
+
+# sort_keys columns. NULL when the image doesn't have it.
+SORT_FIELDS = ('seed', 'steps', 'cfg', 'sampler', 'model')
+
+
+def _number(value, kind=float):
+    """ metadata values are whatever the generator wrote. '7', 7.0, '7.5'... """
+    try:
+        try:
+            number = kind(value)
+        except ValueError:
+            # '7.0' for steps
+            number = kind(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    # sqlite integers are 64 bit. ComfyUI seeds go all the way to 2**64 - 1.
+    return float(number) if kind is int and abs(number) >= 2 ** 63 else number
+
+
+def metadata_sort_keys(metadata):
+    """
+    The sort_keys of a metadata dict.
+    Returns: tuple in SORT_FIELDS order. None for anything unknown.
+    """
+    def text(value):
+        value = str(value).strip() if value is not None else ''
+        return value if value and value != 'Unknown' else None
+    return (_number(metadata.get('seed'), int),
+            _number(metadata.get('steps'), int),
+            _number(metadata.get('cfg scale', metadata.get('cfg'))),
+            text(metadata.get('sampler')),
+            text(metadata.get('model')))
+
+
+def _to_signed(value):
+    """ sqlite integers are signed 64 bit. the hashes are unsigned. """
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def split_asset_filters(text):
+    """
+    Pull the model asset filters out of the search text.
+        'lora:detail castle' -> ([('lora', 'detail')], 'castle')
+    The kind is one of ASSET_KINDS, or 'model' for any kind. The name can
+    be "quoted" if it has spaces.
+    Returns: (list of (kind, name), the rest of the text)
+    """
+    filters = []
+
+    def take(match):
+        kind = match.group(1).lower()
+        if kind != 'model' and kind not in ASSET_KINDS:
+            return match.group(0)
+        name = match.group(3) if match.group(3) is not None else match.group(2)
+        if name:
+            filters.append((kind, name))
+        return ' '
+    rest = re.sub(r'\b(\w+):("([^"]*)"|\S+)', take, text)
+    return filters, rest.strip()
+
+
+def build_match_query(text):
+    """
+    Turn what the user typed in the search box into an FTS5 MATCH query.
+    "quoted words" are a phrase, everything else is a word that is
+    prefix matched. All of them must match.
+    Args: (str) search text
+    Returns: (str) FTS5 query or '' if there is nothing to search for.
+    """
+    # FTS5 has its own query syntax with operators and column filters.
+    # Users shouldn't have to know it, and a stray - or : in a prompt
+    # shouldn't blow up the query, so only words make it through.
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if phrase:
+            words = re.findall(r'\w+', phrase)
+            if words:
+                terms.append('"' + ' '.join(words) + '"')
+        else:
+            terms.extend(f'"{w}"*' for w in re.findall(r'\w+', word))
+    return ' '.join(terms)
+
+
+class MetadataIndex:
+    """
+    SQLite backed index of image metadata with full-text search over
+    the positive and negative prompts.
+    Use MetadataIndex.instance() to get the shared index.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    # positive prompt matches count more than negative prompt matches.
+    POSITIVE_WEIGHT = 1.0
+    NEGATIVE_WEIGHT = 0.4
+    # bm25 has to score every match before it can sort them. With more
+    # matches than this the query is too vague for the ranking to mean
+    # much, so the newest indexed images are shown first instead. This
+    # keeps a search of a 100k image library well under 50ms.
+    RANK_LIMIT = 10000
+
+    def __init__(self, db_path=None):
+        self.db_path = str(db_path or self.default_path())
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    @classmethod
+    def instance(cls):
+        """ The one and only shared index. Created on first use. """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @staticmethod
+    def default_path():
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+        return Path(cache_dir) / Settings.APPNAME.value / 'metadata_index.sqlite'
+
+    def connection(self):
+        """ sqlite connection for the calling thread. """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            # WAL lets the GUI thread search while a worker is writing.
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self._schema_lock:
+                if not self._schema_ready:
+                    if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                        # it's a cache. start over rather than migrate.
+                        conn.executescript(DROP_SCHEMA)
+                    conn.executescript(SCHEMA)
+                    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+                    conn.commit()
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, image_path):
+        """
+        Get the stored record for an image.
+        Returns: (mtime, size, metadata) or None if the image isn't indexed.
+                 metadata is a dict or False if the image has no SD metadata.
+        """
+        row = self.connection().execute(
+            'SELECT mtime, size, metadata FROM images WHERE path = ?', (str(image_path),)).fetchone()
+        if row is None:
+            return None
+        mtime, size, md_json = row
+        return mtime, size, (json.loads(md_json) if md_json else False)
+
+    def is_fresh(self, image_path, stat=None):
+        """ True if the image is indexed and hasn't changed since. """
+        stat = stat or os.stat(image_path)
+        row = self.connection().execute(
+            'SELECT mtime, size FROM images WHERE path = ?', (str(image_path),)).fetchone()
+        return row is not None and row[0] == stat.st_mtime and row[1] == stat.st_size
+
+    def get_metadata(self, image_path):
+        """
+        Cached metadata for an image, if the cache is still valid.
+        Returns: dict, False if the image has no metadata or None if
+                 the image isn't indexed or has changed on disk.
+        """
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        record = self.lookup(image_path)
+        if record is None or record[0] != stat.st_mtime or record[1] != stat.st_size:
+            return None
+        return record[2]
+
+    def cached_metadata(self, image_path):
+        """
+        Metadata for an image from the index. If the image isn't indexed
+        yet, or has changed, it's read with read_image_metadata() and
+        (re)indexed.
+        Returns: dict or False if the image has no metadata.
+        Raises: whatever read_image_metadata() raises.
+        """
+        stat = os.stat(image_path)
+        try:
+            record = self.lookup(image_path)
+            fresh = record is not None and record[0] == stat.st_mtime and record[1] == stat.st_size
+            hit('metadata index', fresh)
+            if fresh:
+                return record[2]
+        except sqlite3.Error as e:
+            logger.error(f'cached_metadata(): index lookup failed: {e}')
+            return read_image_metadata(image_path)
+
+        with span('metadata parse', image_path):
+            metadata = read_image_metadata(image_path)
+        try:
+            self.store(image_path, metadata, stat)
+        except sqlite3.Error as e:
+            logger.error(f'cached_metadata(): unable to index {image_path}: {e}')
+        return metadata
+
+    def store(self, image_path, metadata, stat=None, commit=True):
+        """
+        Add or update an image in the index.
+        Args:
+            image_path = str. FQPN of the image.
+            metadata = dict from read_image_metadata() or False.
+            stat = os.stat_result. saves a stat if the caller already has it.
+            commit = bool. False when batching, call commit() afterwards.
+        """
+        stat = stat or os.stat(image_path)
+        image_path = str(image_path)
+        conn = self.connection()
+        md_json = json.dumps(metadata, default=str) if metadata else None
+        image_id = conn.execute(
+            """INSERT INTO images (path, directory, mtime, size, metadata)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(path) DO UPDATE SET
+                   mtime = excluded.mtime, size = excluded.size, metadata = excluded.metadata
+               RETURNING id""",
+            (image_path, str(Path(image_path).parent), stat.st_mtime, stat.st_size, md_json)).fetchone()[0]
+        conn.execute('DELETE FROM prompts WHERE rowid = ?', (image_id,))
+        conn.execute('DELETE FROM assets WHERE image_id = ?', (image_id,))
+        conn.execute('DELETE FROM sort_keys WHERE image_id = ?', (image_id,))
+        conn.execute('DELETE FROM prompt_minhash WHERE image_id = ?', (image_id,))
+        conn.execute('DELETE FROM prompt_bands WHERE image_id = ?', (image_id,))
+        signature = minhash_signature(str(metadata.get('positive') or '')) if metadata else None
+        if signature:
+            conn.execute('INSERT INTO prompt_minhash (image_id, signature) VALUES (?, ?)',
+                         (image_id, pack_signature(signature)))
+            conn.executemany('INSERT OR IGNORE INTO prompt_bands (band, bucket, image_id) VALUES (?, ?, ?)',
+                             [(band, bucket, image_id) for band, bucket in band_keys(signature)])
+        if metadata:
+            conn.execute('INSERT INTO sort_keys (image_id, seed, steps, cfg, sampler, model) VALUES (?, ?, ?, ?, ?, ?)',
+                         (image_id, *metadata_sort_keys(metadata)))
+            conn.execute('INSERT INTO prompts (rowid, positive, negative) VALUES (?, ?, ?)',
+                         (image_id, str(metadata.get('positive') or ''), str(metadata.get('negative') or '')))
+            conn.executemany(
+                'INSERT INTO assets (image_id, kind, name, file, strength_model, strength_clip) VALUES (?, ?, ?, ?, ?, ?)',
+                [(image_id, a.get('kind'), a.get('name'), a.get('file'), a.get('strength_model'), a.get('strength_clip'))
+                 for a in metadata.get('model_assets') or []])
+        if commit:
+            conn.commit()
+        return image_id
+
+    def commit(self):
+        self.connection().commit()
+
+    def remove(self, image_path):
+        """ Forget about an image. e.g. it was moved to the trash. """
+        conn = self.connection()
+        row = conn.execute('SELECT id FROM images WHERE path = ?', (str(image_path),)).fetchone()
+        if row:
+            conn.execute('DELETE FROM prompts WHERE rowid = ?', (row[0],))
+            conn.execute('DELETE FROM assets WHERE image_id = ?', (row[0],))
+            conn.execute('DELETE FROM sort_keys WHERE image_id = ?', (row[0],))
+            conn.execute('DELETE FROM prompt_minhash WHERE image_id = ?', (row[0],))
+            conn.execute('DELETE FROM prompt_bands WHERE image_id = ?', (row[0],))
+            conn.execute('DELETE FROM images WHERE id = ?', (row[0],))
+        conn.execute('DELETE FROM image_hashes WHERE path = ?', (str(image_path),))
+        conn.commit()
+
+    def sort_keys(self, directory):
+        """
+        The sort keys of every indexed image in a directory.
+        Args: str. the directory
+        Returns: dict of path: tuple in SORT_FIELDS order. Images that
+                 aren't indexed yet, or have no metadata, aren't in it.
+        """
+        rows = self.connection().execute(
+            """SELECT images.path, seed, steps, cfg, sampler, model
+               FROM images JOIN sort_keys ON sort_keys.image_id = images.id
+               WHERE images.directory = ?""", (str(directory),)).fetchall()
+        return {r[0]: r[1:] for r in rows}
+
+    def image_hashes(self, directory=None):
+        """
+        The stored perceptual hashes.
+        Args: str. only the images in this directory. None for all of them.
+        Returns: dict of path: (mtime, size, dhash)
+        """
+        if directory is None:
+            rows = self.connection().execute('SELECT path, mtime, size, dhash FROM image_hashes')
+        else:
+            rows = self.connection().execute(
+                'SELECT path, mtime, size, dhash FROM image_hashes WHERE directory = ?', (str(directory),))
+        return {path: (mtime, size, _to_unsigned(dhash)) for path, mtime, size, dhash in rows}
+
+    def store_hash(self, image_path, dhash, stat, commit=True):
+        """ Add or update the perceptual hash of an image. """
+        image_path = str(image_path)
+        conn = self.connection()
+        conn.execute(
+            """INSERT OR REPLACE INTO image_hashes (path, directory, mtime, size, dhash)
+               VALUES (?, ?, ?, ?, ?)""",
+            (image_path, str(Path(image_path).parent), stat.st_mtime, stat.st_size, _to_signed(dhash)))
+        if commit:
+            conn.commit()
+
+    def similar_prompts(self, image_path, threshold=DEFAULT_THRESHOLD):
+        """
+        Images with nearly the same positive prompt as this one.
+        Only the images that share an LSH bucket with it are looked at.
+        Returns: list[str] image paths, most similar first, starting with
+                 the image itself. Empty if it isn't indexed or has no prompt.
+        """
+        image_path = str(image_path)
+        conn = self.connection()
+        row = conn.execute(
+            """SELECT images.id, signature FROM images JOIN prompt_minhash ON prompt_minhash.image_id = images.id
+               WHERE images.path = ?""", (image_path,)).fetchone()
+        if row is None:
+            return []
+        image_id, signature = row[0], unpack_signature(row[1])
+        rows = conn.execute(
+            """SELECT images.path, prompt_minhash.signature FROM prompt_minhash
+               JOIN images ON images.id = prompt_minhash.image_id
+               WHERE prompt_minhash.image_id IN (
+                   SELECT b2.image_id FROM prompt_bands b1
+                   JOIN prompt_bands b2 ON b2.band = b1.band AND b2.bucket = b1.bucket
+                   WHERE b1.image_id = ?)""", (image_id,)).fetchall()
+        scored = [(similarity(signature, unpack_signature(sig)), path) for path, sig in rows]
+        scored = [(score, path) for score, path in scored if score >= threshold or path == image_path]
+        scored.sort(key=lambda s: (s[1] != image_path, -s[0], s[1]))
+        return [path for _score, path in scored]
+
+    def prompt_clusters(self, directory=None, threshold=DEFAULT_THRESHOLD):
+        """
+        Group the images by near duplicate positive prompts.
+        Args:
+            directory = str. only the images in this directory. None for all.
+            threshold = float. see prompt_similarity.py
+        Returns: list of clusters, biggest first. Each is a list of 2 or
+                 more image paths.
+        """
+        conn = self.connection()
+        if directory is None:
+            join, params = '', ()
+        else:
+            join, params = 'JOIN images ON images.id = image_id AND images.directory = ?', (str(directory),)
+        # every bucket with more than one image in it.
+        buckets = [[int(i) for i in ids.split(',')] for (ids,) in conn.execute(
+            f"""SELECT group_concat(image_id) FROM prompt_bands {join}
+                GROUP BY band, bucket HAVING count(*) > 1""", params)]
+        if not buckets:
+            return []
+        signatures = {image_id: unpack_signature(sig) for image_id, sig in conn.execute(
+            f'SELECT image_id, signature FROM prompt_minhash {join}', params)}
+        clusters = cluster_buckets(buckets, signatures, threshold)
+        paths = dict(conn.execute('SELECT id, path FROM images' + (' WHERE directory = ?' if params else ''),
+                                  params).fetchall())
+        return [sorted(paths[i] for i in cluster) for cluster in clusters]
+
+    @staticmethod
+    def _asset_clause(filters):
+        """
+        SQL, and its parameters, that limits images.id to the images that
+        use every one of the model asset filters. Names are prefix matched.
+        """
+        sql, params = [], []
+        for kind, name in filters:
+            pattern = re.sub(r'([\\%_])', r'\\\1', normalize_name(name)) + '%'
+            if kind == 'model':
+                sql.append("images.id IN (SELECT image_id FROM assets WHERE name LIKE ? ESCAPE '\\')")
+                params.append(pattern)
+            else:
+                sql.append("images.id IN (SELECT image_id FROM assets WHERE name LIKE ? ESCAPE '\\' AND kind = ?)")
+                params.extend((pattern, kind))
+        return ' AND '.join(sql), params
+
+    def images_using(self, name, kind=None):
+        """
+        Every indexed image that used a model asset.
+        Args:
+            name = str. model name or file name. prefix matched.
+            kind = str. one of ASSET_KINDS or None for any kind.
+        Returns: list[str] image paths, newest indexed first.
+        """
+        where, params = self._asset_clause([(kind or 'model', name)])
+        rows = self.connection().execute(
+            f'SELECT path FROM images WHERE {where} ORDER BY images.id DESC', params).fetchall()
+        return [r[0] for r in rows]
+
+    def assets(self, image_path):
+        """ The model assets of an indexed image. list of dicts, see model_assets.py """
+        rows = self.connection().execute(
+            """SELECT kind, name, file, strength_model, strength_clip FROM assets
+               JOIN images ON images.id = assets.image_id WHERE images.path = ?""",
+            (str(image_path),)).fetchall()
+        return [dict(zip(('kind', 'name', 'file', 'strength_model', 'strength_clip'), r)) for r in rows]
+
+    def search(self, text, limit=200, offset=0):
+        """
+        Full-text search of the positive and negative prompts.
+        Best matches first. (see RANK_LIMIT)
+        Model asset filters like lora:name or checkpoint:name can be mixed
+        in. see split_asset_filters()
+        Args:
+            text = str. what the user typed. see build_match_query()
+            limit = int. page size
+            offset = int. first result of the page
+        Returns: (list[str], int) paths of the matching images for this
+                 page and the total number of matches.
+        """
+        filters, text = split_asset_filters(text)
+        query = build_match_query(text)
+        if not query and not filters:
+            return [], 0
+        asset_sql, asset_params = self._asset_clause(filters)
+        conn = self.connection()
+        try:
+            if not query:
+                # only asset filters. no prompt text to rank by.
+                total = conn.execute(f'SELECT count(*) FROM images WHERE {asset_sql}', asset_params).fetchone()[0]
+                rows = conn.execute(
+                    f'SELECT path FROM images WHERE {asset_sql} ORDER BY images.id DESC LIMIT ? OFFSET ?',
+                    (*asset_params, limit, offset)).fetchall()
+                return [r[0] for r in rows], total
+
+            where = 'prompts MATCH ?' + (f' AND {asset_sql}' if asset_sql else '')
+            params = (query, *asset_params)
+            total = conn.execute(
+                f'SELECT count(*) FROM prompts JOIN images ON images.id = prompts.rowid WHERE {where}',
+                params).fetchone()[0]
+            if total <= self.RANK_LIMIT:
+                rows = conn.execute(
+                    f"""SELECT images.path FROM prompts JOIN images ON images.id = prompts.rowid
+                       WHERE {where}
+                       ORDER BY bm25(prompts, ?, ?)
+                       LIMIT ? OFFSET ?""",
+                    (*params, self.POSITIVE_WEIGHT, self.NEGATIVE_WEIGHT, limit, offset)).fetchall()
+            else:
+                rows = conn.execute(
+                    f"""SELECT images.path FROM prompts JOIN images ON images.id = prompts.rowid
+                       WHERE {where}
+                       ORDER BY prompts.rowid DESC
+                       LIMIT ? OFFSET ?""",
+                    (*params, limit, offset)).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f'search(): bad query {query!r}: {e}')
+            return [], 0
+        logger.debug(f'search(): {query!r} {filters} matched {total}')
+        return [r[0] for r in rows], total
+
+
+class IndexWorkerSignals(QObject):
+    """
+    Index Worker Signals -
+        progress: (int, int): index and total count.
+        finished: Emitted when all files have been indexed or cancelled.
+    """
+    finished = pyqtSignal()
+    progress = pyqtSignal(int, int)
+
+
+class IndexWorker(QRunnable):
+    """
+    Background worker that keeps the MetadataIndex up to date for a list of
+    image files. Unchanged files are skipped so re-opening a directory is cheap.
+    Args:
+        file_paths = (list[str]) image files to index.
+        cancel_flag = (list[bool]) Mutable flag to cancel the worker from the main thread.
+        index = MetadataIndex. defaults to the shared index.
+    """
+    # commit every this many files. one commit per file is slow.
+    BATCH_SIZE = 50
+
+    def __init__(self, file_paths, cancel_flag, index=None):
+        super().__init__()
+        self.filepaths = list(file_paths)
+        self.cancel_flag = cancel_flag
+        self.index = index or MetadataIndex.instance()
+        self.signals = IndexWorkerSignals()
+
+    @pyqtSlot()
+    def run(self):
+        logger.debug(f'IndexWorker: indexing {len(self.filepaths)} files.')
+        indexed = 0
+        for i, filepath in enumerate(self.filepaths):
+            if self.cancel_flag[0]:
+                logger.debug('IndexWorker canceled.')
+                break
+            try:
+                stat = os.stat(filepath)
+                if self.index.is_fresh(filepath, stat):
+                    continue
+                try:
+                    with span('metadata parse', filepath):
+                        metadata = read_image_metadata(filepath)
+                except Exception as e:
+                    # a broken image is still indexed (with no metadata) so
+                    # that it isn't re-read every time the directory is opened.
+                    logger.debug(f'IndexWorker: unable to read {filepath}: {e}')
+                    metadata = False
+                self.index.store(filepath, metadata, stat, commit=False)
+                indexed += 1
+                if indexed % self.BATCH_SIZE == 0:
+                    self.index.commit()
+                    self.signals.progress.emit(i + 1, len(self.filepaths))
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f'IndexWorker: error indexing {filepath}: {e}')
+        try:
+            self.index.commit()
+        except sqlite3.Error as e:
+            logger.error(f'IndexWorker: final commit failed: {e}')
+        logger.debug(f'IndexWorker: {indexed} files (re)indexed.')
+        self.signals.finished.emit()
@@ -0,0 +1,148 @@
+# model_assets.py
+# Which models made this image?
+#
+# sd-prompt-reader gives us the checkpoint name, at best. For ComfyUI
+# images the LoRAs (and their strengths), VAEs, upscalers, ControlNets
+# and embeddings are all in the prompt JSON but buried in the node
+# inputs. This walks the prompt graph once and pulls out a flat list of
+# model assets. The list is kept in the metadata record, and in the
+# library index, so "all images using LoRA X" never needs to look at
+# the JSON again.
+#
+# Only the API prompt is used. It holds just the nodes that ran, so
+# bypassed or muted loaders in the editor workflow don't count.
+#
+# Date: Oct 2026
+
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# node input name: asset kind. Covers the stock ComfyUI loaders and most
+# custom node packs since they tend to copy the stock input names.
+ASSET_INPUTS = {
+    'ckpt_name': 'checkpoint',
+    'unet_name': 'unet',
+    'lora_name': 'lora',
+    'vae_name': 'vae',
+    'control_net_name': 'controlnet',
+    'clip_name': 'clip',
+    'clip_name1': 'clip',
+    'clip_name2': 'clip',
+    'clip_name3': 'clip',
+    'clip_vision_name': 'clip_vision',
+    'ipadapter_file': 'ipadapter',
+    'style_model_name': 'style_model',
+    'gligen_name': 'gligen',
+    'hypernetwork_name': 'hypernetwork',
+}
+# model_name is used by too many nodes to mean anything on its own.
+MODEL_NAME_NODES = {
+    'UpscaleModelLoader': 'upscaler',
+    'ImageUpscaleWithModel': 'upscaler',
+}
+ASSET_KINDS = sorted(set(ASSET_INPUTS.values()) | set(MODEL_NAME_NODES.values()) | {'embedding'})
+
+# embedding:name or embedding:name:1.2 in a prompt. The name can have
+# a sub folder, e.g. embedding:neg/easynegative
+EMBEDDING_RE = re.compile(r'embedding:([\w\-.]+(?:[/\\][\w\-.]+)*)')
+MODEL_EXTENSIONS = ('.safetensors', '.ckpt', '.pt', '.pth', '.bin', '.gguf', '.sft')
+
+
+def normalize_name(file_name):
+    """
+    The name a model is known by. Sub folders and the file extension are
+    dropped since the same LoRA is often filed differently on each machine.
+        'SDXL/loras/detail_tweaker.safetensors' -> 'detail_tweaker'
+    """
+    name = re.split(r'[/\\]', str(file_name).strip())[-1]
+    for ext in MODEL_EXTENSIONS:
+        if name.lower().endswith(ext):
+            return name[:-len(ext)]
+    return name
+
+
+def _strength(value):
+    """ strengths can be a number or a link to another node. """
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def extract_model_assets(prompt):
+    """
+    Walk a ComfyUI API prompt and list the models it used.
+    Args: dict (or the JSON str) of the prompt
+    Returns: list of dicts, one per asset, no duplicates:
+             {'kind': 'lora', 'name': 'detail_tweaker',
+              'file': 'SDXL/detail_tweaker.safetensors',
+              'strength_model': 0.8, 'strength_clip': 1.0}
+             The strengths are None unless it's a LoRA.
+    """
+    if isinstance(prompt, (str, bytes)):
+        try:
+            prompt = json.loads(prompt)
+        except ValueError as e:
+            logger.debug(f'extract_model_assets(): prompt is not JSON: {e}')
+            return []
+    if not isinstance(prompt, dict):
+        return []
+
+    assets = []
+    seen = set()
+
+    def add(kind, file_name, strength_model=None, strength_clip=None):
+        if not isinstance(file_name, str) or not file_name.strip() or file_name == 'None':
+            return
+        key = (kind, file_name, strength_model, strength_clip)
+        if key in seen:
+            return
+        seen.add(key)
+        assets.append({'kind': kind, 'name': normalize_name(file_name), 'file': file_name,
+                       'strength_model': strength_model, 'strength_clip': strength_clip})
+
+    for node in prompt.values():
+        if not isinstance(node, dict):
+            continue
+        inputs = node.get('inputs') or {}
+        if not isinstance(inputs, dict):
+            continue
+        node_kind = MODEL_NAME_NODES.get(node.get('class_type'))
+        for name, value in inputs.items():
+            if isinstance(value, list):
+                continue            # a link to another node
+            kind = ASSET_INPUTS.get(name) or (node_kind if name == 'model_name' else None)
+            if kind == 'lora':
+                strength_model = _strength(inputs.get('strength_model', inputs.get('strength')))
+                add(kind, value, strength_model, _strength(inputs.get('strength_clip')))
+            elif kind:
+                add(kind, value)
+            elif isinstance(value, str) and 'embedding:' in value:
+                for embedding in EMBEDDING_RE.findall(value):
+                    add('embedding', embedding.rstrip('.'))
+    return assets
+
+
+def format_model_assets(assets):
+    """
+    One line per asset for the metadata table.
+        lora: detail_tweaker (0.8 / 1.0)
+    """
+    lines = []
+    for asset in assets or []:
+        line = f"{asset.get('kind')}: {asset.get('name')}"
+        strengths = [s for s in (asset.get('strength_model'), asset.get('strength_clip')) if s is not None]
+        if strengths:
+            line += ' (' + ' / '.join(f'{s:g}' for s in strengths) + ')'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def display_value(key, value):
+    """
+    The text shown for a metadata value. The metadata table and the
+    clipboard copy both use this so a paste matches what is on screen.
+    """
+    if key == 'model_assets':
+        return format_model_assets(value)
+    return str(value).strip()
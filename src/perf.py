@@ -0,0 +1,356 @@
+# perf.py
+# Where the time goes while LatentEye is running.
+#
+# The slow parts (listing a directory, decoding, making pixmaps on the
+# GUI thread, the thumbnail layout, reading metadata) are wrapped in
+# spans:
+#     with span('thumbnail decode', image_path):
+#         image = reader.read()
+# Each stage's times go in a Histogram. Caches count their hits and
+# misses with hit(), and queue depths are gauges, functions that are
+# called when the numbers are shown.
+#
+# Nothing is recorded until PerfStats is enabled (View > Performance
+# HUD) or a trace is started. Until then span() hands back the same
+# do-nothing object every time, so a span costs one function call and an if.
+#
+# PerfHud is the overlay that shows it all: p50 / p95 per stage, the
+# queue depths and the cache hit rates.
+#
+# The same spans can be recorded as a trace (View > Record Trace): every
+# span, on whichever thread it ran, with the file it was for. It's saved
+# in Chrome's trace event JSON, so chrome://tracing, ui.perfetto.dev or
+# speedscope show it as a timeline with one row per thread. That's where
+# gaps in the thumbnail pipeline, idle workers and a busy GUI thread show
+# up. Thumbnails waiting in the GUI thread's event queue are async events,
+# 'thumbnail deliver', from the emit in the worker to add_thumbnail().
+#
+# Date: Oct 2026
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QLabel
+
+logger = logging.getLogger(__name__)
+
+# histogram buckets. 4 per doubling from 10 us up, about 19% apart.
+BUCKETS_PER_DOUBLING = 4
+SMALLEST_MS = 0.01
+BUCKET_COUNT = BUCKETS_PER_DOUBLING * 24
+HUD_REFRESH_MS = 500
+# about 100 MB of events. a trace stops growing after this many.
+MAX_TRACE_EVENTS = 500_000
+
+
+class Histogram:
+    """
+    Durations in ms. Only counts per bucket are kept so it's the same
+    size however many are added. Percentiles are the top of the bucket
+    they fall in, never more than the biggest time seen.
+    """
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    @staticmethod
+    def bucket(ms):
+        if ms <= SMALLEST_MS:
+            return 0
+        return min(int(math.log2(ms / SMALLEST_MS) * BUCKETS_PER_DOUBLING) + 1, BUCKET_COUNT - 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self.buckets[self.bucket(ms)] += 1
+
+    def percentile(self, p):
+        """ p = 0 to 100. 0.0 if nothing was added. """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(SMALLEST_MS * 2 ** (i / BUCKETS_PER_DOUBLING), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Span:
+    """ times a with block and adds it to its stage's histogram and the trace. see span() """
+    __slots__ = ('stats', 'stage', 'detail', 'start')
+
+    def __init__(self, stats, stage, detail=None):
+        self.stats = stats
+        self.stage = stage
+        self.detail = detail
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.finish(self, time.perf_counter())
+        return False
+
+
+class NoSpan:
+    """ what span() hands back when PerfStats is off and there's no trace. """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NO_SPAN = NoSpan()
+
+
+class PerfStats:
+    """
+    The timings, hit counts and gauges. One instance for the app, see
+    instance(). Spans run on worker threads too, so adding to it is
+    locked.
+    """
+    _instance = None
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # stage: Histogram
+        self.histograms = {}
+        # cache: [hits, misses]
+        self.hits = {}
+        # name: function returning a number
+        self.gauges = {}
+        # the trace. see start_trace()
+        self.tracing = False
+        self.trace_events = []
+        self.trace_start = 0.0
+        self.trace_dropped = 0
+        # thread ident: (tid, name) of the threads that are in the trace.
+        self._threads = {}
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+        logger.info(f'PerfStats {"on" if self.enabled else "off"}')
+
+    def span(self, stage, detail=None):
+        return Span(self, stage, detail) if self.enabled or self.tracing else NO_SPAN
+
+    def finish(self, span, end):
+        """ a Span is done. end = time.perf_counter() """
+        if self.enabled:
+            self.record(span.stage, (end - span.start) * 1000)
+        if self.tracing:
+            event = {'name': span.stage, 'ph': 'X', 'ts': self.trace_time(span.start),
+                     'dur': (end - span.start) * 1_000_000}
+            if span.detail is not None:
+                event['args'] = {'file': span.detail}
+            self.add_trace_event(event)
+
+    def record(self, stage, ms):
+        """ add a time to a stage. for times that weren't taken with span() """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.add(ms)
+
+    def hit(self, cache, found):
+        """ count a cache lookup. found = bool. """
+        if not self.enabled:
+            return
+        with self._lock:
+            counts = self.hits.setdefault(cache, [0, 0])
+            counts[0 if found else 1] += 1
+
+    def add_gauge(self, name, func):
+        """ func() is called for the number each time it's shown. Called on the GUI thread. """
+        self.gauges[name] = func
+
+    def gauge_values(self):
+        values = {}
+        for name, func in self.gauges.items():
+            try:
+                values[name] = func()
+            except RuntimeError as e:
+                # the widget it reads from was deleted.
+                logger.debug(f'PerfStats: gauge {name} failed: {e}')
+        return values
+
+    def stage_rows(self):
+        """ list of (stage, count, p50, p95, max ms), in the order they first ran. """
+        with self._lock:
+            return [(stage, h.count, h.percentile(50), h.percentile(95), h.max)
+                    for stage, h in self.histograms.items()]
+
+    def hit_rates(self):
+        """ list of (cache, hits, lookups) """
+        with self._lock:
+            return [(cache, hits, hits + misses) for cache, (hits, misses) in self.hits.items()]
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.hits.clear()
+
+    def start_trace(self):
+        """ start recording a trace. Anything recorded before is dropped. """
+        with self._lock:
+            self.trace_events = []
+            self.trace_dropped = 0
+            self._threads = {}
+            self.trace_start = time.perf_counter()
+        self.tracing = True
+        logger.info('PerfStats: recording a trace')
+
+    def stop_trace(self):
+        """ Returns: int. number of events recorded. """
+        self.tracing = False
+        logger.info(f'PerfStats: trace stopped. {len(self.trace_events)} events, {self.trace_dropped} dropped')
+        return len(self.trace_events)
+
+    def trace_time(self, perf_time):
+        """ us since the trace started. what Chrome's 'ts' is in. """
+        return (perf_time - self.trace_start) * 1_000_000
+
+    def add_trace_event(self, event):
+        """ add pid and tid and keep it. Called on any thread. """
+        ident = threading.get_ident()
+        with self._lock:
+            if len(self.trace_events) >= MAX_TRACE_EVENTS:
+                self.trace_dropped += 1
+                return
+            thread = self._threads.get(ident)
+            if thread is None:
+                # the thread pool's threads are all 'Thread (pooled)' to Qt. numbered in the order they show up.
+                name = 'GUI thread' if ident == threading.main_thread().ident else f'worker {len(self._threads)}'
+                thread = self._threads[ident] = (len(self._threads) + 1, name)
+            event['pid'] = os.getpid()
+            event['tid'] = thread[0]
+            self.trace_events.append(event)
+
+    def async_begin(self, name, key):
+        """ start of something that ends on another thread. see async_end() """
+        if self.tracing:
+            self.add_trace_event({'name': name, 'cat': name, 'ph': 'b', 'id': key,
+                                  'ts': self.trace_time(time.perf_counter())})
+
+    def async_end(self, name, key):
+        if self.tracing:
+            self.add_trace_event({'name': name, 'cat': name, 'ph': 'e', 'id': key,
+                                  'ts': self.trace_time(time.perf_counter())})
+
+    def save_trace(self, path):
+        """
+        Write the trace as Chrome trace event JSON.
+        Args: path = str. the file to write.
+        Raises: OSError if it can't be written.
+        """
+        with self._lock:
+            events = list(self.trace_events)
+            threads = list(self._threads.values())
+        pid = os.getpid()
+        names = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'LatentEye'}}]
+        names += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in threads]
+        # the GUI thread first, then the workers.
+        names += [{'name': 'thread_sort_index', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'sort_index': tid}}
+                  for tid, _name in threads]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': names + events, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': self.trace_dropped}}, f)
+        logger.info(f'PerfStats: trace saved to {path}')
+
+
+def span(stage, detail=None):
+    """
+    Time a with block as one run of a stage, if PerfStats is on or a
+    trace is being recorded.
+    Args: stage = str. e.g. 'thumbnail decode'
+          detail = str. the file it's for, shown in the trace. optional.
+    """
+    return PerfStats.instance().span(stage, detail)
+
+
+def hit(cache, found):
+    PerfStats.instance().hit(cache, found)
+
+
+class PerfHud(QLabel):
+    """
+    The overlay. Sits in the top right corner of its parent and lets
+    clicks through. Showing it turns PerfStats on, hiding it turns it off.
+    """
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.TextFormat.RichText)
+        self.setStyleSheet('QLabel { background: rgba(20, 20, 20, 200); color: #E0E0E0; '
+                           'font-family: monospace; padding: 6px; border-radius: 4px; }')
+        self.timer = QTimer(self)
+        self.timer.setInterval(HUD_REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_active(self, active):
+        PerfStats.instance().set_enabled(active)
+        if active:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def refresh(self):
+        stats = PerfStats.instance()
+        cell = '<td align="right">&nbsp;&nbsp;{}</td>'
+        rows = ''.join(f'<tr><td>{stage}</td>{cell.format(count)}{cell.format(f"{p50:.1f}")}'
+                       f'{cell.format(f"{p95:.1f}")}{cell.format(f"{top:.1f}")}</tr>'
+                       for stage, count, p50, p95, top in stats.stage_rows())
+        html = ('<table><tr><th align="left">stage (ms)</th><th>&nbsp;&nbsp;n</th><th>&nbsp;&nbsp;p50</th>'
+                f'<th>&nbsp;&nbsp;p95</th><th>&nbsp;&nbsp;max</th></tr>{rows or "<tr><td>nothing yet</td></tr>"}</table>')
+        gauges = stats.gauge_values()
+        if gauges:
+            html += '<br><table>' + ''.join(f'<tr><td>{name}</td>{cell.format(value)}</tr>'
+                                            for name, value in gauges.items()) + '</table>'
+        rates = stats.hit_rates()
+        if rates:
+            html += '<br><table>' + ''.join(
+                f'<tr><td>{cache} hits</td>{cell.format(f"{hits * 100 / lookups:.0f}%")}'
+                f'{cell.format(f"{hits}/{lookups}")}</tr>' for cache, hits, lookups in rates) + '</table>'
+        self.setText(html)
+        self.adjustSize()
+        self.place()
+
+    def place(self):
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(parent.width() - self.width() - 12, 40)
@@ -0,0 +1,220 @@
+# png_bands.py
+# Decode a big PNG at reduced size without ever holding it at full size.
+#
+# Qt's PNG reader can't decode at a smaller size or decode part of an
+# image: setScaledSize() and setClipRect() both decode the whole image
+# first and scale or crop it after. So a 20000x20000 PNG needs 1.6 GB
+# for a moment even when EyeSight only wants it at 1/4 size, and it
+# fails outright when that's over the allocation limit.
+#
+# Here the PNG is read a band of rows at a time instead. The compressed
+# image data (IDAT) is inflated as a stream, just far enough for the next
+# band, and each band is handed to Qt as a small PNG of its own, decoded,
+# scaled down and drawn into the result. PNG filters only look at the row
+# above, so each band starts with the last row of the band before, as it
+# was decoded, with no filter.
+#
+# Only the PNGs AI tools write are done this way: 8 bit gray, RGB, gray +
+# alpha and RGBA, not interlaced. Anything else returns None and is
+# decoded the usual way.
+#
+# Date: Oct 2026
+
+import logging
+import mmap
+import struct
+import zlib
+
+from PyQt6.QtCore import QPoint, QSize, Qt
+from PyQt6.QtGui import QImage, QPainter
+
+from .image_header import PNG_SIGNATURE
+
+logger = logging.getLogger(__name__)
+
+# about this much memory for one decoded band, 4 bytes a pixel. A band
+# is decoded, copied and scaled so the decode takes about 2x this on top
+# of the result.
+BAND_BYTES = 32 * 1024 * 1024
+# channels of each PNG color type that can be banded.
+CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+# which bytes of an RGBA8888 pixel are the PNG's channels, by color type.
+RGBA_CHANNELS = {0: (0,), 2: (0, 1, 2), 4: (0, 3), 6: (0, 1, 2, 3)}
+# ancillary chunks copied to every band so Qt decodes it exactly like the
+# whole image. Not the text chunks, they can be MB of workflow.
+BAND_CHUNKS = {b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'iCCP', b'sBIT'}
+
+
+def _chunk(ctype, data):
+    """ a PNG chunk, as a list of parts to join. data isn't copied. """
+    return [struct.pack('>I', len(data)), ctype, data, struct.pack('>I', zlib.crc32(data, zlib.crc32(ctype)))]
+
+
+class PngLayout:
+    """
+    What is needed to read a PNG in bands. see png_layout()
+        width, height = int. image size in pixels.
+        color_type = int. PNG color type, a key of CHANNELS.
+        idat = list of (offset, length) of the IDAT chunk data.
+        extra = bytes. the BAND_CHUNKS of the file, ready to write.
+    """
+    __slots__ = ('width', 'height', 'color_type', 'idat', 'extra')
+
+    def __init__(self, width, height, color_type, idat, extra):
+        self.width = width
+        self.height = height
+        self.color_type = color_type
+        self.idat = idat
+        self.extra = extra
+
+
+def png_layout(buf):
+    """
+    Walk the chunks of a PNG.
+    Args: buf = mmap or bytes of the whole file.
+    Returns: PngLayout or None if the PNG can't be read in bands.
+    """
+    if buf[:8] != PNG_SIGNATURE:
+        return None
+    pos = 8
+    end = len(buf)
+    ihdr = None
+    idat = []
+    extra = []
+    while pos + 8 <= end:
+        length, ctype = struct.unpack_from('>I4s', buf, pos)
+        data_start = pos + 8
+        if data_start + length > end:
+            return None
+        if ctype == b'IHDR':
+            ihdr = struct.unpack_from('>IIBBBBB', buf, data_start)
+        elif ctype == b'IDAT':
+            idat.append((data_start, length))
+        elif ctype in BAND_CHUNKS:
+            extra.extend(_chunk(ctype, bytes(buf[data_start:data_start + length])))
+        elif ctype == b'IEND':
+            break
+        pos = data_start + length + 4
+    if ihdr is None or not idat:
+        return None
+    width, height, depth, color_type, _compression, _filter, interlace = ihdr
+    if depth != 8 or color_type not in CHANNELS or interlace or not width or not height:
+        return None
+    return PngLayout(width, height, color_type, idat, b''.join(extra))
+
+
+class _Rows:
+    """ the inflated, still filtered, rows of a PNG. read() them in order. """
+    def __init__(self, buf, idat):
+        self.buf = buf
+        self.idat = iter(idat)
+        self.inflate = zlib.decompressobj()
+        self.pending = b''
+
+    def read(self, size, prefix=b''):
+        """ the next size bytes, after prefix. """
+        out = [prefix]
+        got = 0
+        while got < size:
+            if not self.pending:
+                if self.inflate.unconsumed_tail:
+                    self.pending = self.inflate.unconsumed_tail
+                else:
+                    offset, length = next(self.idat, (None, None))
+                    if offset is None:
+                        raise ValueError('image data ends early')
+                    self.pending = self.buf[offset:offset + length]
+            chunk = self.inflate.decompress(self.pending, size - got)
+            self.pending = b''
+            if not chunk and not self.inflate.unconsumed_tail and self.inflate.eof:
+                raise ValueError('image data ends early')
+            out.append(chunk)
+            got += len(chunk)
+        return b''.join(out)
+
+
+def _last_row(band, layout):
+    """ the last row of a decoded band as unfiltered PNG bytes. """
+    row = band.copy(0, band.height() - 1, layout.width, 1).convertToFormat(QImage.Format.Format_RGBA8888)
+    ptr = row.constBits()
+    ptr.setsize(row.sizeInBytes())
+    rgba = bytes(ptr)[:layout.width * 4]
+    picks = RGBA_CHANNELS[layout.color_type]
+    if len(picks) == 4:
+        return rgba
+    out = bytearray(layout.width * len(picks))
+    for i, channel in enumerate(picks):
+        out[i::len(picks)] = rgba[channel::4]
+    return bytes(out)
+
+
+def read_png_scaled(image_path, level, band_bytes=BAND_BYTES):
+    """
+    Decode a PNG at 1/2**level size, a band of rows at a time.
+    The memory used is the result plus about 2 x band_bytes.
+    Args:
+        image_path = str. FQPN of the PNG.
+        level = int. 1 is half size, 2 is quarter size and so on.
+        band_bytes = int. about how much memory one decoded band takes.
+    Returns: QImage or None if the image isn't a PNG that can be done
+             this way. See the top of the file.
+    Raises: ValueError if the PNG is damaged. OSError if it can't be read.
+    """
+    with open(image_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+        with buf:
+            layout = png_layout(buf)
+            if layout is None:
+                return None
+            return _read_bands(buf, layout, level, band_bytes)
+
+
+def _read_bands(buf, layout, level, band_bytes):
+    width, height = layout.width, layout.height
+    factor = 1 << level
+    scaled = QSize(max(width >> level, 1), max(height >> level, 1))
+    # a whole number of scaled rows in every band, so the smooth scaling
+    # of one band doesn't bleed into the next.
+    band_rows = max(band_bytes // (width * 4) // factor, 1) * factor
+    stride = width * CHANNELS[layout.color_type] + 1
+    alpha = layout.color_type in (4, 6) or b'tRNS' in layout.extra
+    result = QImage(scaled, QImage.Format.Format_ARGB32_Premultiplied if alpha else QImage.Format.Format_RGB32)
+    if result.isNull():
+        raise ValueError(f'not enough memory for a {scaled.width()}x{scaled.height()} image')
+    result.fill(Qt.GlobalColor.transparent if alpha else Qt.GlobalColor.black)
+
+    rows = _Rows(buf, layout.idat)
+    painter = QPainter(result)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+    try:
+        previous = None
+        y = 0
+        out_y = 0
+        while y < height:
+            count = min(band_rows, height - y)
+            first = 0 if previous is None else 1
+            data = rows.read(count * stride, b'\0' + previous if first else b'')
+            header = struct.pack('>IIBBBBB', width, count + first, 8, layout.color_type, 0, 0, 0)
+            png = b''.join([PNG_SIGNATURE, *_chunk(b'IHDR', header), layout.extra,
+                            *_chunk(b'IDAT', zlib.compress(data, 0)), *_chunk(b'IEND', b'')])
+            del data
+            band = QImage.fromData(png, 'PNG')
+            del png
+            if band.isNull():
+                raise ValueError(f'unable to decode rows {y} to {y + count}')
+            previous = _last_row(band, layout)
+            if first:
+                band = band.copy(0, first, width, count)
+            out_rows = scaled.height() - out_y if y + count >= height else count // factor
+            if out_rows > 0:
+                band = band.scaled(scaled.width(), out_rows, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                   Qt.TransformationMode.SmoothTransformation)
+                painter.drawImage(QPoint(0, out_y), band)
+            out_y += out_rows
+            y += count
+    finally:
+        painter.end()
+    return result
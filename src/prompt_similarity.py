@@ -0,0 +1,140 @@
+# prompt_similarity.py
+# Find images whose prompts are nearly the same. MinHash and LSH.
+#
+# The same prompt with a word changed here and there shows up all over a
+# library. Comparing every prompt with every other prompt is quadratic,
+# 5 billion comparisons for 100k images, so instead:
+#
+#   MinHash - each prompt is turned into a set of word shingles and then
+#       into a short signature. The chance that two signatures agree in a
+#       given position is the Jaccard similarity of the two shingle sets.
+#   LSH (locality sensitive hashing) - the signature is cut into bands.
+#       Prompts that agree on every value in any one band land in the same
+#       bucket. Near duplicates almost always share a bucket, unrelated
+#       prompts almost never do.
+#
+# The signature and band buckets of an image are made when it is indexed
+# (see MetadataIndex.store()) so they are always up to date and finding
+# the clusters is just grouping the buckets.
+#
+# Date: Oct 2026
+
+import hashlib
+import re
+import struct
+from functools import lru_cache
+
+# 8 bands of 4 rows. Prompts that are about 60% the same, or more, are
+# likely to share a bucket. (1/BANDS) ** (1/ROWS) is roughly where the
+# line is.
+BANDS = 8
+ROWS = 4
+NUM_HASHES = BANDS * ROWS
+SIGNATURE_FORMAT = f'<{NUM_HASHES}I'
+# estimated similarity needed to join a cluster. LSH finds the candidates,
+# this weeds out the unlucky collisions.
+DEFAULT_THRESHOLD = 0.6
+
+
+def shingles(text):
+    """
+    Word 2-shingles of a prompt. Case, punctuation and weights like
+    (word:1.2) are ignored, so 'a (red:1.1) car' and 'A red car' match.
+    Returns: set of str. Empty if there are no words.
+    """
+    words = re.findall(r'[^\W\d_]+|\d+(?!\.\d)', text.lower())
+    if len(words) < 2:
+        return set(words)
+    return {f'{a} {b}' for a, b in zip(words, words[1:])}
+
+
+def minhash_signature(text):
+    """
+    MinHash signature of a prompt.
+    One shake_128 digest per shingle gives all NUM_HASHES hash values at
+    once and the signature is the column wise minimum.
+    Returns: tuple of NUM_HASHES ints or None if the prompt has no words.
+    """
+    parts = shingles(text)
+    if not parts:
+        return None
+    return tuple(map(min, zip(*map(_shingle_hashes, parts))))
+
+
+# the same shingles turn up in prompt after prompt. 'masterpiece best',
+# 'best quality'... hashing each one once saves most of the work.
+@lru_cache(maxsize=65536)
+def _shingle_hashes(part):
+    return _UNPACK(hashlib.shake_128(part.encode('utf-8')).digest(NUM_HASHES * 4))
+
+
+_UNPACK = struct.Struct(SIGNATURE_FORMAT).unpack
+
+
+def pack_signature(signature):
+    return struct.pack(SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(data):
+    return struct.unpack(SIGNATURE_FORMAT, data)
+
+
+def band_keys(signature):
+    """
+    The LSH bucket of each band.
+    Returns: list of (band number, bucket key). Keys are signed 64 bit
+             so sqlite can store them.
+    """
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'<{ROWS}I', *rows), digest_size=8).digest()
+        keys.append((band, struct.unpack('<q', digest)[0]))
+    return keys
+
+
+def similarity(sig_a, sig_b):
+    """ estimated Jaccard similarity of two prompts from their signatures. 0 to 1 """
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_HASHES
+
+
+def cluster_buckets(buckets, signatures, threshold=DEFAULT_THRESHOLD):
+    """
+    Turn LSH buckets into clusters.
+    Each bucket member is checked against the first member of the bucket
+    (not every other member, that would be quadratic again) and joined to
+    it with union-find if it's similar enough.
+    Args:
+        buckets = iterable of lists of ids that share a bucket
+        signatures = dict of id: signature
+        threshold = float. see DEFAULT_THRESHOLD
+    Returns: list of clusters, biggest first. Each is a list of 2 or more ids.
+    """
+    parent = {}
+
+    def find(item):
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for members in buckets:
+        first = members[0]
+        first_sig = signatures.get(first)
+        if first_sig is None:
+            continue
+        for other in members[1:]:
+            root_a, root_b = find(first), find(other)
+            if root_a == root_b:
+                continue
+            other_sig = signatures.get(other)
+            if other_sig is not None and similarity(first_sig, other_sig) >= threshold:
+                parent[root_b] = root_a
+
+    clusters = {}
+    for item in parent:
+        clusters.setdefault(find(item), []).append(item)
+    result = [members for members in clusters.values() if len(members) > 1]
+    result.sort(key=len, reverse=True)
+    return result
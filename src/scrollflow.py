@@ -28,8 +28,12 @@
 #
 ####
 
+import bisect
+
 from PyQt6.QtCore import Qt, QMargins, QPoint, QRect, QSize
-from PyQt6.QtWidgets import QLayout, QGridLayout, QSizePolicy, QWidget, QScrollArea
+from PyQt6.QtWidgets import QLayout, QGridLayout, QSizePolicy, QWidget, QWidgetItem, QScrollArea
+
+from .perf import span
 
 class FlowLayout(QLayout):
     """
@@ -57,6 +61,33 @@ class FlowLayout(QLayout):
         """ Add an item to the layout """
         self._item_list.append(item)
 
+    def insertWidget(self, index, widget):
+        """ Add a widget at a given position instead of at the end """
+        self.addChildWidget(widget)
+        self._item_list.insert(index, QWidgetItem(widget))
+        self.invalidate()
+
+    def insert_sorted(self, widget, key):
+        """
+        Add a widget in its place in an already sorted layout.
+        Args: key = function that is passed a widget, same as sort_items()
+        """
+        value = key(widget)
+        item_key = lambda item: key(item.widget())
+        if not self._item_list or item_key(self._item_list[-1]) <= value:
+            self.addWidget(widget)      # the usual case. cheap.
+        else:
+            self.insertWidget(bisect.bisect(self._item_list, value, key=item_key), widget)
+
+    def sort_items(self, key):
+        """
+        Re-order the items in place. Nothing is deleted or re-created,
+        the widgets just get new positions on the next layout.
+        Args: key = function that is passed the widget of each item.
+        """
+        self._item_list.sort(key=lambda item: key(item.widget()))
+        self.invalidate()
+
     def count(self):
         """ how many items are flowing """
         return len(self._item_list)
@@ -82,14 +113,16 @@ class FlowLayout(QLayout):
         return True
 
     def heightForWidth(self, width):
-        height = self.doLayout(QRect(0, 0, width, 0), True)
+        with span('flow layout measure'):
+            height = self.doLayout(QRect(0, 0, width, 0), True)
         return height
 
     def setGeometry(self, rect):
         super(FlowLayout, self).setGeometry(rect)
         # not sure if next line is needed.
         # self.update()
-        self.doLayout(rect, False)
+        with span('flow layout'):
+            self.doLayout(rect, False)
 
     def sizeHint(self):
         return self.minimumSize()
@@ -208,8 +241,29 @@ class ScrollingFlowWidget(QWidget):
 
         # Add scroll area to the main grid layout.
         grid.addWidget(scroll_area)
+        self.scroll_area = scroll_area
 
     def addWidget(self, widget):
         """Add a widget to the FlowLayout and set its parent to the wrapper widget."""
         self.flowLayout.addWidget(widget)
         widget.setParent(self._wrapper)
+
+    def insertWidget(self, index, widget):
+        """Same as addWidget() but at a given position in the flow."""
+        self.flowLayout.insertWidget(index, widget)
+        widget.setParent(self._wrapper)
+
+    def insert_sorted(self, widget, key):
+        """Add a widget in sort order. see FlowLayout.insert_sorted()"""
+        self.flowLayout.insert_sorted(widget, key)
+        widget.setParent(self._wrapper)
+
+    def sort_widgets(self, key):
+        """Re-order the widgets without re-adding them. see FlowLayout.sort_items()"""
+        self.flowLayout.sort_items(key)
+
+    def ensure_visible(self, widget):
+        """Scroll so the widget can be seen."""
+        # the layout has to put it in place first.
+        self.flowLayout.activate()
+        self.scroll_area.ensureWidgetVisible(widget)
@@ -0,0 +1,194 @@
+# sd_metadata.py
+# Parse the Stable Diffusion metadata out of an image.
+#
+# This used to live in MetadataTable.get_image_metadata(). It's on its
+# own so it can be used without a QWidget, e.g. from the background index
+# worker, which can't pop up message boxes since it's not on the GUI
+# thread, or without Qt widgets at all.
+#
+# Date: Oct 2026
+
+import ast
+import json
+import logging
+from collections import Counter
+
+from .image_header import header_data_reader, read_image_header
+from .latent_tools import SamplerNames
+from .model_assets import extract_model_assets
+
+logger = logging.getLogger(__name__)
+
+
+def flatten_dict(some_dict):
+    """
+    Flattens nested dictionaries into a single-level dictionary.
+    Args: dict to flatten
+    Returns: flattened dict.
+    """
+    # maybe comprehension would be more concise but
+    # this easier in terms of clarity and readability. Zen Like?
+    flat = {}
+    for key, value in some_dict.items():
+        if isinstance(value, dict):
+            flat.update(value)
+        else:
+            flat[key] = value
+    return flat
+
+def read_image_metadata(image_path):
+    """Read image metadata from Stable Diffusion generated image
+       using sd-prompt reader to pull out the data. The common formats
+       are read straight from the file headers (see image_header.py)
+       and only the rest go through sd-prompt reader's ImageDataReader.
+       No dialogs, no widgets. Safe to call from a worker thread.
+
+       Args: image_path: str. FQFN of graphic image file
+       Returns: dict. processed dict with metadata from image or
+                False if no metadata.
+       Raises: OSError (or whatever the reader raises) if the file
+               can't be opened.
+    """
+
+    # tested with over 145 AI generated images from as many places as possible .
+
+    # Parse metadata from Stable Diffusion
+    logger.debug(f'read_image_metadata(): image_path: {image_path}')
+    image_metadata = None
+    header = read_image_header(image_path)
+    if header:
+        image_metadata = header_data_reader(header)
+    if image_metadata is None:
+        logger.debug('read_image_metadata(): header not recognized. using ImageDataReader')
+        # imported here. it's slow to import, see header_data_reader(), and
+        # most images never get this far.
+        from sd_prompt_reader.image_data_reader import ImageDataReader
+        # read only. "rb+" asked for write access and failed on read-only shares.
+        with open(image_path, "rb") as f:
+            image_metadata = ImageDataReader(f)
+
+    if image_metadata.status.name != 'READ_SUCCESS':
+        logger.error(f'read_image_metadata(): Error reading image metadata from: {image_path}')
+        return False
+    else:
+        logger.debug('metadata successfully read. ')
+        # build the metadata dict that will be use for the Table
+        logger.debug(f'{image_metadata.props=}')
+        metadata = json.loads(image_metadata.props)
+        # logger.debug(f'Image_metadata json: {metadata=}')
+        md_orig_key_count = len(metadata)
+        settings_str = image_metadata.setting
+        logger.debug(f'{settings_str=}')
+
+        # is settings_str empty or only white space?
+        if settings_str and not settings_str.isspace():
+        # create the settings dict from the setting string.
+        # Preserve 'generation_time' as a string, then convert
+        # any ints, floats or bool to str and strip whitespace.
+        # Added try except because sometimes the setting string is
+        # not properly formatted or at least formatted as expected.
+            try:
+                settings_dict = {
+                    k.strip(): (v if 'generation_time' in k else
+                        ast.literal_eval(v) if v.replace('.', '', 1).isdigit() or v in ['True', 'False'] else v
+                    )
+                    for k, v in (pair.split(': ', 1) for pair in settings_str.split(', '))
+                }
+                logger.debug(f"setting key count: {len(settings_dict)}")
+
+            except ValueError as e:
+                logger.debug(f'VALUE-ERROR encountered with {image_path} while parsing settings_str. Probable badly formatted data:\n {e}')
+                settings_dict = {}
+                metadata['settings'] = settings_str
+        else:
+            settings_dict = {}
+            logger.debug('setting metadata empty')
+
+        # add the tool used to create image
+        if image_metadata.tool:
+            metadata['tool_used'] = image_metadata.tool
+        else:
+            metadata['tool_used'] = 'Unknown'
+
+        metadata = flatten_dict(metadata)
+        if settings_dict is None:
+            settings_dict = flatten_dict(settings_dict)
+
+        # before the blending remove the 'setting' key since we no longer need it.
+        metadata.pop('setting')
+
+        # Merge the metadata and setting dictionaries
+        # if the keys are the same but the value is different
+        # then add a -[number] to the key name.
+        # make sure there are no dupes
+        # key_lc = key_lowercase
+        blended = {}
+        key_counter = Counter()
+        for source in (metadata, settings_dict):
+            for key, value in source.items():
+                key_lc = key.lower()
+                str_value = str(value)
+
+                if key_lc in blended:
+                    # case-insensitive check if values are different
+                    if str(blended[key_lc]) != str_value:
+                        count = key_counter[key_lc] + 1
+                        new_key = f"{key}-{count}"
+                        blended[new_key] = value
+                        key_counter[key_lc] += 1
+                else:
+                    blended[key_lc] = value
+                    key_counter[key_lc] = 0
+
+        # Restore original case for keys
+        metadata = dict(blended)
+
+        # If sampler_name is not None or an empty string and exists
+        # in SamplerNames, it updates metadata['sampler'] with a
+        # the full name of the sampler replacing the acronym.
+        sampler_name = metadata.get('sampler')
+
+        # Handle the sampler name.
+        if sampler_name.lower() not in SamplerNames.__members__ and sampler_name != 'Unknown':
+           # sampler_name is not in the SamplerNames and is not explicitly marked as 'Unknown'
+           # so set the sampler key to whatever the sampler_name is.
+           metadata['sampler'] = sampler_name
+           logger.debug(f'{sampler_name} was not found in SamplerNames.')
+        elif sampler_name == 'Unknown':
+            metadata['sampler'] = 'Unknown'
+        else:
+            # Known Sampler Name so replace it with the Longer actual name.
+            sampler_value = SamplerNames[sampler_name.lower()]
+            metadata['sampler'] = sampler_value.value
+            logger.debug(f' metadata[\'sampler\'] is now {sampler_value.value}')
+
+        if metadata.get('cfg') and metadata.get('cfg scale'):
+            if str(metadata.get('cfg')) == str(metadata.get('cfg scale')):
+                metadata.pop('cfg')
+
+        logger.debug('Processed Metadata cleaning up and remove leftovers.')
+        metadata.pop('height')
+        metadata.pop('width')
+        # the next bit of code is a bit clunky. I found cases where
+        # the is_sdxl key did not contain all the keys so I put
+        # this in
+        if not metadata['is_sdxl']:
+            try:
+                for key in ['is_sdxl', 'positive_sdxl', 'negative_sdxl']:
+                    metadata.pop(key)
+            except KeyError:
+                pass
+        # ComfyUI: the checkpoints, LoRAs, VAEs etc. from the prompt graph.
+        if 'prompt' in image_metadata.info:
+            assets = extract_model_assets(image_metadata.info['prompt'])
+            if assets:
+                metadata['model_assets'] = assets
+        logger.debug(f'initial metadata key count: {md_orig_key_count}')
+        logger.debug(f'key count of blended {len(blended)}')
+        logger.debug(f"Final metadata key count: {len(metadata)}")
+
+        # cleanup a bit
+        del settings_dict
+        del blended
+        logger.debug('read_image_metadata(): returning processed metadata. ')
+    return metadata
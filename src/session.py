@@ -0,0 +1,80 @@
+# session.py
+# Remember what was open when LatentEye was closed and open it again.
+#
+# Saved when the main window closes: the directory, sort order, the
+# selected thumbnail, window and splitter sizes, and the images open in
+# EyeSight. MainWindow puts the sizes back before the window is shown
+# and opens the rest once it is showing, so the thumbnails and the
+# metadata index of the last directory are being worked on in the
+# background while the window comes up instead of after the first click.
+#
+# Stored with QSettings as an ini file in the user's config directory.
+#
+# Date: Oct 2026
+
+import logging
+import os
+
+from PyQt6.QtCore import QByteArray, QSettings
+
+from .latent_tools import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class Session:
+    """
+    The saved session.
+    Args: settings = QSettings. where to keep it. The default is
+          LatentEye/session.ini in the user's config directory.
+    """
+    def __init__(self, settings=None):
+        if settings is None:
+            settings = QSettings(QSettings.Format.IniFormat, QSettings.Scope.UserScope,
+                                 Settings.APPNAME.value, 'session')
+        self.settings = settings
+
+    def save(self, directory='', sort_by='', selected='', geometry=None, splitter_sizes=(),
+             eye_sight=(), multi_window=False):
+        """
+        Save the session. Replaces the one saved before.
+        Args:
+            directory = str. directory the thumbnails are from.
+            sort_by = str. the sort dropdown choice.
+            selected = str. FQPN of the selected thumbnail.
+            geometry = QByteArray. from QWidget.saveGeometry()
+            splitter_sizes = list of int. QSplitter.sizes()
+            eye_sight = list of str. FQPN of the images open in EyeSight.
+            multi_window = bool. EyeSight opens images in new windows.
+        """
+        s = self.settings
+        s.clear()
+        s.setValue('directory', directory)
+        s.setValue('sort_by', sort_by)
+        s.setValue('selected', selected)
+        if geometry is not None:
+            s.setValue('geometry', geometry)
+        s.setValue('splitter_sizes', [int(size) for size in splitter_sizes])
+        s.setValue('eye_sight', list(eye_sight))
+        s.setValue('multi_window', bool(multi_window))
+        s.sync()
+        logger.debug(f'Session saved to {s.fileName()}')
+
+    def load(self):
+        """
+        The saved session. Files and directories that are gone are left out.
+        Returns: dict with the keys of save(). Empty values if nothing was saved.
+        """
+        s = self.settings
+        directory = s.value('directory', '', type=str)
+        selected = s.value('selected', '', type=str)
+        geometry = s.value('geometry', None)
+        return {
+            'directory': directory if directory and os.path.isdir(directory) else '',
+            'sort_by': s.value('sort_by', '', type=str),
+            'selected': selected if selected and os.path.isfile(selected) else '',
+            'geometry': geometry if isinstance(geometry, QByteArray) else None,
+            'splitter_sizes': [int(size) for size in s.value('splitter_sizes', [], type=list)],
+            'eye_sight': [p for p in s.value('eye_sight', [], type=list) if os.path.isfile(p)],
+            'multi_window': s.value('multi_window', False, type=bool),
+        }
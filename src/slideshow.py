@@ -0,0 +1,303 @@
+# slideshow.py
+# Full screen slideshow of the images in the thumbnail view, in the
+# order they are shown. That's a folder or a search result.
+#
+# Every image is decoded at screen size, never bigger, by SlideLoaders
+# in the thread pool. The next PRELOAD_COUNT images are decoded while the
+# current one is showing so the change to the next image is just drawing
+# a pixmap that is ready.
+#
+# Each change has a deadline, interval after the last one. If the next
+# image isn't decoded by then it missed its deadline: that's logged and
+# the show skips ahead to the first image after it that is ready. If none
+# are, the late one is shown as soon as it's decoded and how late it was
+# is logged. The counts are logged when the show ends.
+#
+# Keys: Esc closes, Space pauses, Left / Right go back / ahead,
+#       Up / Down make the interval a second longer / shorter.
+#
+# Date: Oct 2026
+
+import logging
+import time
+
+from PyQt6.QtCore import Qt, QObject, QRect, QRunnable, QSize, QThreadPool, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImage, QPainter, QPixmap
+from PyQt6.QtWidgets import QWidget
+
+from .decode_policy import DecodePolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MS = 5000
+MIN_INTERVAL_MS = 1000
+# images decoded ahead of the one that's showing.
+PRELOAD_COUNT = 3
+
+
+class SlideLoaderSignals(QObject):
+    """
+    Thread Signals -
+        loaded: (int, QImage, float) index of the slide, the image at screen size and ms to decode it.
+        failed: (int, str) index of the slide and the error message.
+    """
+    loaded = pyqtSignal(int, QImage, float)
+    failed = pyqtSignal(int, str)
+
+
+class SlideLoader(QRunnable):
+    """
+    Decode one image to fit the screen.
+    Args:
+        index = int. the slide's place in the show.
+        image_path = str. FQPN of the image.
+        size = QSize. screen size in device pixels.
+        cancel_flag = (list[bool]) Mutable flag to allow cancellation of the worker from the main thread.
+    """
+    def __init__(self, index, image_path, size, cancel_flag):
+        super().__init__()
+        self.index = index
+        self.image_path = image_path
+        self.size = size
+        self.cancel_flag = cancel_flag
+        self.signals = SlideLoaderSignals()
+
+    @pyqtSlot()
+    def run(self):
+        if self.cancel_flag[0]:
+            return
+        start = time.perf_counter()
+        try:
+            # same as a thumbnail, just a bigger one. JPEGs decode straight
+            # to the smaller size and nothing is decoded bigger than the screen.
+            image = DecodePolicy.instance().read_thumbnail(self.image_path, self.size)
+            if image.isNull():
+                raise ValueError(f'Unable to Load {self.image_path}')
+            if image.format() not in (QImage.Format.Format_ARGB32_Premultiplied, QImage.Format.Format_RGB32):
+                fmt = (QImage.Format.Format_ARGB32_Premultiplied if image.hasAlphaChannel()
+                       else QImage.Format.Format_RGB32)
+                image = image.convertToFormat(fmt)
+        except Exception as e:
+            logger.error(f'SlideLoader: error loading {self.image_path}: {e}')
+            if not self.cancel_flag[0]:
+                self.signals.failed.emit(self.index, str(e))
+            return
+        if not self.cancel_flag[0]:
+            self.signals.loaded.emit(self.index, image, (time.perf_counter() - start) * 1000)
+
+
+class Slideshow(QWidget):
+    """
+    Full screen slideshow. Call start() to show it. It loops until closed.
+    Args:
+        image_paths = list of str. FQPN of the images, in show order.
+        start_index = int. the first image shown.
+        interval_ms = int. time each image is shown.
+        preload = int. number of images decoded ahead.
+    """
+    def __init__(self, image_paths, start_index=0, interval_ms=DEFAULT_INTERVAL_MS, preload=PRELOAD_COUNT,
+                 parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.setWindowTitle('Slideshow')
+        self.setStyleSheet('background: black;')
+        self.setCursor(Qt.CursorShape.BlankCursor)
+        self.image_paths = list(image_paths)
+        self.index = max(0, min(start_index, len(self.image_paths) - 1))
+        self.interval_ms = max(interval_ms, MIN_INTERVAL_MS)
+        self.preload = preload
+        self.screen_size = QSize()
+        self.pixmap = None
+        self.paused = False
+        # index: QPixmap of the slides that are decoded.
+        self.ready = {}
+        # index: cancel flag of the SlideLoaders that are running.
+        self.loading = {}
+        # slides that couldn't be loaded. they are left out.
+        self.failed = set()
+        # the slide to show as soon as it's decoded and when it was due.
+        self.waiting_for = None
+        self.deadline = None
+        self.shown = self.missed = self.skipped = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.deadline_reached)
+
+    def start(self):
+        if not self.image_paths:
+            self.close()
+            return
+        self.showFullScreen()
+        screen = self.screen()
+        self.screen_size = screen.size() * screen.devicePixelRatio()
+        logger.info(f'Slideshow: {len(self.image_paths)} images, {self.interval_ms} ms each, '
+                    f'decoded at {self.screen_size.width()}x{self.screen_size.height()}')
+        self.deadline = time.perf_counter()
+        self.show_slide(self.index)
+
+    def next_index(self, index, step=1):
+        """ the slide after (or before) index, leaving out the ones that failed. None if there isn't one. """
+        count = len(self.image_paths)
+        for _ in range(count):
+            index = (index + step) % count
+            if index not in self.failed:
+                return index
+        return None
+
+    def preload_window(self):
+        """ the current slide and the ones to decode ahead, in the order they will be shown. """
+        window = [self.index]
+        index = self.index
+        for _ in range(self.preload):
+            index = self.next_index(index)
+            if index is None or index in window:
+                break
+            window.append(index)
+        return window
+
+    def preload_slides(self):
+        """ decode the slides coming up. drop the ones that aren't. """
+        window = self.preload_window()
+        if self.waiting_for is not None and self.waiting_for not in window:
+            window.insert(0, self.waiting_for)
+        for index in [i for i in self.loading if i not in window]:
+            self.loading.pop(index)[0] = True
+        for index in [i for i in self.ready if i not in window]:
+            del self.ready[index]
+        for priority, index in enumerate(reversed(window)):
+            if index in self.ready or index in self.loading:
+                continue
+            cancel_flag = [False]
+            self.loading[index] = cancel_flag
+            loader = SlideLoader(index, self.image_paths[index], self.screen_size, cancel_flag)
+            loader.signals.loaded.connect(self.slide_loaded)
+            loader.signals.failed.connect(self.slide_failed)
+            # the sooner it's needed the higher the priority.
+            QThreadPool.globalInstance().start(loader, priority)
+
+    def show_slide(self, index):
+        """ show a slide if it's ready, otherwise as soon as it is. """
+        self.index = index
+        pixmap = self.ready.get(index)
+        if pixmap is None:
+            self.waiting_for = index
+            self.preload_slides()
+            return
+        self.waiting_for = None
+        self.pixmap = pixmap
+        self.shown += 1
+        self.update()
+        self.deadline = time.perf_counter() + self.interval_ms / 1000
+        if not self.paused:
+            self.timer.start(self.interval_ms)
+        self.preload_slides()
+
+    def deadline_reached(self):
+        """ time for the next slide. skip ahead if it isn't ready. """
+        index = self.next_index(self.index)
+        if index is None:
+            return
+        if index not in self.ready:
+            self.missed += 1
+            logger.warning(f'Slideshow: {self.image_paths[index]} missed its deadline. '
+                           f'{"still decoding" if index in self.loading else "not started"}')
+            ready = [i for i in self.preload_window()[1:] if i in self.ready]
+            if ready:
+                skip_to = ready[0]
+                skipped = self.preload_window().index(skip_to) - 1
+                self.skipped += skipped
+                logger.info(f'Slideshow: skipping {skipped} to {self.image_paths[skip_to]}')
+                index = skip_to
+        self.show_slide(index)
+
+    def slide_loaded(self, index, image, decode_ms):
+        if self.loading.pop(index, None) is None:
+            return      # canceled
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.devicePixelRatio())
+        self.ready[index] = pixmap
+        logger.debug(f'Slideshow: decoded {self.image_paths[index]} in {decode_ms:.0f} ms')
+        if index == self.waiting_for:
+            late = (time.perf_counter() - self.deadline) * 1000
+            if late > 0 and self.shown:
+                logger.warning(f'Slideshow: {self.image_paths[index]} shown {late:.0f} ms late')
+            self.show_slide(index)
+
+    def slide_failed(self, index, error):
+        if self.loading.pop(index, None) is None:
+            return
+        logger.warning(f'Slideshow: leaving out {self.image_paths[index]}: {error}')
+        self.failed.add(index)
+        if len(self.failed) == len(self.image_paths):
+            self.close()
+        elif index == self.waiting_for:
+            self.waiting_for = None
+            self.show_slide(self.next_index(index))
+        else:
+            self.preload_slides()
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        if self.paused:
+            self.timer.stop()
+        elif self.waiting_for is None:
+            self.deadline = time.perf_counter() + self.interval_ms / 1000
+            self.timer.start(self.interval_ms)
+
+    def step(self, step):
+        """ go ahead or back one slide now. """
+        index = self.next_index(self.index, step)
+        if index is not None:
+            self.timer.stop()
+            self.deadline = time.perf_counter()
+            self.show_slide(index)
+
+    def set_interval(self, interval_ms):
+        self.interval_ms = max(interval_ms, MIN_INTERVAL_MS)
+        logger.info(f'Slideshow: interval {self.interval_ms} ms')
+        if self.timer.isActive():
+            self.timer.start(self.interval_ms)
+
+    def keyPressEvent(self, event):
+        match event.key():
+            case Qt.Key.Key_Escape | Qt.Key.Key_Q:
+                self.close()
+            case Qt.Key.Key_Space:
+                self.toggle_pause()
+            case Qt.Key.Key_Right:
+                self.step(1)
+            case Qt.Key.Key_Left:
+                self.step(-1)
+            case Qt.Key.Key_Up:
+                self.set_interval(self.interval_ms + 1000)
+            case Qt.Key.Key_Down:
+                self.set_interval(self.interval_ms - 1000)
+            case _:
+                super().keyPressEvent(event)
+
+    def mousePressEvent(self, event):
+        self.step(1)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.black)
+        if self.pixmap is not None:
+            # smaller images are scaled up to fill the screen.
+            size = self.pixmap.deviceIndependentSize().toSize().scaled(
+                self.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(self.rect().center())
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawPixmap(target, self.pixmap)
+        painter.end()
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        for cancel_flag in self.loading.values():
+            cancel_flag[0] = True
+        self.loading.clear()
+        self.ready.clear()
+        self.pixmap = None
+        logger.info(f'Slideshow: {self.shown} shown, {self.missed} missed their deadline, '
+                    f'{self.skipped} skipped, {len(self.failed)} could not be loaded')
+        super().closeEvent(event)
@@ -0,0 +1,155 @@
+# startup.py
+# How long LatentEye takes to start, and where the time goes.
+#
+# LatentEye.py imports this first, before PyQt and the rest of the app,
+# and calls StartupTimer.instance().start(). From then on:
+#   - every import is timed until the window is first painted. Each
+#     module gets its own time (self) and the time including the
+#     modules it imported (total), like python -X importtime. Imports
+#     on the worker threads are timed too, each thread keeps its own
+#     stack of the imports it's in.
+#   - mark() records a step the first time it happens: imports done,
+#     window created, first paint, first thumbnail.
+# The summary is logged once the first thumbnail is in, and the whole
+# report is in Help > Startup Report.
+#
+# Heavy modules that aren't needed to show the window are imported where
+# they are used instead of at the top of the file, e.g. sd_prompt_reader
+# (it brings in customtkinter and tkinter) and pathvalidate. The
+# thumbnail and metadata panels, and with them EyeSight and
+# MetadataTable, are built once the window is showing. see
+# MainWindow.build_panels()
+#
+# Date: Oct 2026
+
+import builtins
+import importlib.util
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# imports listed in the report, slowest first.
+REPORT_IMPORTS = 15
+
+
+class StartupTimer:
+    """
+    Startup timings. One instance for the app, see instance().
+    Times are ms since start() was called.
+    """
+    _instance = None
+
+    def __init__(self):
+        self.started = None
+        self.marks = {}
+        # module name: [total ms, self ms]
+        self.imports = {}
+        # the imports each thread is in, innermost last.
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._import = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def start(self):
+        """ start the clock and time imports. Call before importing PyQt. """
+        self.started = time.perf_counter()
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def stop_import_timing(self):
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # only imports that load something new are timed. Most import
+        # statements find the module in sys.modules.
+        original = self._import or builtins.__import__
+        full_name = name
+        if level:
+            # from .eye_sight import ... the app's modules are all relative.
+            try:
+                full_name = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                pass
+        if full_name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            total = (time.perf_counter() - start) * 1000
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            with self._lock:
+                times = self.imports.setdefault(full_name, [0.0, 0.0])
+                times[0] += total
+                times[1] += total - children
+
+    def elapsed(self):
+        """ ms since start() """
+        if self.started is None:
+            return 0.0
+        return (time.perf_counter() - self.started) * 1000
+
+    def mark(self, name):
+        """ record a step of the startup. Only the first time counts. """
+        if self.started is None or name in self.marks:
+            return
+        self.marks[name] = self.elapsed()
+        logger.debug(f'startup: {name} at {self.marks[name]:.0f} ms')
+        if name == 'first paint':
+            self.stop_import_timing()
+        if name in ('first paint', 'first thumbnail'):
+            self.log_summary()
+
+    def watch_first_paint(self, widget):
+        """ mark 'first paint' when the widget is painted the first time. """
+        # imported here so PyQt isn't imported before start() can time it.
+        from PyQt6.QtCore import QEvent, QObject
+
+        timer = self
+
+        class FirstPaint(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Type.Paint:
+                    timer.mark('first paint')
+                    watched.removeEventFilter(self)
+                return False
+
+        self._paint_filter = FirstPaint(widget)
+        widget.installEventFilter(self._paint_filter)
+
+    def slowest_imports(self, count=REPORT_IMPORTS):
+        """ list of (module name, total ms, self ms), slowest self time first. """
+        rows = [(name, total, own) for name, (total, own) in self.imports.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:count]
+
+    def log_summary(self):
+        steps = ', '.join(f'{name} {ms:.0f} ms' for name, ms in self.marks.items())
+        logger.info(f'startup: {steps}')
+
+    def report_html(self):
+        """ the report for Help > Startup Report """
+        steps = ''.join(f'<tr><td>{name}</td><td align="right">&nbsp;&nbsp;{ms:,.0f} ms</td></tr>'
+                        for name, ms in self.marks.items())
+        imports = ''.join(f'<tr><td>{name}</td><td align="right">&nbsp;&nbsp;{own:,.1f}</td>'
+                          f'<td align="right">&nbsp;&nbsp;{total:,.1f}</td></tr>'
+                          for name, total, own in self.slowest_imports())
+        return (f'<strong>Startup</strong><table>{steps}</table><br>'
+                f'<strong>Slowest imports</strong> (ms)<table>'
+                f'<tr><th align="left">module</th><th>&nbsp;&nbsp;self</th><th>&nbsp;&nbsp;total</th></tr>'
+                f'{imports}</table>')
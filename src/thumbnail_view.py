@@ -32,29 +32,47 @@
 # May 2025 - changed the way thumbnails are created. less memory intensive. faster? maybe, maybe not.
 # May 2025 - since the new thumbnail method doesn't seem much faster. added threading to speed things up.
 # Aug 2025 - added context menu to delete, rename, and copy filename to system clipboard
+# Oct 2026 - ThumbnailWorker scales the thumbnail itself and saves a perceptual hash of it
+#            for finding duplicates. see duplicates.py
+# Oct 2026 - pathvalidate is imported when a file is renamed, not at start up. see startup.py
+# Oct 2026 - so are EyeSight, DecodePolicy, compare, slideshow and the metadata diff. they are
+#            imported where they are first used.
 #
 ####
 
+import os
 import sys
 import logging
+import sqlite3
 from pathlib import Path, PurePath
-from pathvalidate import is_valid_filepath, sanitize_filepath
 from PyQt6.QtCore import (pyqtSignal, pyqtSlot, Qt, QSize,
                           QRunnable, QThreadPool, QObject, QFile,
                           QFileInfo, QProcess)
 from PyQt6.QtWidgets import (QApplication, QWidget, QLabel, QVBoxLayout,
                              QProgressBar,QMenu, QMessageBox, QFileDialog)
-from PyQt6.QtGui import QAction, QPixmap, QImage, QImageReader
+from PyQt6.QtGui import QAction, QPixmap, QImage
 from PyQt6 import sip
 
 # app imports.
 from .scrollflow import ScrollingFlowWidget
-from .eye_sight import EyeSight
+from .startup import StartupTimer
 from .latent_tools import show_error_box, Style
+from .metadata_index import IndexWorker, MetadataIndex, SORT_FIELDS
+from .duplicates import dhash_image, find_duplicate_groups, DEFAULT_MAX_DISTANCE
+from .perf import PerfStats, span
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# sort dropdown choices that come from the image metadata: sort_keys column
+METADATA_SORTS = {'Seed': 'seed', 'Steps': 'steps', 'CFG': 'cfg', 'Sampler': 'sampler', 'Model': 'model'}
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.webp'}
+
+
+def list_image_files(directory):
+    """ FQPN of the images in a directory, in the order the OS lists them. """
+    return [str(f) for f in Path(directory).iterdir() if f.suffix.lower() in IMAGE_SUFFIXES]
+
 
 class ThumbnailWorkerSignals(QObject):
     """
@@ -73,17 +91,48 @@ class ThumbnailWorker(QRunnable):
     ThumbnailWorker is a background thread that is used to load and prepare image files
     for thumbnail generation. Since QPixmap is not thread-safe, add_thumbnail() is used
     to complete the process of thumbnail / label creation.
+    While it has the thumbnail it also works out its perceptual hash (dHash) and saves
+    it in the MetadataIndex, unless the index already has it for this version of the file.
     Args:
         filepaths = (list[str]) List of image file paths to process.
         size = (QSize) Target size for the generated thumbnails.
         cancel_flag = (list[bool]) Mutable flag to allow cancellation of the worker from the main thread.
     """
+    # commit the hashes every this many files.
+    BATCH_SIZE = 50
+
     def __init__(self, file_paths, size, cancel_flag):
         super().__init__()
         self.filepaths = file_paths
         self.size = size
         self.cancel_flag = cancel_flag
         self.signals = ThumbnailWorkerSignals()
+        # how far it has got. the queue depths in the PerfHud.
+        self.done = 0
+        self.emitted = 0
+        self.running = True
+
+    def known_hashes(self, index):
+        """ the hashes that are already in the index for these files. """
+        known = {}
+        try:
+            for directory in {str(Path(f).parent) for f in self.filepaths}:
+                known.update(index.image_hashes(directory))
+        except sqlite3.Error as e:
+            logger.error(f'ThumbnailWorker: unable to read the image hashes: {e}')
+        return known
+
+    def save_hash(self, index, filepath, thumbnail, known):
+        """ hash the thumbnail and save it, if it's new or the file changed. """
+        stat = os.stat(filepath)
+        record = known.get(filepath)
+        if record is not None and record[0] == stat.st_mtime and record[1] == stat.st_size:
+            return False
+        dhash = dhash_image(thumbnail)
+        if dhash is None:
+            return False
+        index.store_hash(filepath, dhash, stat, commit=False)
+        return True
 
     @pyqtSlot()
     def run(self):
@@ -92,17 +141,37 @@ class ThumbnailWorker(QRunnable):
         # non-thread-safe part and add the pixmap thumbnail
         # to a uniquely named QLabel and then flow_layout
         logger.debug(f'entering thread run.')
+        # imported here, by the first worker, not at start up.
+        from .decode_policy import DecodePolicy
+        index = MetadataIndex.instance()
+        policy = DecodePolicy.instance()
+        stats = PerfStats.instance()
+        known = self.known_hashes(index)
+        hashed = 0
         for i, filepath in enumerate(self.filepaths):
+            self.done = i
             if self.cancel_flag[0]:
                 logger.debug('ThumbnailWorker canceled.')
                 break
             try:
-                reader = QImageReader(filepath)
-                reader.setAutoTransform(True)
-                # reader.setScaledSize(self.size)
-                image = reader.read()
+                # decoded at thumbnail size. see DecodePolicy.read_thumbnail()
+                # the hash is computed from the thumbnail, it's plenty big.
+                with span('thumbnail', filepath):
+                    image = policy.read_thumbnail(filepath, self.size)
                 if not image.isNull():
+                    self.emitted += 1
+                    # ends in add_thumbnail(). the time it waits in the GUI thread's queue.
+                    stats.async_begin('thumbnail deliver', filepath)
                     self.signals.result.emit(image, filepath, i)
+                    try:
+                        with span('thumbnail hash', filepath):
+                            saved = self.save_hash(index, filepath, image, known)
+                        if saved:
+                            hashed += 1
+                            if hashed % self.BATCH_SIZE == 0:
+                                index.commit()
+                    except (OSError, sqlite3.Error) as e:
+                        logger.error(f'ThumbnailWorker: unable to save the hash of {filepath}: {e}')
                 else:
                     logger.error(f'Image seems empty. Unable to read: {filepath}')
             # Yes, I know exception type should be specified but since this could
@@ -113,6 +182,12 @@ class ThumbnailWorker(QRunnable):
                 logger.error(f'Error loading image {filepath}: {e}', exc_info=True)
                 continue
             self.signals.progress.emit(i + 1, len(self.filepaths))
+        if hashed:
+            try:
+                index.commit()
+            except sqlite3.Error as e:
+                logger.error(f'ThumbnailWorker: unable to save the image hashes: {e}')
+        self.running = False
         self.signals.finished.emit()
 
 
@@ -145,6 +220,10 @@ class ThumbnailView(QWidget):
         self.tn_sizeY = 200
         # Initialize selected_icon - used by highlighting
         self.selected_thumbnail = None
+        # Ctrl+clicked thumbnails, oldest first. see toggle_compare_mark()
+        self.compare_marked = []
+        # FQPN of the thumbnail to select when it's added. see MainWindow.restore_session()
+        self.restore_selection = ''
         # initial dir. need to be a user setting too.
         self.images_directory = Path.cwd()
 
@@ -155,6 +234,12 @@ class ThumbnailView(QWidget):
         # add threading and progress bar
         self.thread_pool = QThreadPool()
         self.cancel_flag = [False]  # Mutable flag to cancel ongoing worker
+        self.index_cancel_flag = [False]    # same thing for the metadata IndexWorker
+        self.image_files = []
+        # how the grid is sorted and each file's place in it. see resort()
+        self.sort_by = 'Name'
+        self.sort_rank = {}
+        self.listed_order = {}
         self.progress_bar = QProgressBar()
         self.progress_bar.setMaximum(100)
         self.progress_bar.setStyleSheet(Style.PROGRESSBAR_QSS)
@@ -164,6 +249,15 @@ class ThumbnailView(QWidget):
         self.layout().addWidget(self.progress_bar)
         self.layout().addWidget(self.flow_layout)
 
+        # the ThumbnailWorker that is running, or ran last, and how many of
+        # its thumbnails are in the grid. see the gauges below.
+        self.thumbnail_worker = None
+        self.thumbnails_added = 0
+        stats = PerfStats.instance()
+        stats.add_gauge('thumbnails to decode', self.thumbnails_to_decode)
+        stats.add_gauge('thumbnails waiting for GUI', self.thumbnails_waiting)
+        stats.add_gauge('thumbnail threads busy', self.thread_pool.activeThreadCount)
+
     def create_click_handler(self, img_path):
         def handler(event):
             self.thumbnail_selected.emit(img_path)  # Emit the selected thumbnail's path
@@ -210,10 +304,27 @@ class ThumbnailView(QWidget):
 
         clip_action = QAction('Filename to Clipboard', widget)
         clip_action.triggered.connect(lambda: self.filename_to_clipboard(img_path))
+        similar_action = QAction('Show Similar Prompts', widget)
+        similar_action.triggered.connect(lambda: self.show_similar_prompts(img_path))
+        # compare with the highlighted thumbnail, if there is one and it's a different one.
+        selected_path = self.selected_path()
+        compare_action = QAction('Compare Metadata with Selected', widget)
+        compare_action.setEnabled(bool(selected_path) and selected_path != img_path)
+        compare_action.triggered.connect(lambda: self.compare_metadata(selected_path, img_path))
+        compare_paths = self.compare_paths(img_path)
+        from .compare_view import MAX_IMAGES as MAX_COMPARE_IMAGES
+        compare_images_action = QAction(f'Compare {len(compare_paths)} Images', widget)
+        compare_images_action.setToolTip('Ctrl+click thumbnails to pick up to 4 images to compare')
+        compare_images_action.setEnabled(2 <= len(compare_paths) <= MAX_COMPARE_IMAGES)
+        compare_images_action.triggered.connect(lambda: self.compare_images(compare_paths))
         tn_contextm.addAction(trash_action)
         tn_contextm.addAction(rename_action)
         tn_contextm.addAction(fm_action)
         tn_contextm.addAction(clip_action)
+        tn_contextm.addSeparator()
+        tn_contextm.addAction(similar_action)
+        tn_contextm.addAction(compare_action)
+        tn_contextm.addAction(compare_images_action)
         tn_contextm.exec(widget.mapToGlobal(pos))
         logging.debug('Exiting show_thumbnail_context_menu')
 
@@ -230,12 +341,15 @@ class ThumbnailView(QWidget):
         if file.exists():
             if file.moveToTrash():
                 logger.info(f'Successfully moved {img_path} to trash')
+                MetadataIndex.instance().remove(img_path)
                 widget.setObjectName(None)
                 widget.setStyleSheet('')
                 widget.setParent(None)
                 widget.deleteLater()
                 if self.selected_thumbnail is widget:
                     self.selected_thumbnail = None
+                if widget in self.compare_marked:
+                    self.compare_marked.remove(widget)
                 self.flow_layout.update()
             else:
                 logger.error(f'Failed to move {img_path} to trash')
@@ -263,6 +377,8 @@ class ThumbnailView(QWidget):
         newname, _ = QFileDialog.getSaveFileName(self, "New filename only.", path, "Images (*.png *.jpg *.webp)")
 
         if newname:
+            # imported here, it's only needed for a rename and slows down start up.
+            from pathvalidate import is_valid_filepath, sanitize_filepath
             if not is_valid_filepath(newname):
                 sanitized = sanitize_filepath(newname)
                 show_error_box(f'Sanitizing invalid filename of {newname}. \n\nThis has been sanitized name is: {sanitized}', 'info')
@@ -333,8 +449,11 @@ class ThumbnailView(QWidget):
             return  # thumbnail deleted. No reason to hang around
 
         if self.selected_thumbnail:
-            # reset prev. selection
-            self.selected_thumbnail.setStyleSheet('border: 2px solid black;')  # Add highlight
+            # reset prev. selection. keeps its compare mark if it has one.
+            if self.selected_thumbnail in self.compare_marked:
+                self.selected_thumbnail.setStyleSheet(Style.COMPARE_MARK_QSS)
+            else:
+                self.selected_thumbnail.setStyleSheet('border: 2px solid black;')  # Add highlight
 
         # # highlight the new one.
         thumbnail_widget.setStyleSheet(selected_qss)
@@ -343,6 +462,91 @@ class ThumbnailView(QWidget):
         img_path = thumbnail_widget.toolTip()
         self.thumbnail_selected.emit(img_path)  # Emit the selected thumbnail's path
 
+    def thumbnail_pressed(self, thumbnail_widget, event):
+        """ click selects. Ctrl+click (Cmd+click on macOS) marks it for compare. """
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.toggle_compare_mark(thumbnail_widget)
+        else:
+            self.show_selected(thumbnail_widget)
+
+    def toggle_compare_mark(self, thumbnail_widget):
+        """
+        Mark, or unmark, a thumbnail to be compared with Compare Images in
+        the context menu. Up to MAX_COMPARE_IMAGES, marking one more
+        unmarks the oldest.
+        Args:
+            thumbnail_widget - the QLabel created by add_thumbnail()
+        """
+        from .compare_view import MAX_IMAGES as MAX_COMPARE_IMAGES
+        self.compare_marked = [w for w in self.compare_marked if not sip.isdeleted(w)]
+        if sip.isdeleted(thumbnail_widget):
+            return
+        if thumbnail_widget in self.compare_marked:
+            self.compare_marked.remove(thumbnail_widget)
+            self.unmark(thumbnail_widget)
+        else:
+            self.compare_marked.append(thumbnail_widget)
+            thumbnail_widget.setStyleSheet(Style.COMPARE_MARK_QSS)
+            if len(self.compare_marked) > MAX_COMPARE_IMAGES:
+                self.unmark(self.compare_marked.pop(0))
+        logger.debug(f'toggle_compare_mark(): {len(self.compare_marked)} marked')
+
+    def unmark(self, thumbnail_widget):
+        """ back to the selected or plain look. """
+        if thumbnail_widget is self.selected_thumbnail:
+            thumbnail_widget.setStyleSheet('QToolTip { font: 14px; padding: 2px; } QLabel { border: 2px solid cyan; }')
+        else:
+            thumbnail_widget.setStyleSheet('border: 2px solid black;')
+
+    def compare_paths(self, img_path):
+        """
+        The images Compare Images in the context menu of img_path opens:
+        the marked thumbnails and img_path. With nothing marked it's the
+        selected thumbnail and img_path.
+        Returns: list of str. FQPN, no repeats.
+        """
+        marked = [w for w in self.compare_marked if not sip.isdeleted(w)]
+        if not marked and self.selected_thumbnail is not None and not sip.isdeleted(self.selected_thumbnail):
+            marked = [self.selected_thumbnail]
+        paths = [w.toolTip() for w in marked]
+        if img_path not in paths:
+            paths.append(img_path)
+        return paths
+
+    def compare_images(self, image_paths):
+        """
+        Open 2 to 4 images side by side with zoom and pan locked together.
+        Args: image_paths = list of str. FQPN of the images.
+        """
+        logger.info(f'compare_images(): {image_paths}')
+        from .compare_view import CompareView
+        # the thumbnails are shown while the images load.
+        previews = dict(self.shown_thumbnails())
+        self.compare_view = CompareView(image_paths, previews)
+        self.compare_view.show()
+
+    def start_slideshow(self, interval_ms):
+        """
+        Full screen slideshow of the thumbnails in the order they are
+        shown. It starts at the selected thumbnail, if there is one.
+        Args: interval_ms = int. time each image is shown.
+        """
+        image_paths = [path for path, _ in self.shown_thumbnails()]
+        if not image_paths:
+            show_error_box('There are no images to show. Open a folder or search first.', 'info')
+            return
+        selected_path = self.selected_path()
+        start_index = image_paths.index(selected_path) if selected_path in image_paths else 0
+        logger.info(f'start_slideshow(): {len(image_paths)} images from {image_paths[start_index]}')
+        from .slideshow import Slideshow
+        self.slideshow = Slideshow(image_paths, start_index, interval_ms)
+        self.slideshow.start()
+
+    def selected_path(self):
+        """ FQPN of the selected thumbnail or '' """
+        selected = self.selected_thumbnail
+        return selected.toolTip() if selected is not None and not sip.isdeleted(selected) else ''
+
     def get_selected_images(self):
         """Returns the paths of the selected images."""
         selected_items = self.selectedItems()
@@ -352,7 +556,10 @@ class ThumbnailView(QWidget):
         """Removes all QLabel thumbnails whose object names start with 'thumbnail-'."""
         # needed so that the correct MD is shown for the image selected
         # when changing directories or drives.
-        self.cancel_flag[0] = True  # cancel previous loading
+        # cancel previous loading. the next worker gets a new flag list,
+        # the old worker may still be looking at this one.
+        self.cancel_flag[0] = True
+        self.cancel_flag = [False]
         existing_thumbnails = [w for w in self.flow_layout.findChildren(QLabel) if w.objectName().startswith("thumbnail-")]
         if not existing_thumbnails:
             # nothing to see here... move on
@@ -382,15 +589,15 @@ class ThumbnailView(QWidget):
           filepath = str. FQPN of the image file. Used as the tooltip.
           index = int. image index. Used the QLabel object name.
         """
+        PerfStats.instance().async_end('thumbnail deliver', filepath)
         tnLabel = QLabel()
         tnLabel.setObjectName(f'thumbnail-{index}')
         tnLabel.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         tnLabel.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
-        pixmap = QPixmap.fromImage(image)
-        pixmap = pixmap.scaled(QSize(self.tn_sizeX, self.tn_sizeY),
-                    aspectRatioMode=Qt.AspectRatioMode.KeepAspectRatio,
-                    transformMode=Qt.TransformationMode.SmoothTransformation)
-        tnLabel.setPixmap(pixmap)
+        # ThumbnailWorker has already scaled it.
+        with span('thumbnail pixmap', filepath):
+            pixmap = QPixmap.fromImage(image)
+            tnLabel.setPixmap(pixmap)
         tnLabel.setToolTip(filepath)
         tnLabel.setStyleSheet(Style.TOOLTIPCOLOR_QSS)
         # Each thumbnail is associated with a mousePressEvent and mouseDoubleClickEvent lambda
@@ -398,9 +605,28 @@ class ThumbnailView(QWidget):
         # The seemingly extra unneeded variable in the lambda prevents bad event reporting.
         tnLabel.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         tnLabel.customContextMenuRequested.connect(lambda pos, widget=tnLabel: self.show_thumbnail_context_menu(widget, pos))
-        tnLabel.mousePressEvent = lambda event, widget=tnLabel: self.show_selected(widget)
+        tnLabel.mousePressEvent = lambda event, widget=tnLabel: self.thumbnail_pressed(widget, event)
         tnLabel.mouseDoubleClickEvent = lambda event, widget=tnLabel: self.open_EyeSight(widget)
-        self.flow_layout.addWidget(tnLabel)
+        # thumbnails arrive in sort order, unless the sort was changed
+        # while they were loading. then they have to be slotted in.
+        last = len(self.sort_rank)
+        with span('thumbnail insert', filepath):
+            self.flow_layout.insert_sorted(tnLabel, lambda w: self.sort_rank.get(w.toolTip(), last))
+        self.thumbnails_added += 1
+        StartupTimer.instance().mark('first thumbnail')
+        if filepath == self.restore_selection:
+            self.restore_selection = ''
+            self.show_selected(tnLabel)
+            self.flow_layout.ensure_visible(tnLabel)
+
+    def thumbnails_to_decode(self):
+        worker = self.thumbnail_worker
+        return len(worker.filepaths) - worker.done if worker is not None and worker.running else 0
+
+    def thumbnails_waiting(self):
+        """ decoded, with their signal still in the GUI thread's event queue. """
+        worker = self.thumbnail_worker
+        return max(worker.emitted - self.thumbnails_added, 0) if worker is not None else 0
 
     def update_progress(self, current, total):
         """Should be obvious. updates the progress_bar"""
@@ -423,6 +649,8 @@ class ThumbnailView(QWidget):
         worker.signals.result.connect(self.add_thumbnail)
         worker.signals.progress.connect(self.update_progress)
         worker.signals.finished.connect(lambda: self.progress_bar.setVisible(False))
+        self.thumbnail_worker = worker
+        self.thumbnails_added = 0
 
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
@@ -439,44 +667,215 @@ class ThumbnailView(QWidget):
         logger.info(f' sorting / Resorting thumbnails by: {sort_by} - Dir: {directory}')
         # if there, clear existing thumbnails before adding new ones
         self.clear_thumbnails()
-        # after a PyQt 6.8 Update this error started showing up.
-        # qt.gui.imageio: QImageIOHandler: Rejecting image as it exceeds the current allocation limit of 128 megabytes
-        # this next line fixes it.
-        # see https://stackoverflow.com/questions/71458968/pyqt6-how-to-set-allocation-limit-in-qimagereader
-        QImageReader.setAllocationLimit(0)
-        self.cancel_flag[0] = False
 
         # well, pathlib not a "drop-in replacement". This took refactoring.
         # image_files = [f for f in os.listdir(directory) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))]
         # failed with AttributeError: 'PosixPath' object has no attribute 'lower'. Did you mean: 'owner'?
-        self.image_files = [str(f) for f in Path(directory).iterdir() if f.suffix.lower() in {'.png', '.jpg', '.jpeg', '.webp'}]
+        with span('list directory', directory):
+            self.image_files = list_image_files(directory)
         logger.info(f'found {len(self.image_files)} image files in {directory}')
+        self.index_image_files(self.image_files)
 
         if not self.image_files:
             logger.debug('sort_thumbnails: no files found')
             show_error_box(f'No image files in {directory}', 'warning')
             # TODO: FV++ - convert show_error_box to Notification with # and sort type
-        else:
-            if sort_by == 'Name':
-                self.image_files.sort(key=lambda f: Path(f).name.lower())
-            elif sort_by == 'Creation Date':
-                self.image_files.sort(key=lambda f: Path(f).stat().st_mtime)
-            elif sort_by == 'File Size':
-                self.image_files.sort(key=lambda f: Path(f).stat().st_size)
-            elif sort_by == 'Extension':
-                self.image_files.sort(key=lambda f: Path(f).suffix.lower())
-            elif sort_by == 'Default':
-                pass        # default is no sort
-            logger.debug(f'load_thumbnails: through sort_by if block. Sort by {sort_by}')
+        self.listed_order = {f: i for i, f in enumerate(self.image_files)}
+        self.set_sort_order(sort_by)
+        logger.debug(f'load_thumbnails: through sort_by if block. Sort by {sort_by}')
         self.load_thumbnails(self.image_files)
 
+    def sorted_files(self, image_files, sort_by):
+        """
+        Sort a list of image files.
+        Args:
+            image_files: list[str] FQPN of the images.
+            sort_by: str. one of the sort dropdown choices.
+        Returns: new sorted list
+        """
+        name = lambda f: Path(f).name.lower()
+        if sort_by == 'Name':
+            return sorted(image_files, key=name)
+        elif sort_by == 'Last modified date':
+            return sorted(image_files, key=lambda f: Path(f).stat().st_mtime)
+        elif sort_by == 'File Size':
+            return sorted(image_files, key=lambda f: Path(f).stat().st_size)
+        elif sort_by == 'Extension':
+            return sorted(image_files, key=lambda f: Path(f).suffix.lower())
+        elif sort_by in METADATA_SORTS:
+            # straight from the index. No files are opened. Images that
+            # haven't been indexed yet, or don't have the value, go last.
+            field = SORT_FIELDS.index(METADATA_SORTS[sort_by])
+            keys = {}
+            index = MetadataIndex.instance()
+            for directory in {str(Path(f).parent) for f in image_files}:
+                keys.update(index.sort_keys(directory))
+
+            def metadata_key(f):
+                value = keys.get(f, (None,) * len(SORT_FIELDS))[field]
+                if isinstance(value, str):
+                    value = value.lower()
+                return value is None, value if value is not None else 0, name(f)
+            return sorted(image_files, key=metadata_key)
+        # Default is the order the files were listed in.
+        return sorted(image_files, key=lambda f: self.listed_order.get(f, len(self.listed_order)))
+
+    def set_sort_order(self, sort_by):
+        """ sort self.image_files and remember where each file goes """
+        self.sort_by = sort_by
+        try:
+            with span('sort'):
+                self.image_files = self.sorted_files(self.image_files, sort_by)
+        except OSError as e:
+            # a file was deleted out from under us. leave the order alone.
+            logger.warning(f'set_sort_order(): unable to sort by {sort_by}: {e}')
+        self.sort_rank = {f: i for i, f in enumerate(self.image_files)}
+
+    def resort(self, sort_by):
+        """
+        Change the sort order of the thumbnails that are showing. The
+        thumbnails are re-ordered in place. Nothing is reloaded.
+        Args: sort_by: str. one of the sort dropdown choices.
+        """
+        logger.info(f'resort(): sorting {len(self.image_files)} thumbnails by {sort_by}')
+        self.set_sort_order(sort_by)
+        last = len(self.sort_rank)
+        self.flow_layout.sort_widgets(lambda w: self.sort_rank.get(w.toolTip(), last))
+
+    def on_index_finished(self):
+        """ the index has the metadata of new files now. put them in their place. """
+        if self.sort_by in METADATA_SORTS and self.image_files:
+            self.resort(self.sort_by)
+
+    def show_image_files(self, image_files):
+        """
+        Show thumbnails for a given list of files, in the given order.
+        Used for search results. The files don't have to be in the
+        same directory.
+        Args:
+            image_files: list[str] FQPN of the images to show.
+        """
+        logger.debug(f'show_image_files(): {len(image_files)} files')
+        self.clear_thumbnails()
+        self.image_files = list(image_files)
+        # results are in the order they were found. Default keeps it that way.
+        self.listed_order = {f: i for i, f in enumerate(self.image_files)}
+        self.sort_rank = dict(self.listed_order)
+        if self.image_files:
+            self.load_thumbnails(self.image_files)
+
+    def show_duplicates(self, directory=None, max_distance=DEFAULT_MAX_DISTANCE, max_images=1000):
+        """
+        Show the images that look like another image, grouped together.
+        The perceptual hashes are made when the thumbnails are loaded,
+        so only images whose thumbnails have been shown are checked.
+        Args:
+            directory: str. only look in this directory. None is the whole library.
+            max_distance: int. see duplicates.py
+            max_images: int. show at most this many, biggest groups first.
+        Returns: (int, int) number of groups and number of images in them.
+        """
+        try:
+            hashes = MetadataIndex.instance().image_hashes(directory)
+        except sqlite3.Error as e:
+            logger.error(f'show_duplicates(): unable to read the image hashes: {e}')
+            show_error_box(f'Unable to read the image hashes.\n\n{e}', 'critical')
+            return 0, 0
+        groups = find_duplicate_groups({path: record[2] for path, record in hashes.items()}, max_distance)
+        image_files = [path for group in groups for path in group]
+        logger.info(f'show_duplicates(): {len(groups)} groups, {len(image_files)} of {len(hashes)} images')
+        if len(image_files) > max_images:
+            logger.info(f'show_duplicates(): only showing the first {max_images}')
+        self.show_image_files(image_files[:max_images])
+        return len(groups), len(image_files)
+
+    def show_similar_prompts(self, img_path):
+        """
+        Show the images, from anywhere in the library, whose positive
+        prompt is nearly the same as this one's. Most similar first.
+        Args: img_path = string. FQPN of the image to match.
+        """
+        try:
+            image_files = MetadataIndex.instance().similar_prompts(img_path)
+        except sqlite3.Error as e:
+            logger.error(f'show_similar_prompts(): {e}')
+            show_error_box(f'Unable to search the index.\n\n{e}', 'critical')
+            return
+        if len(image_files) < 2:
+            show_error_box(f'No other images have a prompt like {Path(img_path).name}', 'info')
+            return
+        logger.info(f'show_similar_prompts(): {len(image_files) - 1} images like {img_path}')
+        self.show_image_files(image_files)
+
+    def compare_metadata(self, first_path, second_path):
+        """
+        Open a side by side diff of the metadata of two images.
+        Args: first_path, second_path = string. FQPN of the two images.
+        """
+        logger.info(f'compare_metadata(): {first_path} vs {second_path}')
+        from .metadata_diff import MetadataDiffView
+        try:
+            diff_view = MetadataDiffView(first_path, second_path, parent=self)
+        except Exception as e:
+            # see note in ThumbnailWorker.run() about the shotgun approach.
+            logger.error(f'compare_metadata(): {e}', exc_info=True)
+            show_error_box(f'Unable to compare the metadata.\n\n{e}', 'critical')
+            return
+        diff_view.show()
+
+    def show_prompt_clusters(self, directory=None, max_images=1000):
+        """
+        Show the images grouped by near duplicate prompts.
+        Args:
+            directory: str. only look in this directory. None is the whole library.
+            max_images: int. show at most this many, biggest groups first.
+        Returns: (int, int) number of groups and number of images in them.
+        """
+        try:
+            clusters = MetadataIndex.instance().prompt_clusters(directory)
+        except sqlite3.Error as e:
+            logger.error(f'show_prompt_clusters(): {e}')
+            show_error_box(f'Unable to read the index.\n\n{e}', 'critical')
+            return 0, 0
+        image_files = [path for cluster in clusters for path in cluster]
+        logger.info(f'show_prompt_clusters(): {len(clusters)} groups, {len(image_files)} images')
+        self.show_image_files(image_files[:max_images])
+        return len(clusters), len(image_files)
+
+    def index_image_files(self, image_files):
+        """
+        Add the image files to the metadata index in the background
+        so they can be found by the prompt search. Files that are
+        already indexed and haven't changed are skipped.
+        """
+        # stop indexing the previous directory. don't reuse the old flag
+        # list since the old worker may still be looking at it.
+        self.index_cancel_flag[0] = True
+        self.index_cancel_flag = [False]
+        if image_files:
+            worker = IndexWorker(image_files, self.index_cancel_flag)
+            worker.signals.finished.connect(self.on_index_finished)
+            self.thread_pool.start(worker)
+
+    def shown_thumbnails(self):
+        """ (FQPN, QPixmap) of each thumbnail, in the order they are shown. """
+        layout = self.flow_layout.flowLayout
+        widgets = (layout.itemAt(i).widget() for i in range(layout.count()))
+        return [(w.toolTip(), w.pixmap()) for w in widgets if w is not None]
+
     def open_EyeSight(self, thumbnail_widget):
         """Upon image double click open the image in EyeSight."""
         # I can see clearly now that the double-click has gone...
         #
         # pass in the FQPN from the TN tooltip and then
-        # open up EyeSight in a new window with the full image.
+        # open up EyeSight with the full image.
         filename = thumbnail_widget.toolTip()
         logger.info(f"Opening EyeSight for {filename}")
-        self.monocle = EyeSight(filename)
-        self.monocle.show()
+        # the thumbnail is shown until the full image is loaded. next and
+        # previous in EyeSight go through the thumbnails in the order shown.
+        thumbnails = self.shown_thumbnails()
+        # EyeSightManager reuses the viewer that is open, unless the user
+        # turned on opening images in new windows. imported on first use.
+        from .eye_sight import EyeSightManager
+        self.monocle = EyeSightManager.instance().open(filename, thumbnail_widget.pixmap(),
+                                                       [f for f, _ in thumbnails], dict(thumbnails))
@@ -0,0 +1,159 @@
+# watchdog.py
+# Catch the GUI thread when it freezes, and say where.
+#
+# A helper thread pings the GUI thread every HEARTBEAT_MS with a queued
+# signal and waits for the answer. The time the answer takes is the event
+# loop latency (it's in the PerfHud as 'event loop latency' when that's
+# on). If there is no answer within the threshold the GUI thread is
+# stuck: its Python stack is taken right then, while it's still stuck,
+# and logged with the LatentEye operation it's in. That's the innermost
+# function of the app on the stack, e.g. InfoView.show_metadata or
+# CustomFileSystemModel.data, and the outermost one, the slot or event
+# handler Qt called. When the answer finally comes, how long the stall
+# lasted is logged too.
+#
+# The threshold is STALL_THRESHOLD_MS unless LatentEye is started with
+# --stall-ms. --stall-ms 0 turns the watchdog off.
+#
+# Date: Oct 2026
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .perf import PerfStats
+
+logger = logging.getLogger(__name__)
+
+STALL_THRESHOLD_MS = 250
+HEARTBEAT_MS = 100
+# frames of the stack that are logged, innermost last.
+STACK_DEPTH = 30
+# files in here are LatentEye's. everything else is Python, PyQt or a library.
+APP_DIR = Path(__file__).resolve().parent
+
+
+class Heartbeat(QObject):
+    """ lives in the GUI thread. answers the helper thread's pings. """
+    ping = pyqtSignal()
+
+    def __init__(self, answered):
+        super().__init__()
+        self.answered = answered
+        self.ping.connect(self.answer)
+
+    def answer(self):
+        self.answered.set()
+
+
+def app_frames(frame):
+    """ the frames of the stack that are LatentEye code, innermost first. """
+    frames = []
+    while frame is not None:
+        if Path(frame.f_code.co_filename).resolve().parent == APP_DIR:
+            frames.append(frame)
+        frame = frame.f_back
+    return frames
+
+
+def operation(frame):
+    """
+    What LatentEye is doing, from a stack.
+    Returns: str. e.g. 'InfoView.show_metadata (from MainWindow.get_thumbnail_metadata)'
+             or '' if it's not in LatentEye code.
+    """
+    frames = app_frames(frame)
+    if not frames:
+        return ''
+    inner, outer = frames[0].f_code.co_qualname, frames[-1].f_code.co_qualname
+    return inner if inner == outer else f'{inner} (from {outer})'
+
+
+class StallWatchdog:
+    """
+    Logs the GUI thread's stack whenever it's blocked longer than the
+    threshold. One instance for the app, see instance(). Call start() on
+    the GUI thread once the QApplication is made.
+    Args: threshold_ms = int. how long the GUI thread can be busy before it's a stall.
+    """
+    _instance = None
+
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS):
+        self.threshold_ms = threshold_ms
+        self.stalls = 0
+        self.longest_ms = 0.0
+        self._answered = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._heartbeat = None
+        self._gui_thread_id = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def start(self):
+        """ start watching the thread this is called on. """
+        if self._thread is not None or self.threshold_ms <= 0:
+            return
+        self._gui_thread_id = threading.get_ident()
+        self._heartbeat = Heartbeat(self._answered)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.watch, name='StallWatchdog', daemon=True)
+        self._thread.start()
+        PerfStats.instance().add_gauge('GUI stalls', lambda: self.stalls)
+        logger.info(f'StallWatchdog: watching for stalls over {self.threshold_ms} ms')
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._answered.set()
+        self._thread.join()
+        self._thread = None
+
+    def watch(self):
+        """ the helper thread. """
+        threshold = self.threshold_ms / 1000
+        while not self._stop.wait(HEARTBEAT_MS / 1000):
+            self._answered.clear()
+            sent = time.perf_counter()
+            self._heartbeat.ping.emit()
+            stalled_in = None
+            if not self._answered.wait(threshold):
+                if self._stop.is_set():
+                    return
+                stalled_in = self.report_stall()
+                self._answered.wait()
+                if self._stop.is_set():
+                    return
+            latency_ms = (time.perf_counter() - sent) * 1000
+            PerfStats.instance().record('event loop latency', latency_ms)
+            if stalled_in is not None:
+                self.longest_ms = max(self.longest_ms, latency_ms)
+                logger.warning(f'StallWatchdog: GUI thread was blocked for {latency_ms:.0f} ms'
+                               f'{" in " + stalled_in if stalled_in else ""}')
+
+    def report_stall(self):
+        """
+        Log the GUI thread's stack. Called from the helper thread while
+        the GUI thread is still stuck.
+        Returns: str. the operation it was in. see operation()
+        """
+        self.stalls += 1
+        frame = sys._current_frames().get(self._gui_thread_id)
+        if frame is None:
+            return ''
+        doing = operation(frame)
+        stack = ''.join(traceback.format_stack(frame, limit=STACK_DEPTH))
+        del frame
+        logger.warning(f'StallWatchdog: GUI thread blocked over {self.threshold_ms} ms'
+                       f'{" in " + doing if doing else ""}. Stack, most recent call last:\n{stack}')
+        return doing
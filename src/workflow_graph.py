@@ -0,0 +1,310 @@
+# workflow_graph.py
+# ComfyUI workflows as a compact node / edge graph.
+#
+# ComfyUI saves two JSON blobs in its PNGs:
+#   workflow - the editor (LiteGraph) version. nodes with positions,
+#              sizes, colors and a list of links.
+#   prompt   - the API version. just the nodes that ran and their inputs.
+#              no positions.
+# Either can be several MB with hundreds of nodes. Nothing here gets
+# touched unless someone asks to see the workflow, so the metadata panel
+# never pays for it. When they do, only the bits needed to draw the graph
+# are kept and the rest of the JSON is thrown away. The graph, with its
+# layout, is cached per file so opening it again is free.
+#
+# Date: Oct 2026
+
+import json
+import logging
+import os
+from collections import OrderedDict, defaultdict
+
+from .image_header import read_image_header, read_text_keys
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_KEYS = {'workflow', 'prompt'}
+
+# LiteGraph geometry. Close enough to what ComfyUI draws.
+TITLE_HEIGHT = 30
+SLOT_HEIGHT = 20
+# spacing used when the graph has no positions (prompt only)
+LAYER_SPACING = 320
+ROW_SPACING = 40
+
+
+class WorkflowNode:
+    """
+    One node of a workflow graph.
+        id = str. node id
+        type = str. the ComfyUI class_type
+        title = str. what is shown in the node title bar
+        x, y, width, height = float. node body rect in scene coordinates
+        color = str or None. node background color if the user set one
+        inputs, outputs = list[str]. slot names
+        values = list. widget values, e.g. seed, steps, the prompt text
+    """
+    __slots__ = ('id', 'type', 'title', 'x', 'y', 'width', 'height',
+                 'color', 'inputs', 'outputs', 'values')
+
+    def __init__(self, node_id, node_type, title=None):
+        self.id = str(node_id)
+        self.type = node_type or '?'
+        self.title = title or self.type
+        self.x = self.y = 0.0
+        self.width = 200.0
+        self.height = 80.0
+        self.color = None
+        self.inputs = []
+        self.outputs = []
+        self.values = []
+
+    def input_pos(self, slot):
+        """ scene position of an input slot (left edge) """
+        return self.x, self.y + SLOT_HEIGHT * (slot + 0.5)
+
+    def output_pos(self, slot):
+        """ scene position of an output slot (right edge) """
+        return self.x + self.width, self.y + SLOT_HEIGHT * (slot + 0.5)
+
+
+class WorkflowGraph:
+    """
+    Compact graph of a ComfyUI workflow.
+        nodes = dict of node id: WorkflowNode
+        edges = list of (src id, src slot, dst id, dst slot, type)
+        groups = list of (title, x, y, width, height, color)
+        source = str. 'workflow' or 'prompt', which JSON it came from.
+    """
+    __slots__ = ('nodes', 'edges', 'groups', 'source')
+
+    def __init__(self, source):
+        self.nodes = {}
+        self.edges = []
+        self.groups = []
+        self.source = source
+
+    def bounds(self):
+        """ (x, y, width, height) that holds every node, including title bars """
+        if not self.nodes:
+            return 0, 0, 0, 0
+        left = min(n.x for n in self.nodes.values())
+        top = min(n.y - TITLE_HEIGHT for n in self.nodes.values())
+        right = max(n.x + n.width for n in self.nodes.values())
+        bottom = max(n.y + n.height for n in self.nodes.values())
+        return left, top, right - left, bottom - top
+
+
+def _xy(value, default=(0.0, 0.0)):
+    """ LiteGraph has saved pos/size as [x, y] and as {"0": x, "1": y} """
+    if isinstance(value, (list, tuple)) and len(value) >= 2:
+        return float(value[0]), float(value[1])
+    if isinstance(value, dict):
+        return float(value.get('0', default[0])), float(value.get('1', default[1]))
+    return default
+
+
+def parse_workflow(workflow):
+    """
+    Build a WorkflowGraph from the editor (LiteGraph) workflow JSON.
+    Args: dict - the decoded workflow
+    Returns: WorkflowGraph
+    """
+    graph = WorkflowGraph('workflow')
+    for node in workflow.get('nodes') or []:
+        wn = WorkflowNode(node.get('id'), node.get('type'), node.get('title'))
+        wn.x, wn.y = _xy(node.get('pos'))
+        wn.width, wn.height = _xy(node.get('size'), (200.0, 80.0))
+        wn.color = node.get('bgcolor') or node.get('color')
+        wn.inputs = [i.get('name', '') for i in node.get('inputs') or []]
+        wn.outputs = [o.get('name', '') for o in node.get('outputs') or []]
+        values = node.get('widgets_values')
+        # some nodes save a dict of widget values instead of a list.
+        wn.values = list(values.values()) if isinstance(values, dict) else list(values or [])
+        graph.nodes[wn.id] = wn
+
+    for link in workflow.get('links') or []:
+        if isinstance(link, dict):
+            link = (link.get('id'), link.get('origin_id'), link.get('origin_slot'),
+                    link.get('target_id'), link.get('target_slot'), link.get('type'))
+        if len(link) < 5:
+            continue
+        _link_id, src, src_slot, dst, dst_slot = link[:5]
+        link_type = link[5] if len(link) > 5 else ''
+        if str(src) in graph.nodes and str(dst) in graph.nodes:
+            graph.edges.append((str(src), int(src_slot or 0), str(dst), int(dst_slot or 0), str(link_type)))
+
+    for group in workflow.get('groups') or []:
+        x, y, w, h = (list(group.get('bounding') or [0, 0, 0, 0]) + [0, 0, 0, 0])[:4]
+        graph.groups.append((group.get('title', ''), x, y, w, h, group.get('color')))
+    return graph
+
+
+def parse_prompt(prompt):
+    """
+    Build a WorkflowGraph from the API prompt JSON. There are no
+    positions in the prompt so the nodes are laid out in layers,
+    left to right, following the links. see layout_layers()
+    Args: dict - the decoded prompt
+    Returns: WorkflowGraph
+    """
+    graph = WorkflowGraph('prompt')
+    node_ids = {str(node_id) for node_id, node in prompt.items() if isinstance(node, dict)}
+    for node_id, node in prompt.items():
+        if not isinstance(node, dict):
+            continue
+        title = (node.get('_meta') or {}).get('title')
+        wn = WorkflowNode(node_id, node.get('class_type'), title)
+        graph.nodes[wn.id] = wn
+        for name, value in (node.get('inputs') or {}).items():
+            # a link is [source node id, output slot]. Anything else is a
+            # widget value, including pairs like ["a", "b"] or [512, 0.5].
+            if _is_link(value, node_ids):
+                graph.edges.append((str(value[0]), int(value[1]), wn.id, len(wn.inputs), ''))
+                wn.inputs.append(name)
+            else:
+                wn.values.append(value)
+
+    # work out the output slots since the prompt doesn't list them.
+    for src, src_slot, _dst, _dst_slot, _type in graph.edges:
+        outputs = graph.nodes[src].outputs
+        while len(outputs) <= src_slot:
+            outputs.append(str(len(outputs)))
+    for wn in graph.nodes.values():
+        wn.height = SLOT_HEIGHT * max(len(wn.inputs), len(wn.outputs), 2) + 10
+    layout_layers(graph)
+    return graph
+
+
+def _is_link(value, node_ids):
+    """ True if a prompt input is [id of a node in the prompt, int output slot] """
+    if not isinstance(value, list) or len(value) != 2:
+        return False
+    src, slot = value
+    return (isinstance(src, (str, int)) and not isinstance(src, bool) and str(src) in node_ids
+            and isinstance(slot, int) and not isinstance(slot, bool) and slot >= 0)
+
+
+def layout_layers(graph):
+    """
+    Simple layered layout. A node goes one layer to the right of the
+    furthest right node that feeds it. Nodes in a layer are stacked.
+    """
+    feeds = defaultdict(list)
+    pending = {node_id: 0 for node_id in graph.nodes}
+    for src, _ss, dst, _ds, _t in graph.edges:
+        feeds[src].append(dst)
+        pending[dst] += 1
+
+    # Kahn's topological sort. Anything left over is in a cycle and
+    # is just put in the last layer.
+    layer = dict.fromkeys(graph.nodes, 0)
+    ready = [n for n, count in pending.items() if count == 0]
+    while ready:
+        node_id = ready.pop()
+        for dst in feeds[node_id]:
+            layer[dst] = max(layer[dst], layer[node_id] + 1)
+            pending[dst] -= 1
+            if pending[dst] == 0:
+                ready.append(dst)
+    last = max(layer.values(), default=0) + 1
+    for node_id, count in pending.items():
+        if count > 0:
+            layer[node_id] = last
+
+    column_y = defaultdict(float)
+    for node_id in sorted(graph.nodes, key=lambda n: (layer[n], _natural(n))):
+        wn = graph.nodes[node_id]
+        col = layer[node_id]
+        wn.x = col * LAYER_SPACING
+        wn.y = column_y[col] + TITLE_HEIGHT
+        column_y[col] = wn.y + wn.height + ROW_SPACING
+
+
+def _natural(node_id):
+    """ sort '10' after '9' """
+    return (0, int(node_id), '') if node_id.isdigit() else (1, 0, node_id)
+
+
+def read_workflow_json(image_path):
+    """
+    Get the ComfyUI workflow and prompt JSON text out of an image.
+    Only the two chunks are decoded.
+    Returns: dict with 'workflow' and/or 'prompt' keys. Empty if none.
+    """
+    header = read_image_header(image_path, text_keys=WORKFLOW_KEYS)
+    if header is None:
+        return {}
+    return {k: v for k, v in header.info.items() if k in WORKFLOW_KEYS}
+
+
+def has_workflow(image_path):
+    """
+    True if the image has a ComfyUI workflow or prompt. Only the chunk
+    keys are checked, the JSON isn't read. It's called on every click
+    in the thumbnails.
+    """
+    try:
+        return not WORKFLOW_KEYS.isdisjoint(read_text_keys(image_path))
+    except OSError:
+        return False
+
+
+class WorkflowCache:
+    """
+    Keeps the last few parsed and laid out workflow graphs. The key is the
+    file path and the entry is only good while the file's mtime and size
+    haven't changed.
+    """
+    def __init__(self, max_graphs=16):
+        self.max_graphs = max_graphs
+        self._graphs = OrderedDict()
+
+    def get(self, image_path):
+        """
+        The WorkflowGraph for an image. Parsed on first use.
+        Returns: WorkflowGraph or None if there is no workflow in the image.
+        Raises: OSError if the file can't be read.
+        """
+        stat = os.stat(image_path)
+        key = (stat.st_mtime, stat.st_size)
+        entry = self._graphs.get(image_path)
+        if entry is not None and entry[0] == key:
+            self._graphs.move_to_end(image_path)
+            return entry[1]
+
+        graph = load_workflow_graph(image_path)
+        self._graphs[image_path] = (key, graph)
+        self._graphs.move_to_end(image_path)
+        while len(self._graphs) > self.max_graphs:
+            self._graphs.popitem(last=False)
+        return graph
+
+
+def load_workflow_graph(image_path):
+    """
+    Read and parse the workflow of an image. The editor workflow is
+    preferred since it has the real layout, the prompt is used when
+    that's all there is.
+    Returns: WorkflowGraph or None if there is no (usable) workflow.
+    """
+    chunks = read_workflow_json(image_path)
+    for key, parse in (('workflow', parse_workflow), ('prompt', parse_prompt)):
+        text = chunks.get(key)
+        if not text:
+            continue
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                graph = parse(data)
+                if graph.nodes:
+                    logger.debug(f'load_workflow_graph(): {len(graph.nodes)} nodes, '
+                                 f'{len(graph.edges)} links from {key} in {image_path}')
+                    return graph
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f'load_workflow_graph(): unable to parse the {key} in {image_path}: {e}')
+    return None
+
+
+# one cache for the whole app
+workflow_cache = WorkflowCache()
@@ -0,0 +1,125 @@
+# workflow_view.py
+# Show a ComfyUI workflow as a block diagram.
+#
+# The graph comes from workflow_graph.py already parsed and laid out. This
+# just draws it: a box per node with its title, a curve per link, and the
+# groups behind them. Mouse wheel zooms, drag to pan. Hover over a node
+# for its widget values (seed, steps, prompt text...).
+#
+# Date: Oct 2026
+
+import logging
+
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QBrush, QColor, QFont, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import (QDialog, QGraphicsPathItem, QGraphicsRectItem, QGraphicsScene,
+                             QGraphicsSimpleTextItem, QGraphicsView, QVBoxLayout)
+
+from .workflow_graph import TITLE_HEIGHT
+
+logger = logging.getLogger(__name__)
+
+# colors similar to the ComfyUI dark theme
+NODE_COLOR = '#353535'
+TITLE_COLOR = '#222222'
+TEXT_COLOR = '#DDDDDD'
+LINK_COLOR = '#9A9'
+GROUP_COLOR = '#3f789e'
+# same colors ComfyUI uses for the common link types.
+LINK_TYPE_COLORS = {
+    'MODEL': '#B39DDB', 'CLIP': '#FFD500', 'VAE': '#FF6E6E', 'CONDITIONING': '#FFA931',
+    'LATENT': '#FF9CF9', 'IMAGE': '#64B5F6', 'MASK': '#81C784', 'CONTROL_NET': '#00D78D',
+}
+
+
+class WorkflowGraphicsView(QGraphicsView):
+    """ QGraphicsView with mouse wheel zoom and drag to pan. """
+
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        self.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setBackgroundBrush(QColor('#1E1E1E'))
+        # only redraw what changed. with hundreds of nodes this matters.
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+
+    def wheelEvent(self, event):
+        factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+        self.scale(factor, factor)
+
+
+class WorkflowView(QDialog):
+    """
+    Non-modal dialog showing a WorkflowGraph.
+    Args:
+        graph = WorkflowGraph to show
+        title = str. window title, usually the image file name
+    """
+    def __init__(self, graph, title='', parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f'Workflow - {title}' if title else 'Workflow')
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.resize(1200, 800)
+
+        self.scene = QGraphicsScene(self)
+        self.build_scene(graph)
+        self.view = WorkflowGraphicsView(self.scene, self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.view)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.view.fitInView(self.scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    def build_scene(self, graph):
+        """ Add the groups, links and nodes of the graph to the scene. """
+        font = QFont('Arial', 11)
+        for title, x, y, w, h, color in graph.groups:
+            grp = QGraphicsRectItem(QRectF(x, y, w, h))
+            fill = QColor(color or GROUP_COLOR)
+            fill.setAlpha(60)
+            grp.setBrush(QBrush(fill))
+            grp.setPen(QPen(QColor(color or GROUP_COLOR), 2))
+            grp.setZValue(-2)
+            self.scene.addItem(grp)
+            label = QGraphicsSimpleTextItem(title, grp)
+            label.setFont(QFont('Arial', 16))
+            label.setBrush(QColor(TEXT_COLOR))
+            label.setPos(x + 6, y + 4)
+
+        for src, src_slot, dst, dst_slot, link_type in graph.edges:
+            start = QPointF(*graph.nodes[src].output_pos(src_slot))
+            end = QPointF(*graph.nodes[dst].input_pos(dst_slot))
+            bend = max(abs(end.x() - start.x()) / 2, 40)
+            path = QPainterPath(start)
+            path.cubicTo(start + QPointF(bend, 0), end - QPointF(bend, 0), end)
+            link = QGraphicsPathItem(path)
+            link.setPen(QPen(QColor(LINK_TYPE_COLORS.get(link_type.upper(), LINK_COLOR)), 2))
+            link.setZValue(-1)
+            self.scene.addItem(link)
+
+        for node in graph.nodes.values():
+            body = QGraphicsRectItem(QRectF(node.x, node.y, node.width, node.height))
+            body.setBrush(QBrush(QColor(node.color or NODE_COLOR)))
+            body.setPen(QPen(QColor('#000000'), 1))
+            bar = QGraphicsRectItem(QRectF(node.x, node.y - TITLE_HEIGHT, node.width, TITLE_HEIGHT), body)
+            bar.setBrush(QBrush(QColor(TITLE_COLOR)))
+            title = QGraphicsSimpleTextItem(node.title, body)
+            title.setFont(font)
+            title.setBrush(QColor(TEXT_COLOR))
+            title.setPos(node.x + 8, node.y - TITLE_HEIGHT + 7)
+            body.setToolTip(self.node_tooltip(node))
+            self.scene.addItem(body)
+        logger.debug(f'build_scene(): {len(graph.nodes)} nodes and {len(graph.edges)} links')
+
+    @staticmethod
+    def node_tooltip(node):
+        """ node type and widget values. long values are cut short. """
+        lines = [f'{node.title} ({node.type}) #{node.id}']
+        for value in node.values:
+            text = str(value)
+            lines.append(text if len(text) <= 200 else text[:200] + '...')
+        return '\n'.join(lines)